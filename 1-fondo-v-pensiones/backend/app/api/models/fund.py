@@ -1,124 +1,122 @@
 import os
-import boto3
-from typing import List, Dict, Optional
-from datetime import datetime
-import uuid
+import logging
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
 from app.api.models.transaction import TransactionModel
+from app.api.storage import get_backend_name, get_user_funds_store, ConcurrentUpdateError, SQLITE_BACKEND
+from app.api.storage.dynamodb import from_dynamo
+from app.api.storage.portfolio import (
+    UNKNOWN_CATEGORY,
+    apply_delta,
+    cancellation_delta,
+    copy_summary,
+    replay_summary,
+    subscription_delta
+)
+from app.core.aws import get_resource, get_table
+from app.core.locks import StripedLocks
+from app.services.fund_catalog import (
+    CatalogSnapshot,
+    DynamoDBFundSource,
+    fund_catalog,
+    load_seed_funds
+)
+from app.services.notification_outbox import notification_outbox
 
-# Datos iniciales de los fondos
-INITIAL_FUNDS = [
-    {
-        "id": 1,
-        "nombre": "FPV_EL_CLIENTE_RECAUDADORA",
-        "monto_minimo": 75000,
-        "categoria": "FPV"
-    },
-    {
-        "id": 2,
-        "nombre": "FPV_EL_CLIENTE_ECOPETROL",
-        "monto_minimo": 125000,
-        "categoria": "FPV"
-    },
-    {
-        "id": 3,
-        "nombre": "DEUDAPRIVADA",
-        "monto_minimo": 50000,
-        "categoria": "FIC"
-    },
-    {
-        "id": 4,
-        "nombre": "FDO-ACCIONES",
-        "monto_minimo": 250000,
-        "categoria": "FIC"
-    },
-    {
-        "id": 5,
-        "nombre": "FPV_EL CLIENTE_DINAMICA",
-        "monto_minimo": 100000,
-        "categoria": "FPV"
-    }
-]
-
-# Simulación de base de datos en memoria
-USER_FUNDS = {
-    "default_user": {
-        "balance": 500000,  # Balance inicial según requisitos
-        "subscribed_funds": []
-    }
-}
+logger = logging.getLogger(__name__)
+
+# Serializa las operaciones de un mismo usuario dentro del proceso; usuarios
+# distintos solo comparten lock si caen en la misma franja
+USER_LOCKS = StripedLocks(int(os.environ.get('USER_LOCK_STRIPES', '1024')))
+
+# Operaciones por lote: con la del usuario son 26 escrituras en un
+# TransactWriteItems (el máximo es 100)
+MAX_BATCH_OPERATIONS = 25
+# Reintentos de un lote cuando otro proceso cambió al usuario
+BATCH_ATTEMPTS = 3
+
+SUBSCRIBE = "subscribe"
+UNSUBSCRIBE = "unsubscribe"
 
 class FundModel:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', endpoint_url=os.getenv('DYNAMODB_ENDPOINT'))
-        self.table = self.dynamodb.Table(os.getenv('FUNDS_TABLE'))
-        self.user_funds_table = self.dynamodb.Table(os.getenv('USER_FUNDS_TABLE'))
-        self.transactions_table = self.dynamodb.Table(os.getenv('TRANSACTIONS_TABLE'))
+        self.dynamodb = get_resource('dynamodb')
+        self.table = get_table(os.getenv('FUNDS_TABLE', 'Funds'))
+        self.user_funds_table = get_table(os.getenv('USER_FUNDS_TABLE', 'UserFunds'))
+        self.transactions_table = get_table(os.getenv('TRANSACTIONS_TABLE', 'Transactions'))
+
+    @classmethod
+    async def initialize_database(cls):
+        """
+        Cargar los fondos del archivo semilla en la tabla de fondos (la de
+        SQLite con STORAGE_BACKEND=sqlite, si no la tabla Funds de DynamoDB)
+        """
+        if get_backend_name() == SQLITE_BACKEND:
+            from app.api.storage.sqlite import SQLiteFundSource
+            source = SQLiteFundSource()
+        else:
+            source = DynamoDBFundSource()
+        await source.save(load_seed_funds())
+        await fund_catalog.refresh(force=True)
+
+    @classmethod
+    async def get_catalog(cls) -> CatalogSnapshot:
+        """
+        Obtener la versión actual del catálogo de fondos
+        """
+        return await fund_catalog.snapshot()
 
     @classmethod
     async def get_all_funds(cls) -> List[Dict]:
         """
         Obtener todos los fondos disponibles
         """
-        return INITIAL_FUNDS
+        return list((await fund_catalog.snapshot()).funds)
 
     @classmethod
     async def get_fund(cls, fund_id: int) -> Optional[Dict]:
         """
         Obtener un fondo específico por su ID
         """
-        for fund in INITIAL_FUNDS:
-            if fund["id"] == fund_id:
-                return fund
-        return None
+        return (await fund_catalog.snapshot()).get(fund_id)
 
     @classmethod
     async def get_user_funds(cls, user_id: str) -> Dict:
         """
         Obtener los fondos y balance del usuario
         """
-        if user_id not in USER_FUNDS:
-            USER_FUNDS[user_id] = {
-                "balance": 500000,  # Balance inicial según requisitos
-                "subscribed_funds": []
-            }
-        return USER_FUNDS[user_id]
+        return await get_user_funds_store().get_user_funds(user_id)
 
     @classmethod
-    async def subscribe_to_fund(cls, user_id: str, fund_id: int) -> Dict:
+    async def subscribe_to_fund(
+        cls,
+        user_id: str,
+        fund_id: int,
+        recipient: Optional[str] = None,
+        notification_type: str = "email"
+    ) -> Dict:
         """
-        Suscribir a un usuario a un fondo
+        Suscribir a un usuario a un fondo. Si se indica `recipient`, la
+        notificación de la suscripción se encola en el outbox.
         """
         # Obtener el fondo
         fund = await cls.get_fund(fund_id)
         if not fund:
             raise ValueError("Fondo no encontrado")
 
-        # Obtener datos del usuario
-        user_data = await cls.get_user_funds(user_id)
-
-        # Verificar si ya está suscrito
-        if any(f["id"] == str(fund_id) for f in user_data["subscribed_funds"]):
-            raise ValueError("Ya está suscrito a este fondo")
-
-        # Verificar saldo suficiente
-        if user_data["balance"] < fund["monto_minimo"]:
-            raise ValueError(f"No tiene saldo disponible para vincularse al fondo {fund['nombre']}")
-
         # Crear suscripción
         subscription = {
             "id": str(fund_id),
             "name": fund["nombre"],
             "subscription_date": datetime.now().isoformat(),
-            "amount": fund["monto_minimo"]
+            "amount": fund["monto_minimo"],
+            "category": fund["categoria"]
         }
-
-        # Actualizar saldo y suscripciones
-        user_data["balance"] -= fund["monto_minimo"]
-        user_data["subscribed_funds"].append(subscription)
-        await cls.update_user_funds(user_id, user_data)
-
-        # Registrar la transacción
-        transaction = await TransactionModel.add_transaction(
+        if recipient:
+            # Contacto para los avisos masivos del fondo
+            subscription["recipient"] = recipient
+            subscription["notification_type"] = notification_type
+        transaction = TransactionModel.build_transaction(
             user_id=user_id,
             fund_id=fund_id,
             transaction_type="SUBSCRIPTION",
@@ -126,6 +124,21 @@ class FundModel:
             fund_name=fund["nombre"]
         )
 
+        # El store valida suscripción duplicada y saldo suficiente, y guarda
+        # balance, suscripción y transacción en una sola operación
+        async with USER_LOCKS.lock(user_id):
+            user_data = await get_user_funds_store().subscribe(user_id, subscription, transaction)
+
+        if recipient:
+            try:
+                await notification_outbox.enqueue(notification_type, recipient, fund, user_id)
+            except Exception as e:
+                # La suscripción ya quedó registrada; no se revierte por la notificación
+                logger.error(
+                    "Error encolando la notificación: %s", e,
+                    extra={"user_id": user_id, "fund_id": fund_id}
+                )
+
         return {
             "success": True,
             "message": "Suscripción exitosa",
@@ -138,34 +151,21 @@ class FundModel:
         """
         Cancelar la suscripción de un usuario a un fondo
         """
-        # Obtener datos del usuario
-        user_data = await cls.get_user_funds(user_id)
-
-        # Buscar la suscripción
-        subscription = None
-        for f in user_data["subscribed_funds"]:
-            if f["id"] == fund_id:
-                subscription = f
-                break
+        def build_transaction(subscription: Dict) -> Dict:
+            return TransactionModel.build_transaction(
+                user_id=user_id,
+                fund_id=int(fund_id),
+                transaction_type="CANCELLATION",
+                amount=subscription["amount"],
+                fund_name=subscription["name"]
+            )
 
-        if not subscription:
-            raise ValueError("No está suscrito a este fondo")
-
-        # Devolver el monto al balance
-        user_data["balance"] += subscription["amount"]
-        user_data["subscribed_funds"] = [
-            f for f in user_data["subscribed_funds"] if f["id"] != fund_id
-        ]
-        await cls.update_user_funds(user_id, user_data)
-
-        # Registrar la transacción
-        transaction = await TransactionModel.add_transaction(
-            user_id=user_id,
-            fund_id=int(fund_id),
-            transaction_type="CANCELLATION",
-            amount=subscription["amount"],
-            fund_name=subscription["name"]
-        )
+        # Para el resumen, si la suscripción es anterior a guardar la categoría
+        category = cls._category_of(await cls.get_catalog(), fund_id)
+        async with USER_LOCKS.lock(user_id):
+            user_data, transaction = await get_user_funds_store().unsubscribe(
+                user_id, fund_id, build_transaction, category
+            )
 
         return {
             "success": True,
@@ -174,9 +174,210 @@ class FundModel:
             "new_balance": user_data["balance"]
         }
 
+    @classmethod
+    async def apply_operations(
+        cls,
+        user_id: str,
+        operations: List[Dict],
+        recipient: Optional[str] = None,
+        notification_type: str = "email"
+    ) -> Dict:
+        """
+        Aplicar varias suscripciones/cancelaciones en orden, todas o ninguna.
+        Se validan juntas contra el balance y se guardan con sus
+        transacciones en una sola escritura.
+        """
+        if not operations:
+            raise ValueError("No hay operaciones")
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise ValueError(f"Máximo {MAX_BATCH_OPERATIONS} operaciones por lote")
+
+        catalog = await cls.get_catalog()
+        for index, operation in enumerate(operations, 1):
+            if operation["action"] not in (SUBSCRIBE, UNSUBSCRIBE):
+                raise ValueError(f"Operación {index}: acción desconocida {operation['action']}")
+            if operation["action"] == SUBSCRIBE and catalog.get(operation["fund_id"]) is None:
+                raise ValueError(f"Operación {index}: Fondo no encontrado")
+
+        store = get_user_funds_store()
+        async with USER_LOCKS.lock(user_id):
+            for attempt in range(BATCH_ATTEMPTS):
+                user_data = await store.get_user_funds(user_id)
+                user_data, transactions = cls._plan_operations(
+                    user_id, user_data, operations, catalog, recipient, notification_type
+                )
+                try:
+                    user_data = await store.save_batch(user_id, user_data, transactions)
+                    break
+                except ConcurrentUpdateError:
+                    # Otro proceso cambió al usuario: se vuelve a validar
+                    if attempt == BATCH_ATTEMPTS - 1:
+                        raise
+
+        if recipient:
+            for operation in operations:
+                if operation["action"] != SUBSCRIBE:
+                    continue
+                try:
+                    await notification_outbox.enqueue(
+                        notification_type, recipient, catalog.get(operation["fund_id"]), user_id
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Error encolando la notificación: %s", e,
+                        extra={"user_id": user_id, "fund_id": operation["fund_id"]}
+                    )
+
+        return {
+            "success": True,
+            "message": f"{len(operations)} operaciones aplicadas",
+            "new_balance": user_data["balance"],
+            "results": [
+                {
+                    "action": operation["action"],
+                    "fund_id": operation["fund_id"],
+                    "transaction_id": transaction["id"],
+                    "amount": transaction["amount"]
+                }
+                for operation, transaction in zip(operations, transactions)
+            ]
+        }
+
+    @staticmethod
+    def _plan_operations(
+        user_id: str,
+        user_data: Dict,
+        operations: List[Dict],
+        catalog: CatalogSnapshot,
+        recipient: Optional[str],
+        notification_type: str
+    ) -> Tuple[Dict, List[Dict]]:
+        """
+        Estado final del usuario y transacciones de un lote (sin guardar).
+        Lanza ValueError con el número de la primera operación inválida.
+        """
+        balance = user_data["balance"]
+        subscribed = {f["id"]: f for f in user_data["subscribed_funds"]}
+        summary = copy_summary(user_data.get("summary"))
+        transactions = []
+        now = datetime.now()
+
+        for index, operation in enumerate(operations, 1):
+            fund_id = str(operation["fund_id"])
+            if operation["action"] == SUBSCRIBE:
+                fund = catalog.get(operation["fund_id"])
+                if fund_id in subscribed:
+                    raise ValueError(f"Operación {index}: Ya está suscrito a este fondo")
+                if balance < fund["monto_minimo"]:
+                    raise ValueError(
+                        f"Operación {index}: No tiene saldo disponible para vincularse al fondo {fund['nombre']}"
+                    )
+                subscription = {
+                    "id": fund_id,
+                    "name": fund["nombre"],
+                    "subscription_date": now.isoformat(),
+                    "amount": fund["monto_minimo"],
+                    "category": fund["categoria"]
+                }
+                if recipient:
+                    subscription["recipient"] = recipient
+                    subscription["notification_type"] = notification_type
+                subscribed[fund_id] = subscription
+                balance -= fund["monto_minimo"]
+                apply_delta(summary, subscription_delta(fund["monto_minimo"], fund["categoria"]))
+                transaction = TransactionModel.build_transaction(
+                    user_id, operation["fund_id"], "SUBSCRIPTION", fund["monto_minimo"], fund["nombre"]
+                )
+            else:
+                subscription = subscribed.pop(fund_id, None)
+                if subscription is None:
+                    raise ValueError(f"Operación {index}: No está suscrito a este fondo")
+                balance += subscription["amount"]
+                apply_delta(summary, cancellation_delta(
+                    subscription["amount"],
+                    subscription.get("category") or FundModel._category_of(catalog, fund_id)
+                ))
+                transaction = TransactionModel.build_transaction(
+                    user_id, operation["fund_id"], "CANCELLATION", subscription["amount"], subscription["name"]
+                )
+            # Fechas distintas y en orden: (user_id, timestamp) es la llave en DynamoDB
+            transaction["timestamp"] = (now + timedelta(microseconds=index)).isoformat()
+            transactions.append(transaction)
+
+        return dict(
+            user_data, balance=balance, subscribed_funds=list(subscribed.values()), summary=summary
+        ), transactions
+
+    @staticmethod
+    def _category_of(catalog: CatalogSnapshot, fund_id) -> str:
+        fund = catalog.get(int(fund_id)) if str(fund_id).isdigit() else None
+        return fund["categoria"] if fund else UNKNOWN_CATEGORY
+
+    @classmethod
+    async def get_balance(cls, user_id: str, as_of: Optional[str] = None) -> Dict:
+        """
+        Saldo del usuario, actual o con las transacciones hasta `as_of`
+        (inclusive) para auditoría
+        """
+        store = get_user_funds_store()
+        if as_of is None:
+            balance = (await store.get_user_funds(user_id))["balance"]
+        else:
+            balance = await store.balance_at(user_id, as_of)
+        return {"user_id": user_id, "balance": balance, "as_of": as_of}
+
+    @classmethod
+    async def get_portfolio_summary(cls, user_id: str) -> Dict:
+        """
+        Resumen del portafolio del usuario (se mantiene en cada escritura)
+        """
+        user_data = await get_user_funds_store().get_user_funds(user_id)
+        return dict(user_data["summary"], user_id=user_id, balance=user_data["balance"])
+
+    @classmethod
+    async def rebuild_portfolio_summary(cls, user_id: str, fix: bool = False) -> Dict:
+        """
+        Recalcular el resumen desde las transacciones del usuario y
+        compararlo con el guardado. Con fix=True se guarda el recalculado.
+        """
+        catalog = await cls.get_catalog()
+        store = get_user_funds_store()
+        async with USER_LOCKS.lock(user_id):
+            # Primero el registro versionado y después las transacciones: una
+            # escritura entre ambas lecturas cambia la versión y el guardado
+            # falla con ConcurrentUpdateError. Un error de lectura se lanza;
+            # un historial vacío por error borraría el resumen.
+            user_data = await store.get_user_funds(user_id)
+            transactions = from_dynamo(await TransactionModel.get_user_transactions(user_id, strict=True))
+            rebuilt = replay_summary(transactions, lambda fund_id: cls._category_of(catalog, fund_id))
+            stored = user_data["summary"]
+            consistent = _same_summary(stored, rebuilt)
+            if fix and not consistent:
+                user_data["summary"] = rebuilt
+                await store.save_user_funds(user_id, user_data)
+
+        return {
+            "user_id": user_id,
+            "consistent": consistent,
+            "stored": stored,
+            "summary": rebuilt
+        }
+
     @classmethod
     async def update_user_funds(cls, user_id: str, user_data: Dict):
         """
-        Actualizar los fondos y balance del usuario en la base de datos en memoria
+        Actualizar los fondos del usuario en el store configurado.
+        Si user_data trae la versión leída y el registro cambió desde
+        entonces, lanza ConcurrentUpdateError. El saldo debe coincidir con el
+        guardado: solo cambia registrando transacciones (ValueError si no).
         """
-        USER_FUNDS[user_id] = user_data
\ No newline at end of file
+        async with USER_LOCKS.lock(user_id):
+            await get_user_funds_store().save_user_funds(user_id, user_data)
+
+
+def _same_summary(stored: Dict, rebuilt: Dict) -> bool:
+    # Una categoría en 0 equivale a no tenerla
+    def normalized(summary):
+        exposure = {k: v for k, v in summary["exposure"].items() if v}
+        return dict(summary, exposure=exposure)
+    return normalized(stored) == normalized(rebuilt)
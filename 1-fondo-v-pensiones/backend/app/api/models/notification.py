@@ -1,21 +1,24 @@
-import boto3
+import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-# Configure AWS clients
-sns = boto3.client(
-    'sns',
-    region_name=os.environ.get('AWS_REGION', 'us-east-1'),
-    endpoint_url=os.environ.get('SNS_ENDPOINT', None)
-)
+from app.core.aws import get_client, call_aws
+from app.services.notification_outbox import notification_outbox
+from app.services.notification_templates import render_message_email
 
-ses = boto3.client(
-    'ses',
-    region_name=os.environ.get('AWS_REGION', 'us-east-1'),
-    endpoint_url=os.environ.get('SES_ENDPOINT', None)
-)
+logger = logging.getLogger(__name__)
 
 class NotificationModel:
+    @staticmethod
+    async def queue_notification(
+        recipient: str,
+        fund: Dict[str, Any],
+        notification_type: str = "email",
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Store a notification job; the outbox workers deliver it"""
+        return await notification_outbox.enqueue(notification_type.lower(), recipient, fund, user_id)
+
     @staticmethod
     async def send_notification(
         recipient: str, 
@@ -32,14 +35,16 @@ class NotificationModel:
             else:
                 return {"success": False, "message": "Invalid notification type"}
         except Exception as e:
-            print(f"Error sending notification: {str(e)}")
+            logger.error("Error sending notification: %s", e, extra={"channel": notification_type})
             return {"success": False, "message": str(e)}
     
     @staticmethod
     async def send_email(recipient: str, message: str, subject: str) -> Dict[str, Any]:
         """Send an email notification"""
         try:
-            response = ses.send_email(
+            subject, body_html, body_text = render_message_email(subject, message)
+            response = await call_aws(
+                get_client('ses').send_email,
                 Source=os.environ.get('EMAIL_SENDER', 'noreply@example.com'),
                 Destination={
                     'ToAddresses': [recipient]
@@ -47,8 +52,9 @@ class NotificationModel:
                 Message={
                     'Subject': {'Data': subject},
                     'Body': {
-                        'Text': {'Data': message},
-                        'Html': {'Data': f"<html><body><p>{message}</p></body></html>"}
+                        'Text': {'Data': body_text},
+                        # The message is HTML-escaped by the template
+                        'Html': {'Data': body_html}
                     }
                 }
             )
@@ -58,14 +64,15 @@ class NotificationModel:
                 "message_id": response.get('MessageId')
             }
         except Exception as e:
-            print(f"Error sending email: {str(e)}")
+            logger.error("Error sending email: %s", e, extra={"channel": "email"})
             return {"success": False, "message": str(e)}
     
     @staticmethod
     async def send_sms(phone_number: str, message: str) -> Dict[str, Any]:
         """Send an SMS notification"""
         try:
-            response = sns.publish(
+            response = await call_aws(
+                get_client('sns').publish,
                 PhoneNumber=phone_number,
                 Message=message,
                 MessageAttributes={
@@ -85,5 +92,5 @@ class NotificationModel:
                 "message_id": response.get('MessageId')
             }
         except Exception as e:
-            print(f"Error sending SMS: {str(e)}")
+            logger.error("Error sending SMS: %s", e, extra={"channel": "sms"})
             return {"success": False, "message": str(e)} 
\ No newline at end of file
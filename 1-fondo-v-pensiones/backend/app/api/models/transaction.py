@@ -1,43 +1,145 @@
-from typing import Dict, List, Any
-import boto3
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator
+import asyncio
+import base64
+import binascii
+import json
+import logging
 from boto3.dynamodb.conditions import Key
 import os
 from datetime import datetime
+from itertools import islice
 
-# Configure DynamoDB client
-dynamodb = boto3.resource(
-    'dynamodb',
-    region_name=os.environ.get('AWS_REGION', 'us-east-1'),
-    endpoint_url=os.environ.get('DYNAMODB_ENDPOINT', None)
-)
+from app.api.storage import get_backend_name, get_user_funds_store, DYNAMODB_BACKEND, SQLITE_BACKEND
+from app.api.storage.dynamodb import from_dynamo
+from app.api.storage.transaction_index import TransactionIndex
+from app.core.aws import get_table, call_aws
+from app.core.ids import new_id
 
-# DynamoDB transactions table
-transactions_table = dynamodb.Table(os.environ.get('TRANSACTIONS_TABLE', 'Transactions'))
+logger = logging.getLogger(__name__)
+
+def transactions_table():
+    """
+    DynamoDB transactions table (shared client, created on first use)
+    """
+    return get_table(os.environ.get('TRANSACTIONS_TABLE', 'Transactions'))
+
+# Simulación de base de datos en memoria para transacciones (indexada por
+# id y por usuario)
+TRANSACTIONS = TransactionIndex()
+
+# Tamaño de página del historial
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Transacciones por página al exportar el historial completo
+EXPORT_PAGE_SIZE = int(os.environ.get('TRANSACTION_EXPORT_PAGE_SIZE', '1000'))
+
+
+def encode_cursor(key: Dict[str, str]) -> str:
+    """
+    Convertir la llave de la última transacción en un cursor opaco
+    """
+    raw = json.dumps(key, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, user_id: str) -> Dict[str, str]:
+    """
+    Obtener la llave (user_id, timestamp) a partir de un cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, binascii.Error):
+        raise ValueError("Cursor inválido")
+    # Los cursores del índice en memoria y de SQLite llevan además el id de
+    # la última transacción (desempate entre timestamps iguales)
+    if not isinstance(key, dict) or set(key) - {"id"} != {"user_id", "timestamp"}:
+        raise ValueError("Cursor inválido")
+    if key["user_id"] != user_id:
+        raise ValueError("El cursor no corresponde a este usuario")
+    return key
+
+
+def _key_condition(user_id: str, start: Optional[str], end: Optional[str]):
+    condition = Key('user_id').eq(user_id)
+    if start and end:
+        return condition & Key('timestamp').between(start, end)
+    if start:
+        return condition & Key('timestamp').gte(start)
+    if end:
+        return condition & Key('timestamp').lte(end)
+    return condition
 
-# Simulación de base de datos en memoria para transacciones
-TRANSACTIONS = []
 
 class TransactionModel:
     @staticmethod
-    async def get_transactions(user_id: str = "default_user") -> List[Dict[str, Any]]:
-        """Get all transactions for a user"""
+    async def get_transactions(user_id: str = "default_user", strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all transactions for a user, latest first (ordered by DynamoDB).
+        Errors are logged and return []; with strict=True they are raised,
+        for callers that must not mistake a failed read for an empty history.
+        """
         try:
-            response = transactions_table.query(
-                KeyConditionExpression=Key('user_id').eq(user_id)
-            )
-            # Sort by timestamp descending (latest first)
-            transactions = response.get('Items', [])
-            transactions.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-            return transactions
+            query = {
+                "KeyConditionExpression": Key('user_id').eq(user_id),
+                "ScanIndexForward": False
+            }
+            transactions = []
+            while True:
+                response = await call_aws(transactions_table().query, **query)
+                transactions.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return transactions
+                query["ExclusiveStartKey"] = response['LastEvaluatedKey']
         except Exception as e:
-            print(f"Error getting transactions: {str(e)}")
+            logger.error("Error getting transactions: %s", e, extra={"user_id": user_id})
+            if strict:
+                raise
             return []
+
+    @staticmethod
+    async def get_transactions_page(
+        user_id: str = "default_user",
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of a user's transactions, latest first.
+
+        The sort key (timestamp) orders the results and bounds the optional
+        date range, so each call reads at most `limit` items.
+        """
+        query = {
+            "KeyConditionExpression": _key_condition(user_id, start, end),
+            "ScanIndexForward": False,
+            "Limit": limit
+        }
+        if cursor:
+            # (user_id, timestamp) es la llave de la tabla: no hay empates
+            key = decode_cursor(cursor, user_id)
+            query["ExclusiveStartKey"] = {"user_id": key["user_id"], "timestamp": key["timestamp"]}
+
+        response = await call_aws(transactions_table().query, **query)
+        last_key = response.get('LastEvaluatedKey')
+        return {
+            "items": response.get('Items', []),
+            "next_cursor": encode_cursor(last_key) if last_key else None
+        }
     
     @staticmethod
     async def get_transaction(transaction_id: str) -> Dict[str, Any]:
         """Get a specific transaction by ID"""
+        backend = get_backend_name()
+        if backend == SQLITE_BACKEND:
+            return await get_user_funds_store().transactions.get(transaction_id) or {}
+        if backend != DYNAMODB_BACKEND:
+            return TRANSACTIONS.get(transaction_id) or {}
         try:
-            response = transactions_table.query(
+            response = await call_aws(
+                transactions_table().query,
                 IndexName="id-index",
                 KeyConditionExpression=Key('id').eq(transaction_id)
             )
@@ -46,16 +148,16 @@ class TransactionModel:
                 return items[0]
             return {}
         except Exception as e:
-            print(f"Error getting transaction {transaction_id}: {str(e)}")
+            logger.error("Error getting transaction: %s", e, extra={"transaction_id": transaction_id})
             return {}
 
     @classmethod
-    async def add_transaction(cls, user_id: str, fund_id: int, transaction_type: str, amount: float, fund_name: str) -> Dict:
+    def build_transaction(cls, user_id: str, fund_id: int, transaction_type: str, amount: float, fund_name: str) -> Dict:
         """
-        Agregar una nueva transacción
+        Construir el registro de una transacción sin guardarlo
         """
-        transaction = {
-            "id": f"{transaction_type}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+        return {
+            "id": new_id(),
             "user_id": user_id,
             "fund_id": fund_id,
             "fund_name": fund_name,
@@ -63,13 +165,119 @@ class TransactionModel:
             "amount": amount,
             "timestamp": datetime.now().isoformat()
         }
-        TRANSACTIONS.append(transaction)
+
+    @classmethod
+    async def add_transaction(cls, user_id: str, fund_id: int, transaction_type: str, amount: float, fund_name: str) -> Dict:
+        """
+        Agregar una nueva transacción
+        """
+        transaction = cls.build_transaction(user_id, fund_id, transaction_type, amount, fund_name)
+        if get_backend_name() == SQLITE_BACKEND:
+            await get_user_funds_store().transactions.add_many([transaction])
+        else:
+            TRANSACTIONS.append(transaction)
         return transaction
 
     @classmethod
-    async def get_user_transactions(cls, user_id: str) -> List[Dict]:
+    async def get_user_transactions(cls, user_id: str, strict: bool = False) -> List[Dict]:
+        """
+        Obtener todas las transacciones de un usuario ordenadas por fecha
+        descendente. Con strict=True un error de lectura se lanza en vez de
+        devolver una lista vacía.
+        """
+        backend = get_backend_name()
+        if backend == DYNAMODB_BACKEND:
+            return await cls.get_transactions(user_id, strict)
+        if backend == SQLITE_BACKEND:
+            return (await get_user_funds_store().transactions.user_history(user_id))[0]
+        return TRANSACTIONS.user_history(user_id)
+
+    @classmethod
+    async def get_user_transactions_page(
+        cls,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Obtener todas las transacciones de un usuario ordenadas por fecha descendente
+        Obtener una página del historial del usuario (más recientes primero)
+        y el cursor de la siguiente página
         """
-        user_transactions = [t for t in TRANSACTIONS if t["user_id"] == user_id]
-        return sorted(user_transactions, key=lambda x: x["timestamp"], reverse=True) 
\ No newline at end of file
+        backend = get_backend_name()
+        if backend == DYNAMODB_BACKEND:
+            return await cls.get_transactions_page(user_id, limit, cursor, start, end)
+
+        key = decode_cursor(cursor, user_id) if cursor else {}
+        before, before_id = key.get("timestamp"), key.get("id")
+        if backend == SQLITE_BACKEND:
+            items, more = await get_user_funds_store().transactions.user_history(
+                user_id, limit, before, start, end, before_id
+            )
+        else:
+            items = TRANSACTIONS.user_history(user_id, limit, before, start, end, before_id)
+            more = bool(items) and TRANSACTIONS.count(user_id, start=start, end=end, before_id=items[-1]["id"]) > 0
+        next_cursor = None
+        if more:
+            last = items[-1]
+            next_cursor = encode_cursor({"user_id": user_id, "timestamp": last["timestamp"], "id": last["id"]})
+        return {"items": items, "next_cursor": next_cursor} 
+
+    @classmethod
+    async def open_history(
+        cls,
+        user_id: Optional[str] = None,
+        fund_id: Optional[int] = None,
+        after_id: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Historial completo de un usuario o de un fondo, más antiguas primero,
+        en páginas de EXPORT_PAGE_SIZE. `after_id` (la última transacción ya
+        recibida) se valida aquí, antes de empezar a leer.
+        """
+        if (user_id is None) == (fund_id is None):
+            raise ValueError("Indique un usuario o un fondo")
+
+        backend = get_backend_name()
+        if backend == SQLITE_BACKEND:
+            return await get_user_funds_store().transactions.open_history(
+                user_id, fund_id, after_id, EXPORT_PAGE_SIZE
+            )
+        if backend != DYNAMODB_BACKEND:
+            return _memory_pages(TRANSACTIONS.iter_history(user_id, fund_id, after_id))
+
+        query = {"ScanIndexForward": True, "Limit": EXPORT_PAGE_SIZE}
+        if user_id is not None:
+            query["KeyConditionExpression"] = Key('user_id').eq(user_id)
+        else:
+            query["IndexName"] = "fund-index"
+            query["KeyConditionExpression"] = Key('fund_id').eq(fund_id)
+
+        if after_id:
+            last = from_dynamo(await cls.get_transaction(after_id))
+            if not last or last["user_id" if user_id is not None else "fund_id"] != (user_id or fund_id):
+                raise ValueError("Cursor inválido")
+            query["ExclusiveStartKey"] = {"user_id": last["user_id"], "timestamp": last["timestamp"]}
+            if fund_id is not None:
+                query["ExclusiveStartKey"]["fund_id"] = last["fund_id"]
+        return _dynamodb_pages(query)
+
+
+async def _memory_pages(rows: Iterator[Dict]) -> AsyncIterator[List[Dict]]:
+    while True:
+        page = list(islice(rows, EXPORT_PAGE_SIZE))
+        if not page:
+            return
+        yield page
+        # Un historial grande no debe bloquear el event loop
+        await asyncio.sleep(0)
+
+
+async def _dynamodb_pages(query: Dict) -> AsyncIterator[List[Dict]]:
+    while True:
+        response = await call_aws(transactions_table().query, **query)
+        yield from_dynamo(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return
+        query["ExclusiveStartKey"] = response['LastEvaluatedKey']
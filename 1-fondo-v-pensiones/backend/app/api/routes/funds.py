@@ -1,29 +1,85 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Header, Request, Response
+from datetime import datetime
+from typing import Dict, List, Optional, Callable, Awaitable
 
 from app.api.models.fund import FundModel
+from app.api.storage import ConcurrentUpdateError
+from app.core.http_cache import cache_headers, is_not_modified
+from app.core.responses import JSONBytesResponse, ORJSONResponse
+from app.services.idempotency import (
+    idempotency_service,
+    IdempotencyKeyReusedError,
+    IdempotencyInProgressError
+)
+from app.services.idempotency_stores import FAILED
 from app.api.schemas.fund import (
     Fund,
     UserFunds,
+    UserBalance,
+    PortfolioSummary,
     FundSubscriptionRequest,
     FundSubscriptionResponse,
     FundCancellationRequest,
-    FundCancellationResponse
+    FundCancellationResponse,
+    FundBatchRequest,
+    FundBatchResponse
 )
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Fund])
-async def read_funds():
+@router.get("/", response_model=List[Fund], response_class=JSONBytesResponse)
+async def read_funds(
+    request: Request,
+    categoria: Optional[str] = None,
+    monto_maximo: Optional[float] = None
+):
+    """
+    Obtener los fondos disponibles, con ETag/Last-Modified para revalidar.
+    El JSON sale de los fondos ya serializados en la versión del catálogo.
+    """
+    catalog = await FundModel.get_catalog()
+    headers = cache_headers(catalog.etag, catalog.last_modified)
+    if is_not_modified(request, catalog.etag, catalog.last_modified):
+        return Response(status_code=304, headers=headers)
+    return JSONBytesResponse(catalog.search_json(categoria, monto_maximo), headers=headers)
+
+def _user_funds_payload(user_funds: Dict) -> Dict:
     """
-    Obtener todos los fondos disponibles
+    Campos del esquema UserFunds (sin versión, resumen ni categoría)
     """
-    return await FundModel.get_all_funds()
+    return {
+        "balance": float(user_funds["balance"]),
+        "subscribed_funds": [
+            {
+                "id": fund["id"],
+                "name": fund["name"],
+                "subscription_date": fund["subscription_date"],
+                "amount": float(fund["amount"])
+            }
+            for fund in user_funds["subscribed_funds"]
+        ]
+    }
 
-@router.get("/user", response_model=UserFunds)
+@router.get("/user", response_model=UserFunds, response_class=ORJSONResponse)
 async def get_user_funds(user_id: str = "default_user"):
     """Get user's balance and subscribed funds"""
-    return await FundModel.get_user_funds(user_id)
+    return ORJSONResponse(_user_funds_payload(await FundModel.get_user_funds(user_id)))
+
+@router.get("/user/balance", response_model=UserBalance)
+async def get_user_balance(user_id: str = "default_user", as_of: Optional[datetime] = None):
+    """
+    Saldo del usuario derivado del ledger. Con as_of, el saldo con las
+    transacciones hasta esa fecha (inclusive).
+    """
+    return await FundModel.get_balance(user_id, as_of.isoformat() if as_of else None)
+
+@router.get("/user/summary", response_model=PortfolioSummary)
+async def get_portfolio_summary(user_id: str = "default_user"):
+    """
+    Resumen del portafolio: invertido, exposición por categoría y montos
+    históricos suscritos/cancelados
+    """
+    return await FundModel.get_portfolio_summary(user_id)
 
 @router.get("/{fund_id}", response_model=Fund)
 async def read_fund(fund_id: int):
@@ -35,30 +91,85 @@ async def read_fund(fund_id: int):
         raise HTTPException(status_code=404, detail="Fondo no encontrado")
     return fund
 
+async def _run_once(
+    idempotency_key: Optional[str],
+    scope: str,
+    payload: dict,
+    execute: Callable[[], Awaitable[dict]],
+    response: Response
+) -> dict:
+    """
+    Ejecutar la operación; con Idempotency-Key, un reintento recibe la
+    respuesta (o el error) guardado de la primera ejecución
+    """
+    try:
+        if not idempotency_key:
+            return await execute()
+        record, replayed = await idempotency_service.run(scope, idempotency_key, payload, execute)
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except (ConcurrentUpdateError, IdempotencyInProgressError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    if record["status"] == FAILED:
+        raise HTTPException(
+            status_code=400,
+            detail=record["outcome"],
+            headers={"Idempotent-Replayed": "true"} if replayed else None
+        )
+    return record["outcome"]
+
 @router.post("/subscribe", response_model=FundSubscriptionResponse)
 async def subscribe_to_fund(
     subscription: FundSubscriptionRequest, 
-    user_id: str = "default_user"
+    response: Response,
+    user_id: str = "default_user",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Subscribe to a fund"""
-    try:
+    async def execute():
         return await FundModel.subscribe_to_fund(
             user_id=user_id,
-            fund_id=subscription.fund_id
+            fund_id=subscription.fund_id,
+            recipient=subscription.recipient,
+            notification_type=subscription.notification_type
         )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _run_once(idempotency_key, f"{user_id}:subscribe", subscription.model_dump(), execute, response)
 
 @router.post("/unsubscribe", response_model=FundCancellationResponse)
 async def unsubscribe_from_fund(
     cancellation: FundCancellationRequest, 
-    user_id: str = "default_user"
+    response: Response,
+    user_id: str = "default_user",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Unsubscribe from a fund"""
-    try:
+    async def execute():
         return await FundModel.unsubscribe_from_fund(
             user_id=user_id,
             fund_id=cancellation.fund_id
         )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+    return await _run_once(idempotency_key, f"{user_id}:unsubscribe", cancellation.model_dump(), execute, response)
+
+@router.post("/batch", response_model=FundBatchResponse)
+async def apply_fund_operations(
+    batch: FundBatchRequest,
+    response: Response,
+    user_id: str = "default_user",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Suscribir/cancelar varios fondos en una sola llamada (todas o ninguna)
+    """
+    async def execute():
+        return await FundModel.apply_operations(
+            user_id=user_id,
+            operations=[operation.model_dump() for operation in batch.operations],
+            recipient=batch.recipient,
+            notification_type=batch.notification_type
+        )
+    return await _run_once(idempotency_key, f"{user_id}:batch", batch.model_dump(), execute, response)
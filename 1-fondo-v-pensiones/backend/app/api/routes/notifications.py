@@ -2,32 +2,89 @@ from fastapi import APIRouter, HTTPException
 
 from app.api.models.notification import NotificationModel
 from app.api.models.fund import FundModel
-from app.api.schemas.notification import NotificationRequest, NotificationResponse
+from app.api.schemas.notification import (
+    BulkNotificationProgress,
+    BulkNotificationRequest,
+    ContactNotificationRequest,
+    NotificationJob,
+    NotificationRequest,
+    NotificationResponse,
+    QueuedNotificationResponse
+)
+from app.services.bulk_notification_service import bulk_notification_service
+from app.services.notification_outbox import notification_outbox
 
 router = APIRouter()
 
-@router.post("/", response_model=NotificationResponse)
+@router.post("/", response_model=NotificationResponse, status_code=202)
 async def send_notification(notification_request: NotificationRequest):
-    """Send a notification to the user about a fund subscription"""
+    """Queue a notification to the user about a fund subscription"""
     
     # Get fund information
-    fund = await FundModel.get_fund(notification_request.fund_id)
+    fund = None
+    if notification_request.fund_id.isdigit():
+        fund = await FundModel.get_fund(int(notification_request.fund_id))
     if not fund:
         raise HTTPException(status_code=404, detail="Fund not found")
     
-    # Create notification message
-    subject = f"Notificación - Fondo {fund['name']}"
-    message = f"Usted se ha vinculado exitosamente al fondo {fund['name']} con un monto de COP {fund['min_amount']:,}."
+    # The outbox workers send it; the request only stores the job
+    try:
+        job = await NotificationModel.queue_notification(
+            recipient=notification_request.recipient,
+            fund=fund,
+            notification_type=notification_request.notification_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Send notification
-    result = await NotificationModel.send_notification(
-        recipient=notification_request.recipient,
-        message=message,
-        subject=subject,
-        notification_type=notification_request.notification_type
+    return {
+        "success": True,
+        "message": "Notification queued",
+        "message_id": job["id"]
+    }
+
+@router.post("/send", response_model=QueuedNotificationResponse, status_code=202)
+async def send_contact_notification(request: ContactNotificationRequest):
+    """Encola la notificación con el formato del frontend (fund_id numérico)"""
+    fund = await FundModel.get_fund(request.fund_id)
+    if not fund:
+        raise HTTPException(status_code=404, detail="Fondo no encontrado")
+
+    job = await NotificationModel.queue_notification(
+        recipient=request.contact_info,
+        fund=fund,
+        notification_type=request.notification_type.value
     )
-    
-    if not result.get("success", False):
-        raise HTTPException(status_code=500, detail=result.get("message", "Error sending notification"))
-    
-    return result 
\ No newline at end of file
+
+    return QueuedNotificationResponse(
+        message=f"Notificación por {request.notification_type.value} en cola de envío",
+        id=job["id"]
+    )
+
+@router.post("/bulk", response_model=BulkNotificationProgress, status_code=202)
+async def send_bulk_notification(request: BulkNotificationRequest):
+    """Avisa a los suscriptores de un fondo (o a la lista indicada) en segundo plano"""
+    fund = await FundModel.get_fund(request.fund_id)
+    if not fund:
+        raise HTTPException(status_code=404, detail="Fondo no encontrado")
+
+    recipients = None
+    if request.recipients is not None:
+        recipients = [(r.notification_type.value, r.contact_info) for r in request.recipients]
+    return await bulk_notification_service.start(fund, recipients)
+
+@router.get("/bulk/{run_id}", response_model=BulkNotificationProgress)
+async def get_bulk_notification(run_id: str):
+    """Obtiene el progreso de un envío masivo"""
+    run = bulk_notification_service.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Envío masivo no encontrado")
+    return run
+
+@router.get("/{job_id}", response_model=NotificationJob)
+async def get_notification(job_id: str):
+    """Obtiene el estado de envío de una notificación"""
+    job = await notification_outbox.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Notificación no encontrada")
+    return job
@@ -1,17 +1,90 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+import re
 
-from app.api.models.transaction import TransactionModel
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Literal
+from datetime import datetime
+
+from app.api.models.transaction import TransactionModel, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.api.schemas.transaction import TransactionResponse
+from app.core.responses import ORJSONResponse
+from app.services.transaction_export import MEDIA_TYPES, NDJSON, export_stream
 
 router = APIRouter()
 
-@router.get("/", response_model=List[TransactionResponse])
-async def get_transactions(user_id: str = "default_user"):
+def _transaction_payload(transaction: Dict) -> Dict:
+    """
+    Campos del esquema TransactionResponse
     """
-    Obtener el historial de transacciones del usuario
+    return {
+        "id": transaction["id"],
+        "fund_id": int(transaction["fund_id"]),
+        "fund_name": transaction["fund_name"],
+        "type": transaction["type"],
+        "amount": float(transaction["amount"]),
+        "timestamp": transaction["timestamp"]
+    }
+
+@router.get("/", response_model=List[TransactionResponse], response_class=ORJSONResponse)
+async def get_transactions(
+    user_id: str = "default_user",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
     """
-    return await TransactionModel.get_user_transactions(user_id)
+    Obtener el historial de transacciones del usuario, más recientes primero.
+    Si hay más resultados, el header X-Next-Cursor trae el cursor de la
+    siguiente página. from_date y to_date son inclusivos.
+    """
+    try:
+        page = await TransactionModel.get_user_transactions_page(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            start=from_date.isoformat() if from_date else None,
+            end=to_date.isoformat() if to_date else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else None
+    return ORJSONResponse([_transaction_payload(t) for t in page["items"]], headers=headers)
+
+@router.get("/export")
+async def export_transactions(
+    user_id: Optional[str] = None,
+    fund_id: Optional[int] = None,
+    export_format: Literal["ndjson", "csv"] = Query(NDJSON, alias="format"),
+    gzip: bool = False,
+    cursor: Optional[str] = None
+):
+    """
+    Exportar el historial completo de un usuario (por defecto default_user)
+    o de un fondo, más antiguas primero, como NDJSON o CSV y opcionalmente
+    comprimido. Se transmite por páginas: la memoria no depende del tamaño.
+    Para continuar una descarga interrumpida, `cursor` es el id de la última
+    transacción recibida.
+    """
+    if user_id is not None and fund_id is not None:
+        raise HTTPException(status_code=400, detail="Indique un usuario o un fondo, no ambos")
+    if fund_id is None:
+        user_id = user_id or "default_user"
+    try:
+        pages = await TransactionModel.open_history(user_id=user_id, fund_id=fund_id, after_id=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    scope = f"fund-{fund_id}" if fund_id is not None else f"user-{re.sub(r'[^A-Za-z0-9_.-]', '_', user_id)}"
+    filename = f"transactions-{scope}.{export_format}"
+    if gzip:
+        filename += ".gz"
+    return StreamingResponse(
+        export_stream(pages, export_format, gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(transaction_id: str):
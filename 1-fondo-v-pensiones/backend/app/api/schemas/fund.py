@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Literal
 from datetime import datetime
 
 class FundBase(BaseModel):
@@ -23,8 +23,29 @@ class UserFunds(BaseModel):
     balance: float
     subscribed_funds: List[SubscribedFund]
 
+class UserBalance(BaseModel):
+    user_id: str
+    balance: float
+    # Fecha de corte; None es el saldo actual
+    as_of: Optional[str] = None
+
+class PortfolioSummary(BaseModel):
+    user_id: str
+    balance: float
+    total_invested: float
+    active_subscriptions: int
+    # Monto invertido por categoría de fondo (FPV, FIC)
+    exposure: Dict[str, float]
+    lifetime_subscribed: float
+    lifetime_cancelled: float
+    subscriptions: int
+    cancellations: int
+
 class FundSubscriptionRequest(BaseModel):
     fund_id: int
+    # Si se indica, se encola la notificación de la suscripción
+    recipient: Optional[str] = None
+    notification_type: str = "email"
 
 class FundSubscriptionResponse(BaseModel):
     success: bool
@@ -39,4 +60,27 @@ class FundCancellationResponse(BaseModel):
     success: bool
     message: str
     transaction_id: Optional[str] = None
-    new_balance: Optional[float] = None 
\ No newline at end of file
+    new_balance: Optional[float] = None
+
+class FundOperation(BaseModel):
+    action: Literal["subscribe", "unsubscribe"]
+    fund_id: int
+
+class FundBatchRequest(BaseModel):
+    # Se aplican en orden: una cancelación libera saldo para las siguientes
+    operations: List[FundOperation] = Field(..., min_length=1)
+    # Si se indica, se encola la notificación de cada suscripción
+    recipient: Optional[str] = None
+    notification_type: str = "email"
+
+class FundOperationResult(BaseModel):
+    action: str
+    fund_id: int
+    transaction_id: str
+    amount: float
+
+class FundBatchResponse(BaseModel):
+    success: bool
+    message: str
+    new_balance: float
+    results: List[FundOperationResult]
@@ -1,5 +1,10 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from enum import Enum
+from pydantic import BaseModel
+from typing import List, Optional
+
+class NotificationType(str, Enum):
+    email = "email"
+    sms = "sms"
 
 class NotificationRequest(BaseModel):
     recipient: str  # Email or phone number
@@ -9,4 +14,43 @@ class NotificationRequest(BaseModel):
 class NotificationResponse(BaseModel):
     success: bool
     message: str
-    message_id: Optional[str] = None 
\ No newline at end of file
+    message_id: Optional[str] = None
+
+class ContactNotificationRequest(BaseModel):
+    """Formato del frontend (POST /send)"""
+    fund_id: int
+    notification_type: NotificationType
+    contact_info: str  # Email o número de teléfono
+
+class QueuedNotificationResponse(BaseModel):
+    message: str
+    id: str  # Id del trabajo en el outbox
+
+class NotificationJob(BaseModel):
+    id: str
+    status: str  # pending, sent o dead
+    channel: NotificationType
+    recipient: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+class BulkRecipient(BaseModel):
+    notification_type: NotificationType
+    contact_info: str
+
+class BulkNotificationRequest(BaseModel):
+    fund_id: int
+    # Sin destinatarios se avisa a todos los suscriptores del fondo
+    recipients: Optional[List[BulkRecipient]] = None
+
+class BulkNotificationProgress(BaseModel):
+    id: str
+    fund_id: int
+    status: str  # running, completed o failed
+    total: int
+    sent: int
+    failed: int  # Pasan al outbox para reintentarse
+    started_at: float
+    finished_at: Optional[float] = None
@@ -13,6 +13,7 @@ class Transaction(BaseModel):
 
 class TransactionResponse(BaseModel):
     id: str
+    fund_id: int
     fund_name: str
     type: str
     amount: float
@@ -0,0 +1,59 @@
+# Iniciamos el modulo
+import os
+
+# Backends de persistencia disponibles para los fondos del usuario
+MEMORY_BACKEND = "memory"
+DYNAMODB_BACKEND = "dynamodb"
+SQLITE_BACKEND = "sqlite"
+
+INITIAL_BALANCE = 500000  # Balance inicial según requisitos
+
+_user_funds_store = None
+
+
+class ConcurrentUpdateError(ValueError):
+    """
+    El registro del usuario cambió desde que se leyó (versión distinta)
+    """
+
+    def __init__(self, user_id: str):
+        super().__init__(f"Los fondos del usuario {user_id} cambiaron durante la operación; intente de nuevo")
+        self.user_id = user_id
+
+
+def get_backend_name() -> str:
+    """
+    Obtener el backend de persistencia configurado (STORAGE_BACKEND)
+    """
+    return os.environ.get("STORAGE_BACKEND", MEMORY_BACKEND).lower()
+
+
+def get_user_funds_store():
+    """
+    Obtener (y crear la primera vez) el store de balance y suscripciones
+    """
+    global _user_funds_store
+    if _user_funds_store is None:
+        backend = get_backend_name()
+        if backend == DYNAMODB_BACKEND:
+            from app.api.storage.dynamodb import DynamoDBUserFundsStore
+            _user_funds_store = DynamoDBUserFundsStore()
+        elif backend == SQLITE_BACKEND:
+            from app.api.storage.sqlite import SQLiteUserFundsStore
+            _user_funds_store = SQLiteUserFundsStore()
+        elif backend == MEMORY_BACKEND:
+            from app.api.storage.memory import MemoryUserFundsStore
+            _user_funds_store = MemoryUserFundsStore()
+        else:
+            raise ValueError(f"Backend de persistencia no soportado: {backend}")
+    return _user_funds_store
+
+
+def reset_user_funds_store():
+    """
+    Descartar el store actual (se vuelve a crear según la configuración)
+    """
+    global _user_funds_store
+    if _user_funds_store is not None and hasattr(_user_funds_store, "close"):
+        _user_funds_store.close()
+    _user_funds_store = None
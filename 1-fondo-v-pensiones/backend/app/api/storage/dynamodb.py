@@ -0,0 +1,558 @@
+import os
+from decimal import Decimal
+from typing import Dict, Callable, Tuple, List, Optional, Any, AsyncIterator
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from app.api.storage import INITIAL_BALANCE, ConcurrentUpdateError
+from app.api.storage.ledger import entry_delta
+from app.api.storage.portfolio import (
+    COUNTERS,
+    UNKNOWN_CATEGORY,
+    cancellation_delta,
+    empty_summary,
+    subscription_delta
+)
+from app.core.aws import get_resource, get_table, call_aws
+
+# Definición de las tablas (igual que en cloudformation.yaml)
+TABLE_DEFINITIONS = [
+    {
+        "TableName": os.environ.get('FUNDS_TABLE', 'Funds'),
+        "KeySchema": [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        "AttributeDefinitions": [{'AttributeName': 'id', 'AttributeType': 'S'}],
+        "BillingMode": 'PAY_PER_REQUEST'
+    },
+    {
+        "TableName": os.environ.get('USER_FUNDS_TABLE', 'UserFunds'),
+        "KeySchema": [{'AttributeName': 'user_id', 'KeyType': 'HASH'}],
+        "AttributeDefinitions": [{'AttributeName': 'user_id', 'AttributeType': 'S'}],
+        "BillingMode": 'PAY_PER_REQUEST'
+    },
+    {
+        "TableName": os.environ.get('TRANSACTIONS_TABLE', 'Transactions'),
+        "KeySchema": [
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+        ],
+        "AttributeDefinitions": [
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'timestamp', 'AttributeType': 'S'},
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'fund_id', 'AttributeType': 'N'}
+        ],
+        "GlobalSecondaryIndexes": [
+            {
+                'IndexName': 'id-index',
+                'KeySchema': [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                # Historial de un fondo por fecha (exportaciones)
+                'IndexName': 'fund-index',
+                'KeySchema': [
+                    {'AttributeName': 'fund_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        ],
+        "BillingMode": 'PAY_PER_REQUEST'
+    },
+    {
+        "TableName": os.environ.get('NOTIFICATION_OUTBOX_TABLE', 'NotificationOutbox'),
+        "KeySchema": [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        "AttributeDefinitions": [
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'status', 'AttributeType': 'S'},
+            {'AttributeName': 'next_attempt_at', 'AttributeType': 'N'}
+        ],
+        "GlobalSecondaryIndexes": [
+            {
+                'IndexName': 'status-index',
+                'KeySchema': [
+                    {'AttributeName': 'status', 'KeyType': 'HASH'},
+                    {'AttributeName': 'next_attempt_at', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        ],
+        "BillingMode": 'PAY_PER_REQUEST'
+    },
+    {
+        "TableName": os.environ.get('IDEMPOTENCY_TABLE', 'IdempotencyKeys'),
+        "KeySchema": [{'AttributeName': 'key', 'KeyType': 'HASH'}],
+        "AttributeDefinitions": [{'AttributeName': 'key', 'AttributeType': 'S'}],
+        "BillingMode": 'PAY_PER_REQUEST'
+    }
+]
+
+# Intentos de leer un saldo pasado mientras el usuario sigue operando
+BALANCE_AT_ATTEMPTS = 3
+
+
+def create_tables(dynamodb) -> None:
+    """
+    Crear las tablas de la aplicación (moto / dynamodb-local)
+    """
+    for definition in TABLE_DEFINITIONS:
+        dynamodb.create_table(**definition)
+
+
+def to_dynamo(value: Any) -> Any:
+    """
+    Convertir floats a Decimal para poder guardarlos en DynamoDB
+    """
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dynamo(v) for v in value]
+    return value
+
+
+def from_dynamo(value: Any) -> Any:
+    """
+    Convertir los Decimal que devuelve DynamoDB a int/float
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: from_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [from_dynamo(v) for v in value]
+    return value
+
+
+class DynamoDBUserFundsStore:
+    """
+    Balance y suscripciones en la tabla UserFunds.
+
+    Cada suscripción/cancelación se escribe con un único TransactWriteItems
+    (balance + suscripción + transacción). Las reglas de saldo suficiente y de
+    suscripción duplicada son ConditionExpression, así que varias instancias
+    de la API pueden escribir sobre el mismo usuario sin un lock en Python.
+    Las suscripciones se guardan como un mapa por id de fondo para poder
+    condicionar sobre ellas. Cada escritura incrementa `version`, que
+    save_user_funds usa como bloqueo optimista. El resumen del portafolio son
+    atributos summary_* del mismo registro que cada escritura incrementa.
+    """
+
+    def __init__(self):
+        self.dynamodb = get_resource('dynamodb')
+        # El cliente del resource serializa los tipos de Python automáticamente
+        self.client = self.dynamodb.meta.client
+        self.user_funds_table_name = os.environ.get('USER_FUNDS_TABLE', 'UserFunds')
+        self.transactions_table_name = os.environ.get('TRANSACTIONS_TABLE', 'Transactions')
+        self.user_funds_table = get_table(self.user_funds_table_name)
+
+    async def get_user_funds(self, user_id: str) -> Dict:
+        """
+        Obtener los fondos y balance del usuario (lo crea si no existe)
+        """
+        return await call_aws(self._get_user_funds, user_id)
+
+    async def save_user_funds(self, user_id: str, user_data: Dict):
+        """
+        Reemplazar los fondos del usuario. Si user_data trae la versión
+        leída, se rechaza la escritura cuando el registro cambió. El balance
+        debe ser el guardado (ValueError si no): solo cambia junto con sus
+        transacciones, en subscribe, unsubscribe y save_batch.
+        """
+        await call_aws(self._save_user_funds, user_id, user_data)
+
+    async def subscribe(self, user_id: str, subscription: Dict, transaction: Dict) -> Dict:
+        """
+        Descontar el monto, agregar la suscripción y registrar la transacción
+        en una sola escritura condicional
+        """
+        return await call_aws(self._subscribe, user_id, subscription, transaction)
+
+    async def unsubscribe(
+        self,
+        user_id: str,
+        fund_id: str,
+        build_transaction: Callable[[Dict], Dict],
+        category: str = UNKNOWN_CATEGORY
+    ) -> Tuple[Dict, Dict]:
+        """
+        Devolver el monto de la suscripción al balance y registrar la transacción
+        en una sola escritura condicional. `category` es la del fondo si la
+        suscripción no la guardó.
+        """
+        return await call_aws(self._unsubscribe, user_id, fund_id, build_transaction, category)
+
+    async def save_batch(self, user_id: str, user_data: Dict, transactions: List[Dict]) -> Dict:
+        """
+        Guardar el resultado de varias operaciones y todas sus transacciones
+        en un solo TransactWriteItems, condicionado a la versión leída
+        """
+        return await call_aws(self._save_batch, user_id, user_data, transactions)
+
+    async def balance_at(self, user_id: str, timestamp: str) -> float:
+        """
+        Saldo del usuario con las transacciones hasta `timestamp` (inclusive):
+        el saldo actual menos los movimientos posteriores. Cada movimiento y
+        su saldo se escriben en el mismo TransactWriteItems, así que cuestan
+        solo las transacciones desde esa fecha.
+        """
+        return await call_aws(self._balance_at, user_id, timestamp)
+
+    async def iter_fund_subscribers(self, fund_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Recorrer los usuarios suscritos a un fondo: (user_id, suscripción).
+        Lee la tabla página a página; solo se proyecta la suscripción del fondo.
+        """
+        scan = {
+            "FilterExpression": 'attribute_exists(subscribed_funds.#fund_id)',
+            "ProjectionExpression": 'user_id, subscribed_funds.#fund_id',
+            "ExpressionAttributeNames": {'#fund_id': fund_id}
+        }
+        while True:
+            response = await call_aws(self.user_funds_table.scan, **scan)
+            for item in response.get('Items', []):
+                yield item["user_id"], from_dynamo(item["subscribed_funds"][fund_id])
+            if 'LastEvaluatedKey' not in response:
+                return
+            scan["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+    async def iter_user_ids(self) -> AsyncIterator[str]:
+        """
+        Recorrer los ids de todos los usuarios (página a página)
+        """
+        scan = {"ProjectionExpression": 'user_id'}
+        while True:
+            response = await call_aws(self.user_funds_table.scan, **scan)
+            for item in response.get('Items', []):
+                yield item["user_id"]
+            if 'LastEvaluatedKey' not in response:
+                return
+            scan["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+    # Las operaciones síncronas de boto3 corren en el pool de app.core.aws
+
+    def _get_user_funds(self, user_id: str) -> Dict:
+        item = self._get_item(user_id)
+        if item is None:
+            self._create_user(user_id)
+            item = self._get_item(user_id)
+        return self._to_user_data(item)
+
+    def _balance_at(self, user_id: str, timestamp: str) -> float:
+        transactions = get_table(self.transactions_table_name)
+        for _ in range(BALANCE_AT_ATTEMPTS):
+            item = self._get_item(user_id)
+            if item is None:
+                return INITIAL_BALANCE
+            balance = from_dynamo(item["balance"])
+            query = {
+                "KeyConditionExpression": Key('user_id').eq(user_id) & Key('timestamp').gt(timestamp),
+                "ProjectionExpression": '#type, amount',
+                "ExpressionAttributeNames": {'#type': 'type'},
+                "ConsistentRead": True
+            }
+            while True:
+                response = transactions.query(**query)
+                for entry in from_dynamo(response.get('Items', [])):
+                    balance -= entry_delta(entry)
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query["ExclusiveStartKey"] = response['LastEvaluatedKey']
+            # Si hubo una escritura entre la lectura del saldo y la consulta,
+            # los movimientos no corresponden a ese saldo
+            if from_dynamo(self._get_item(user_id).get("version", 0)) == from_dynamo(item.get("version", 0)):
+                return balance
+        raise ConcurrentUpdateError(user_id)
+
+    def _save_user_funds(self, user_id: str, user_data: Dict):
+        expected = user_data.get("version")
+        if expected is None and self._get_item(user_id) is None:
+            self._create_user(user_id)
+        clauses, names, values = [], {}, {}
+        if "summary" in user_data:
+            clauses, names, values = _summary_update(user_data["summary"], increment=False)
+        # El saldo solo cambia con transacciones: se escribe igual al guardado
+        # (condición balance = :balance) y nunca se reemplaza aquí
+        condition = 'balance = :balance'
+        values.update({
+            ':balance': user_data["balance"],
+            ':subscribed': {f["id"]: f for f in user_data["subscribed_funds"]},
+            ':one': 1
+        })
+        if expected is None:
+            # Sin versión leída la versión se sigue incrementando para que las
+            # escrituras condicionadas la vean
+            version = 'version = if_not_exists(version, :zero) + :one'
+            values[':zero'] = 0
+        else:
+            version = 'version = :expected + :one'
+            condition = f"({_version_condition(expected)}) AND {condition}"
+            values[':expected'] = expected
+        update = {
+            "Key": {'user_id': user_id},
+            "UpdateExpression": 'SET ' + ', '.join(['subscribed_funds = :subscribed', version] + clauses),
+            "ConditionExpression": condition,
+            "ExpressionAttributeValues": to_dynamo(values),
+            "ReturnValues": 'UPDATED_NEW'
+        }
+        if names:
+            update["ExpressionAttributeNames"] = names
+        try:
+            response = self.user_funds_table.update_item(**update)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            self._raise_save_conflict(user_id, expected, user_data["balance"])
+        user_data["version"] = from_dynamo(response['Attributes']['version'])
+
+    def _raise_save_conflict(self, user_id: str, expected: Optional[int], balance: float):
+        """
+        Distinguir por qué falló una escritura condicionada: el registro
+        cambió (ConcurrentUpdateError) o el saldo no es el guardado (ValueError)
+        """
+        item = self._get_item(user_id) or {}
+        if expected is not None and from_dynamo(item.get("version", 0)) != expected:
+            raise ConcurrentUpdateError(user_id)
+        if from_dynamo(item.get("balance")) != balance:
+            raise ValueError("El saldo solo cambia registrando transacciones")
+        raise ConcurrentUpdateError(user_id)
+
+    def _save_batch(self, user_id: str, user_data: Dict, transactions: List[Dict]) -> Dict:
+        expected = user_data["version"]
+        # El saldo leído: el nuevo menos lo que mueven estas transacciones
+        previous = user_data["balance"] - sum(entry_delta(t) for t in transactions)
+        clauses, names, values = _summary_update(user_data["summary"], increment=False)
+        items = [
+            {
+                'Update': {
+                    'TableName': self.user_funds_table_name,
+                    'Key': {'user_id': user_id},
+                    'UpdateExpression': 'SET ' + ', '.join(
+                        ['balance = :balance', 'subscribed_funds = :subscribed', 'version = :next'] + clauses
+                    ),
+                    'ConditionExpression': f"({_version_condition(expected)}) AND balance = :previous",
+                    'ExpressionAttributeNames': names,
+                    'ExpressionAttributeValues': to_dynamo(dict(values, **{
+                        ':balance': user_data["balance"],
+                        ':previous': previous,
+                        ':subscribed': {f["id"]: f for f in user_data["subscribed_funds"]},
+                        ':expected': expected,
+                        ':next': expected + 1
+                    }))
+                }
+            },
+            *[self._put_transaction(transaction) for transaction in transactions]
+        ]
+
+        reasons = self._transact(items)
+        if reasons:
+            if any(_failed(reasons, index) for index in range(1, len(items))):
+                raise ValueError("La transacción ya fue registrada")
+            self._raise_save_conflict(user_id, expected, previous)
+        user_data["version"] = expected + 1
+        return user_data
+
+    def _subscribe(self, user_id: str, subscription: Dict, transaction: Dict) -> Dict:
+        clauses, names, values = _summary_update(subscription_delta(
+            subscription["amount"], subscription.get("category", UNKNOWN_CATEGORY)
+        ))
+        items = [
+            {
+                'Update': {
+                    'TableName': self.user_funds_table_name,
+                    'Key': {'user_id': user_id},
+                    'UpdateExpression': 'SET ' + ', '.join([
+                        'balance = balance - :amount',
+                        'subscribed_funds.#fund_id = :subscription',
+                        'version = if_not_exists(version, :zero) + :one'
+                    ] + clauses),
+                    'ConditionExpression': 'balance >= :amount AND attribute_not_exists(subscribed_funds.#fund_id)',
+                    'ExpressionAttributeNames': dict(names, **{'#fund_id': subscription["id"]}),
+                    'ExpressionAttributeValues': to_dynamo(dict(values, **{
+                        ':amount': subscription["amount"],
+                        ':subscription': subscription,
+                        ':zero': 0,
+                        ':one': 1
+                    }))
+                }
+            },
+            self._put_transaction(transaction)
+        ]
+
+        reasons = self._transact(items)
+        if reasons and self._get_item(user_id) is None:
+            # Primer movimiento del usuario: se crea el registro y se reintenta
+            self._create_user(user_id)
+            reasons = self._transact(items)
+
+        if reasons:
+            self._raise_for_subscribe(user_id, subscription, reasons)
+
+        return self._get_user_funds(user_id)
+
+    def _unsubscribe(
+        self,
+        user_id: str,
+        fund_id: str,
+        build_transaction: Callable[[Dict], Dict],
+        category: str = UNKNOWN_CATEGORY
+    ) -> Tuple[Dict, Dict]:
+        item = self._get_item(user_id) or {}
+        subscription = item.get("subscribed_funds", {}).get(fund_id)
+        if not subscription:
+            raise ValueError("No está suscrito a este fondo")
+
+        subscription = from_dynamo(subscription)
+        transaction = build_transaction(subscription)
+        clauses, names, values = _summary_update(cancellation_delta(
+            subscription["amount"], subscription.get("category", category)
+        ))
+        items = [
+            {
+                'Update': {
+                    'TableName': self.user_funds_table_name,
+                    'Key': {'user_id': user_id},
+                    'UpdateExpression': 'SET ' + ', '.join([
+                        'balance = balance + :amount',
+                        'version = if_not_exists(version, :zero) + :one'
+                    ] + clauses) + ' REMOVE subscribed_funds.#fund_id',
+                    # La suscripción leída debe seguir siendo la misma al escribir
+                    'ConditionExpression': 'subscribed_funds.#fund_id.subscription_date = :subscription_date',
+                    'ExpressionAttributeNames': dict(names, **{'#fund_id': fund_id}),
+                    'ExpressionAttributeValues': to_dynamo(dict(values, **{
+                        ':amount': subscription["amount"],
+                        ':subscription_date': subscription["subscription_date"],
+                        ':zero': 0,
+                        ':one': 1
+                    }))
+                }
+            },
+            self._put_transaction(transaction)
+        ]
+
+        reasons = self._transact(items)
+        if reasons:
+            if _failed(reasons, 1):
+                raise ValueError("La transacción ya fue registrada")
+            raise ValueError("No está suscrito a este fondo")
+
+        return self._get_user_funds(user_id), transaction
+
+    def _get_item(self, user_id: str) -> Optional[Dict]:
+        response = self.user_funds_table.get_item(
+            Key={'user_id': user_id},
+            ConsistentRead=True
+        )
+        return response.get('Item')
+
+    def _create_user(self, user_id: str):
+        try:
+            self.user_funds_table.put_item(
+                Item={
+                    "user_id": user_id,
+                    "balance": Decimal(INITIAL_BALANCE),
+                    "subscribed_funds": {},
+                    "version": 0
+                },
+                ConditionExpression='attribute_not_exists(user_id)'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    def _put_transaction(self, transaction: Dict) -> Dict:
+        return {
+            'Put': {
+                'TableName': self.transactions_table_name,
+                'Item': to_dynamo(transaction),
+                # Nunca sobrescribir una transacción existente con la misma llave
+                'ConditionExpression': 'attribute_not_exists(user_id)'
+            }
+        }
+
+    def _transact(self, items: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Ejecutar TransactWriteItems. Devuelve las razones de cancelación o None
+        si la escritura se aplicó.
+        """
+        try:
+            self.client.transact_write_items(TransactItems=items)
+            return None
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            return e.response.get('CancellationReasons') or [{'Code': 'ConditionalCheckFailed'}]
+
+    def _raise_for_subscribe(self, user_id: str, subscription: Dict, reasons: List[Dict]):
+        if _failed(reasons, 1) and not _failed(reasons, 0):
+            raise ValueError("La transacción ya fue registrada")
+
+        # La base de datos ya rechazó la escritura; solo se lee para el mensaje
+        item = self._get_item(user_id) or {}
+        if subscription["id"] in item.get("subscribed_funds", {}):
+            raise ValueError("Ya está suscrito a este fondo")
+        raise ValueError(f"No tiene saldo disponible para vincularse al fondo {subscription['name']}")
+
+    @staticmethod
+    def _to_user_data(item: Dict) -> Dict:
+        subscribed = from_dynamo(item.get("subscribed_funds", {}))
+        return {
+            "balance": from_dynamo(item["balance"]),
+            "subscribed_funds": sorted(subscribed.values(), key=lambda f: f["subscription_date"]),
+            "summary": _summary_from_item(item),
+            "version": from_dynamo(item.get("version", 0))
+        }
+
+
+# Atributos del resumen del portafolio en el registro del usuario
+SUMMARY_PREFIX = "summary_"
+EXPOSURE_PREFIX = "summary_exposure_"
+
+
+def _summary_attributes(summary: Dict) -> Dict:
+    attributes = {SUMMARY_PREFIX + name: summary[name] for name in COUNTERS}
+    attributes.update({EXPOSURE_PREFIX + category: amount for category, amount in summary["exposure"].items()})
+    return attributes
+
+
+def _summary_from_item(item: Dict) -> Dict:
+    summary = empty_summary()
+    for name, value in item.items():
+        if name.startswith(EXPOSURE_PREFIX):
+            summary["exposure"][name[len(EXPOSURE_PREFIX):]] = from_dynamo(value)
+        elif name.startswith(SUMMARY_PREFIX) and name[len(SUMMARY_PREFIX):] in summary:
+            summary[name[len(SUMMARY_PREFIX):]] = from_dynamo(value)
+    return summary
+
+
+def _summary_update(summary: Dict, increment: bool = True) -> Tuple[List[str], Dict, Dict]:
+    """
+    Cláusulas SET que suman un delta al resumen (increment=True) o que
+    guardan un resumen completo, con sus nombres y valores
+    """
+    attributes = _summary_attributes(dict(empty_summary(), **summary))
+    if increment:
+        # Solo los contadores que cambian; la categoría nueva empieza en 0
+        attributes = {name: value for name, value in attributes.items() if value}
+    clauses, names, values = [], {}, {}
+    for index, (name, value) in enumerate(sorted(attributes.items())):
+        names[f"#s{index}"] = name
+        values[f":s{index}"] = value
+        if increment:
+            clauses.append(f"#s{index} = if_not_exists(#s{index}, :zero) + :s{index}")
+        else:
+            clauses.append(f"#s{index} = :s{index}")
+    return clauses, names, values
+
+
+def _version_condition(expected: int) -> str:
+    if expected == 0:
+        # Registros creados antes de que existiera la versión
+        return 'attribute_not_exists(version) OR version = :expected'
+    return 'version = :expected'
+
+
+def _failed(reasons: List[Dict], index: int) -> bool:
+    return len(reasons) > index and reasons[index].get('Code') == 'ConditionalCheckFailed'
@@ -0,0 +1,141 @@
+"""
+Ledger de saldos: cada transacción es un movimiento inmutable de la cuenta
+del usuario y el saldo se deriva de ellos.
+
+El saldo se calcula como la última foto (snapshot) más los movimientos
+posteriores. Se toma una foto cada `snapshot_every` movimientos, así que
+leer el saldo actual o el de una fecha suma a lo sumo snapshot_every - 1
+movimientos, sin recorrer el historial completo.
+"""
+import os
+from array import array
+from bisect import bisect_right
+from typing import Dict, Optional
+
+# Efecto de cada tipo de transacción sobre el saldo; otros tipos no lo cambian
+BALANCE_SIGNS = {
+    "SUBSCRIPTION": -1,
+    "CANCELLATION": 1
+}
+
+DEFAULT_SNAPSHOT_EVERY = int(os.environ.get('LEDGER_SNAPSHOT_EVERY', '1000'))
+
+
+def entry_delta(transaction: Dict) -> float:
+    """
+    Cambio del saldo que produce una transacción
+    """
+    return BALANCE_SIGNS.get(transaction["type"], 0) * float(transaction["amount"])
+
+
+class AccountLedger:
+    """
+    Movimientos de una cuenta ordenados por fecha: columnas array('q') con
+    los timestamps y array('d') con los deltas, y la foto del saldo después
+    de cada bloque de snapshot_every movimientos (la foto k cubre los
+    primeros (k + 1) * snapshot_every).
+    """
+    __slots__ = ("opening_balance", "snapshot_every", "timestamps", "deltas", "snapshots")
+
+    def __init__(self, opening_balance: float, snapshot_every: int):
+        self.opening_balance = float(opening_balance)
+        self.snapshot_every = snapshot_every
+        self.timestamps = array("q")
+        self.deltas = array("d")
+        self.snapshots = array("d")
+
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    def append(self, micros: int, delta: float):
+        if not self.timestamps or micros >= self.timestamps[-1]:
+            # Caso normal: los movimientos llegan en orden
+            self.timestamps.append(micros)
+            self.deltas.append(delta)
+            if len(self.deltas) % self.snapshot_every == 0:
+                self.snapshots.append(self._balance_until(len(self.deltas)))
+            return
+
+        position = bisect_right(self.timestamps, micros)
+        self.timestamps.insert(position, micros)
+        self.deltas.insert(position, delta)
+        # Las fotos desde ese movimiento en adelante quedaron desfasadas
+        del self.snapshots[position // self.snapshot_every:]
+        for end in range(len(self.snapshots) + 1, len(self.deltas) // self.snapshot_every + 1):
+            self.snapshots.append(self._balance_until(end * self.snapshot_every))
+
+    def balance(self) -> float:
+        """
+        Saldo actual
+        """
+        return self._balance_until(len(self.deltas))
+
+    def balance_at(self, micros: int) -> float:
+        """
+        Saldo con los movimientos hasta `micros` inclusive
+        """
+        return self._balance_until(bisect_right(self.timestamps, micros))
+
+    def entries_since_snapshot(self) -> int:
+        return len(self.deltas) - len(self.snapshots) * self.snapshot_every
+
+    def replay(self) -> float:
+        """
+        Saldo sumando todos los movimientos, sin fotos (para verificar)
+        """
+        return self.opening_balance + sum(self.deltas)
+
+    def _balance_until(self, end: int) -> float:
+        # Saldo después de los primeros `end` movimientos: la última foto
+        # dentro de ese rango más los movimientos que le siguen
+        taken = min(end // self.snapshot_every, len(self.snapshots))
+        if taken:
+            start, balance = taken * self.snapshot_every, self.snapshots[taken - 1]
+        else:
+            start, balance = 0, self.opening_balance
+        return balance + sum(self.deltas[start:end])
+
+
+class Ledger:
+    """
+    Cuentas de todos los usuarios, en memoria y solo de inserción
+    """
+
+    def __init__(self, opening_balance: float, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every debe ser mayor que 0")
+        self.opening_balance = opening_balance
+        self.snapshot_every = snapshot_every
+        self._accounts: Dict[str, AccountLedger] = {}
+
+    def append(self, user_id: str, micros: int, delta: float):
+        """
+        Registrar un movimiento de la cuenta (`micros`: su timestamp en
+        microsegundos desde epoch)
+        """
+        account = self._accounts.get(user_id)
+        if account is None:
+            account = self._accounts[user_id] = AccountLedger(self.opening_balance, self.snapshot_every)
+        account.append(micros, delta)
+
+    def account(self, user_id: str) -> Optional[AccountLedger]:
+        return self._accounts.get(user_id)
+
+    def balance(self, user_id: str) -> float:
+        """
+        Saldo actual del usuario
+        """
+        account = self._accounts.get(user_id)
+        return account.balance() if account is not None else float(self.opening_balance)
+
+    def balance_at(self, user_id: str, micros: int) -> float:
+        """
+        Saldo del usuario con los movimientos hasta `micros` (inclusive)
+        """
+        account = self._accounts.get(user_id)
+        if account is None:
+            return float(self.opening_balance)
+        return account.balance_at(micros)
+
+    def clear(self):
+        self._accounts.clear()
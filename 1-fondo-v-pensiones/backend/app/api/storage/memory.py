@@ -0,0 +1,172 @@
+from typing import Dict, Callable, Tuple, List, Iterable, AsyncIterator
+
+from app.api.models.transaction import TRANSACTIONS
+from app.api.storage import ConcurrentUpdateError
+from app.api.storage.ledger import entry_delta
+from app.api.storage.portfolio import (
+    UNKNOWN_CATEGORY,
+    apply_delta,
+    cancellation_delta,
+    copy_summary,
+    subscription_delta
+)
+
+# Simulación de base de datos en memoria
+USER_FUNDS = {
+    "default_user": {
+        "subscribed_funds": []
+    }
+}
+
+
+class MemoryUserFundsStore:
+    """
+    Balance y suscripciones en memoria del proceso (desarrollo y pruebas).
+
+    Cada registro lleva un número de versión: get_user_funds devuelve una
+    copia y save_user_funds solo la guarda si nadie la cambió desde que se
+    leyó (ConcurrentUpdateError si no).
+
+    El saldo sale del ledger de TRANSACTIONS (foto + movimientos
+    posteriores) y no se guarda en USER_FUNDS: solo cambia registrando
+    transacciones.
+    """
+
+    async def get_user_funds(self, user_id: str) -> Dict:
+        """
+        Obtener una copia de los fondos, balance y versión del usuario
+        """
+        if user_id not in USER_FUNDS:
+            USER_FUNDS[user_id] = {
+                "subscribed_funds": [],
+                "version": 0
+            }
+        user_data = USER_FUNDS[user_id]
+        return {
+            "balance": TRANSACTIONS.balance(user_id),
+            "subscribed_funds": list(user_data["subscribed_funds"]),
+            "summary": copy_summary(user_data.get("summary")),
+            "version": user_data.get("version", 0)
+        }
+
+    async def save_user_funds(self, user_id: str, user_data: Dict, pending: Iterable[Dict] = ()):
+        """
+        Reemplazar los fondos del usuario. Si user_data trae la versión
+        leída, se rechaza la escritura cuando el registro cambió.
+
+        El balance de user_data debe ser el del ledger más el de las
+        transacciones `pending` que se registran con esta escritura
+        (ValueError si no): un cambio de saldo sin transacción se perdería.
+        """
+        stored = USER_FUNDS.get(user_id, {})
+        current = stored.get("version", 0)
+        expected = user_data.get("version")
+        if expected is not None and expected != current:
+            raise ConcurrentUpdateError(user_id)
+        ledger_balance = TRANSACTIONS.balance(user_id) + sum(entry_delta(t) for t in pending)
+        if user_data["balance"] != ledger_balance:
+            raise ValueError("El saldo solo cambia registrando transacciones")
+        user_data["version"] = current + 1
+        USER_FUNDS[user_id] = {
+            "subscribed_funds": list(user_data["subscribed_funds"]),
+            "summary": copy_summary(user_data.get("summary", stored.get("summary"))),
+            "version": user_data["version"]
+        }
+
+    async def subscribe(self, user_id: str, subscription: Dict, transaction: Dict) -> Dict:
+        """
+        Descontar el monto, agregar la suscripción y registrar la transacción
+        """
+        user_data = await self.get_user_funds(user_id)
+
+        if any(f["id"] == subscription["id"] for f in user_data["subscribed_funds"]):
+            raise ValueError("Ya está suscrito a este fondo")
+
+        if user_data["balance"] < subscription["amount"]:
+            raise ValueError(f"No tiene saldo disponible para vincularse al fondo {subscription['name']}")
+
+        _check_new_transaction(transaction)
+        user_data["balance"] -= subscription["amount"]
+        user_data["subscribed_funds"].append(subscription)
+        apply_delta(user_data["summary"], subscription_delta(
+            subscription["amount"], subscription.get("category", UNKNOWN_CATEGORY)
+        ))
+        await self.save_user_funds(user_id, user_data, [transaction])
+        TRANSACTIONS.append(transaction)
+        return user_data
+
+    async def unsubscribe(
+        self,
+        user_id: str,
+        fund_id: str,
+        build_transaction: Callable[[Dict], Dict],
+        category: str = UNKNOWN_CATEGORY
+    ) -> Tuple[Dict, Dict]:
+        """
+        Devolver el monto de la suscripción al balance y registrar la transacción.
+        `category` es la del fondo si la suscripción no la guardó.
+        """
+        user_data = await self.get_user_funds(user_id)
+
+        subscription = None
+        for f in user_data["subscribed_funds"]:
+            if f["id"] == fund_id:
+                subscription = f
+                break
+
+        if not subscription:
+            raise ValueError("No está suscrito a este fondo")
+
+        transaction = build_transaction(subscription)
+        _check_new_transaction(transaction)
+        user_data["balance"] += subscription["amount"]
+        user_data["subscribed_funds"] = [
+            f for f in user_data["subscribed_funds"] if f["id"] != fund_id
+        ]
+        apply_delta(user_data["summary"], cancellation_delta(
+            subscription["amount"], subscription.get("category", category)
+        ))
+        await self.save_user_funds(user_id, user_data, [transaction])
+        TRANSACTIONS.append(transaction)
+        return user_data, transaction
+
+    async def save_batch(self, user_id: str, user_data: Dict, transactions: List[Dict]) -> Dict:
+        """
+        Guardar el resultado de varias operaciones (versionado, como
+        save_user_funds) y registrar todas sus transacciones
+        """
+        for transaction in transactions:
+            _check_new_transaction(transaction)
+        await self.save_user_funds(user_id, user_data, transactions)
+        for transaction in transactions:
+            TRANSACTIONS.append(transaction)
+        return user_data
+
+    async def balance_at(self, user_id: str, timestamp: str) -> float:
+        """
+        Saldo del usuario con las transacciones hasta `timestamp` (inclusive)
+        """
+        return TRANSACTIONS.balance_at(user_id, timestamp)
+
+    async def iter_user_ids(self) -> AsyncIterator[str]:
+        """
+        Recorrer los ids de todos los usuarios
+        """
+        for user_id in list(USER_FUNDS):
+            yield user_id
+
+    async def iter_fund_subscribers(self, fund_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Recorrer los usuarios suscritos a un fondo: (user_id, suscripción)
+        """
+        for user_id, user_data in list(USER_FUNDS.items()):
+            for subscription in user_data["subscribed_funds"]:
+                if subscription["id"] == fund_id:
+                    yield user_id, subscription
+
+
+def _check_new_transaction(transaction: Dict):
+    # Se valida antes de guardar el balance; la transacción se registra
+    # después de la escritura versionada (si esta falla no queda registrada)
+    if TRANSACTIONS.get(transaction["id"]) is not None:
+        raise ValueError("La transacción ya fue registrada")
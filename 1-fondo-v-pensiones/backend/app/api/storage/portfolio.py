@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, Callable, Optional
+
+# Resumen del portafolio guardado junto al balance del usuario. Cada
+# suscripción/cancelación le suma un delta en la misma escritura, así que
+# leerlo es O(1) y no hace falta recorrer el historial.
+COUNTERS = (
+    "total_invested",        # monto en fondos activos
+    "active_subscriptions",  # fondos activos
+    "lifetime_subscribed",   # monto suscrito histórico
+    "lifetime_cancelled",    # monto cancelado histórico
+    "subscriptions",         # suscripciones históricas
+    "cancellations"          # cancelaciones históricas
+)
+
+# Categoría de las suscripciones cuyo fondo ya no está en el catálogo
+UNKNOWN_CATEGORY = "SIN_CATEGORIA"
+
+
+def empty_summary() -> Dict:
+    summary = {name: 0 for name in COUNTERS}
+    summary["exposure"] = {}
+    return summary
+
+
+def copy_summary(summary: Optional[Dict]) -> Dict:
+    if summary is None:
+        return empty_summary()
+    return dict(summary, exposure=dict(summary["exposure"]))
+
+
+def subscription_delta(amount: float, category: str) -> Dict:
+    return {
+        "total_invested": amount,
+        "active_subscriptions": 1,
+        "lifetime_subscribed": amount,
+        "subscriptions": 1,
+        "exposure": {category: amount}
+    }
+
+
+def cancellation_delta(amount: float, category: str) -> Dict:
+    return {
+        "total_invested": -amount,
+        "active_subscriptions": -1,
+        "lifetime_cancelled": amount,
+        "cancellations": 1,
+        "exposure": {category: -amount}
+    }
+
+
+def apply_delta(summary: Dict, delta: Dict) -> Dict:
+    """
+    Sumar un delta al resumen (en el mismo dict)
+    """
+    for name in COUNTERS:
+        summary[name] += delta.get(name, 0)
+    for category, amount in delta.get("exposure", {}).items():
+        summary["exposure"][category] = summary["exposure"].get(category, 0) + amount
+    return summary
+
+
+def replay_summary(transactions: Iterable[Dict], category_of: Callable[[int], str]) -> Dict:
+    """
+    Recalcular el resumen desde el historial de transacciones
+    """
+    summary = empty_summary()
+    for transaction in transactions:
+        category = category_of(int(transaction["fund_id"]))
+        if transaction["type"] == "SUBSCRIPTION":
+            apply_delta(summary, subscription_delta(transaction["amount"], category))
+        elif transaction["type"] == "CANCELLATION":
+            apply_delta(summary, cancellation_delta(transaction["amount"], category))
+    return summary
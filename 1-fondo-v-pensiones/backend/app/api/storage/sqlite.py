@@ -0,0 +1,676 @@
+"""
+Backend de persistencia embebido: SQLite (WAL) con SQLAlchemy Core.
+
+- Un archivo (SQLITE_PATH, por defecto local_fondos.db) con los fondos, el
+  balance y las suscripciones de cada usuario y las transacciones.
+- Pool de conexiones (QueuePool) del mismo tamaño que el pool de hilos que
+  ejecuta las consultas (SQLITE_POOL_SIZE): el event loop nunca se bloquea
+  y un hilo nunca espera por una conexión.
+- WAL: las lecturas no esperan a las escrituras. Las escrituras abren con
+  BEGIN IMMEDIATE (toman el lock de escritura al empezar, sin deadlocks de
+  lectura que pasa a escritura) y dentro del proceso se serializan con un
+  lock, en lugar de reintentar contra busy_timeout.
+- Los valores van siempre como parámetros y las sentencias de cada
+  operación se construyen una sola vez: SQLAlchemy reusa su compilación y
+  sqlite3 el statement preparado de su caché por conexión.
+- Índices: transacciones por (user_id, timestamp) para el historial y el
+  saldo a una fecha, por (fund_id, timestamp) para las exportaciones, y el id
+  como llave primaria. Suscripciones por fondo para los avisos masivos.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    and_,
+    bindparam,
+    case,
+    create_engine,
+    delete,
+    event,
+    exists,
+    func,
+    insert,
+    select,
+    tuple_,
+    update
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
+
+from app.api.storage import INITIAL_BALANCE, ConcurrentUpdateError
+from app.api.storage.ledger import BALANCE_SIGNS, entry_delta
+from app.api.storage.portfolio import (
+    UNKNOWN_CATEGORY,
+    apply_delta,
+    cancellation_delta,
+    copy_summary,
+    empty_summary,
+    subscription_delta
+)
+
+# Fuera del control de versiones (fondos.db es el archivo versionado)
+DEFAULT_PATH = "local_fondos.db"
+
+# Filas por consulta al recorrer usuarios o suscriptores
+SCAN_PAGE_SIZE = 1000
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    # Con WAL, NORMAL no pierde consistencia (solo durabilidad ante un
+    # corte de energía en el último commit)
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY"
+)
+
+metadata = MetaData()
+
+# Mismo esquema que la tabla funds que ya existía en fondos.db
+funds = Table(
+    "funds", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nombre", String, index=True),
+    Column("monto_minimo", Float),
+    Column("categoria", String)
+)
+
+catalog_version = Table(
+    "catalog_version", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", String, nullable=False)
+)
+
+user_funds = Table(
+    "user_funds", metadata,
+    Column("user_id", String, primary_key=True),
+    Column("balance", Float, nullable=False),
+    Column("version", Integer, nullable=False),
+    # Resumen del portafolio (JSON)
+    Column("summary", Text, nullable=False)
+)
+
+subscriptions = Table(
+    "subscriptions", metadata,
+    Column("user_id", String, primary_key=True),
+    Column("fund_id", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("subscription_date", String, nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("category", String),
+    Column("recipient", String),
+    Column("notification_type", String),
+    Index("ix_subscriptions_fund", "fund_id", "user_id")
+)
+
+transactions = Table(
+    "transactions", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, nullable=False),
+    Column("fund_id", Integer, nullable=False),
+    Column("fund_name", String, nullable=False),
+    Column("type", String, nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("timestamp", String, nullable=False),
+    Index("ix_transactions_user_timestamp", "user_id", "timestamp"),
+    Index("ix_transactions_fund_timestamp", "fund_id", "timestamp")
+)
+
+SUBSCRIPTION_OPTIONAL = ("category", "recipient", "notification_type")
+
+# Sentencias construidas una vez; los valores van como parámetros
+_SELECT_USER = select(user_funds).where(user_funds.c.user_id == bindparam("user_id"))
+_CREATE_USER = insert(user_funds).prefix_with("OR IGNORE")
+# En UPDATE los parámetros no pueden llamarse como las columnas
+_UPDATE_USER = (
+    update(user_funds)
+    .where(user_funds.c.user_id == bindparam("owner"))
+    .values(balance=bindparam("new_balance"), summary=bindparam("new_summary"), version=bindparam("next_version"))
+)
+_UPDATE_USER_IF_VERSION = _UPDATE_USER.where(user_funds.c.version == bindparam("expected"))
+_SELECT_SUBSCRIPTIONS = (
+    select(subscriptions)
+    .where(subscriptions.c.user_id == bindparam("user_id"))
+    .order_by(subscriptions.c.subscription_date)
+)
+_INSERT_SUBSCRIPTION = insert(subscriptions)
+_DELETE_SUBSCRIPTION = delete(subscriptions).where(
+    subscriptions.c.user_id == bindparam("user_id"),
+    subscriptions.c.fund_id == bindparam("fund_id")
+)
+_DELETE_SUBSCRIPTIONS = delete(subscriptions).where(subscriptions.c.user_id == bindparam("user_id"))
+_INSERT_TRANSACTION = insert(transactions)
+_SELECT_TRANSACTION = select(transactions).where(transactions.c.id == bindparam("id"))
+
+# Cambio del saldo por transacción (como entry_delta del ledger)
+_DELTA = case(
+    *[(transactions.c.type == kind, transactions.c.amount * sign) for kind, sign in BALANCE_SIGNS.items()],
+    else_=0.0
+)
+_DELTA_AFTER = select(func.coalesce(func.sum(_DELTA), 0.0)).where(
+    transactions.c.user_id == bindparam("user_id"),
+    transactions.c.timestamp > bindparam("timestamp")
+)
+
+
+def create_sqlite_engine(path: str, pool_size: int) -> Engine:
+    """
+    Engine con el pool y la configuración de cada conexión
+    """
+    engine = create_engine(
+        f"sqlite:///{path}",
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        connect_args={
+            "check_same_thread": False,
+            # Espera por el lock de escritura de otro proceso (segundos)
+            "timeout": float(os.environ.get('SQLITE_BUSY_TIMEOUT', '5')),
+            # Statements preparados que sqlite3 guarda por conexión
+            "cached_statements": int(os.environ.get('SQLITE_STATEMENT_CACHE', '256'))
+        }
+    )
+
+    @event.listens_for(engine, "connect")
+    def configure(dbapi_connection, _record):
+        # Sin transacciones implícitas de sqlite3: el BEGIN lo emite "begin"
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin(connection: Connection):
+        if connection.get_execution_options().get("write"):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            connection.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+class SQLiteDatabase:
+    """
+    Engine, pool de hilos y esquema de un archivo SQLite
+    """
+
+    def __init__(self, path: Optional[str] = None, pool_size: Optional[int] = None):
+        self.path = path or os.environ.get('SQLITE_PATH', DEFAULT_PATH)
+        self.pool_size = pool_size or int(os.environ.get('SQLITE_POOL_SIZE', '8'))
+        self.engine = create_sqlite_engine(self.path, self.pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sqlite")
+        self._write_lock = threading.Lock()
+        metadata.create_all(self.engine)
+        self.transactions = SQLiteTransactionStore(self)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Ejecutar una función bloqueante en el pool de hilos de la base
+        """
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(context.run, fn, *args)
+        )
+
+    def read(self, fn: Callable[[Connection], Any]) -> Any:
+        """
+        Ejecutar `fn(conexión)` en una transacción de lectura (una misma
+        versión de la base en todas sus consultas)
+        """
+        with self.engine.connect() as connection:
+            with connection.begin():
+                return fn(connection)
+
+    def write(self, fn: Callable[[Connection], Any]) -> Any:
+        """
+        Ejecutar `fn(conexión)` en una transacción de escritura (commit al
+        terminar, rollback si lanza)
+        """
+        with self._write_lock, self.engine.connect() as connection:
+            connection.execution_options(write=True)
+            with connection.begin():
+                return fn(connection)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.engine.dispose()
+
+
+class SQLiteTransactionStore:
+    """
+    Transacciones en la tabla transactions, solo de inserción
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def get(self, transaction_id: str) -> Optional[Dict]:
+        def query(connection):
+            row = connection.execute(_SELECT_TRANSACTION, {"id": transaction_id}).first()
+            return dict(row._mapping) if row else None
+        return await self.database.run(self.database.read, query)
+
+    async def add_many(self, rows: List[Dict]):
+        """
+        Insertar varias transacciones en una sola transacción (executemany)
+        """
+        def insert_rows(connection):
+            insert_transactions(connection, rows)
+        await self.database.run(self.database.write, insert_rows)
+
+    async def user_history(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> Tuple[List[Dict], bool]:
+        """
+        Transacciones del usuario, más recientes primero, y si hay más
+        antes de la última. `before` es exclusivo, `start` y `end` inclusivos.
+        Con `before_id` el corte es el par (timestamp, id), el mismo orden
+        de las páginas.
+        """
+        conditions = [transactions.c.user_id == user_id]
+        if start:
+            conditions.append(transactions.c.timestamp >= start)
+        if end:
+            conditions.append(transactions.c.timestamp <= end)
+        window = and_(*conditions)
+        page = select(transactions).where(window)
+        if before and before_id:
+            page = page.where(tuple_(transactions.c.timestamp, transactions.c.id) < tuple_(before, before_id))
+        elif before:
+            page = page.where(transactions.c.timestamp < before)
+        page = page.order_by(transactions.c.timestamp.desc(), transactions.c.id.desc())
+        if limit is not None:
+            page = page.limit(limit)
+
+        def query(connection):
+            items = [dict(row._mapping) for row in connection.execute(page)]
+            more = False
+            if items and limit is not None and len(items) == limit:
+                last = tuple_(items[-1]["timestamp"], items[-1]["id"])
+                older = select(exists().where(window, tuple_(transactions.c.timestamp, transactions.c.id) < last))
+                more = connection.execute(older).scalar()
+            return items, more
+        return await self.database.run(self.database.read, query)
+
+    async def open_history(
+        self,
+        user_id: Optional[str],
+        fund_id: Optional[int],
+        after_id: Optional[str],
+        page_size: int
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Historial de un usuario o de un fondo en páginas, más antiguas
+        primero. Las páginas siguen el orden (timestamp, id); `after_id` se
+        valida aquí, antes de empezar a leer.
+        """
+        column = transactions.c.user_id if user_id is not None else transactions.c.fund_id
+        owner = user_id if user_id is not None else fund_id
+        position = None
+        if after_id:
+            last = await self.get(after_id)
+            if not last or last["user_id" if user_id is not None else "fund_id"] != owner:
+                raise ValueError("Cursor inválido")
+            position = (last["timestamp"], last["id"])
+        return self._pages(column, owner, position, page_size)
+
+    async def _pages(self, column, owner, position, page_size) -> AsyncIterator[List[Dict]]:
+        while True:
+            page = select(transactions).where(column == owner)
+            if position is not None:
+                page = page.where(tuple_(transactions.c.timestamp, transactions.c.id) > tuple_(*position))
+            page = page.order_by(transactions.c.timestamp, transactions.c.id).limit(page_size)
+
+            def query(connection, page=page):
+                return [dict(row._mapping) for row in connection.execute(page)]
+            rows = await self.database.run(self.database.read, query)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            position = (rows[-1]["timestamp"], rows[-1]["id"])
+
+
+def insert_transactions(connection: Connection, rows: List[Dict]):
+    if not rows:
+        return
+    try:
+        connection.execute(_INSERT_TRANSACTION, [_transaction_row(t) for t in rows])
+    except IntegrityError:
+        raise ValueError("La transacción ya fue registrada")
+
+
+class SQLiteUserFundsStore:
+    """
+    Balance y suscripciones en user_funds y subscriptions.
+
+    Cada suscripción/cancelación lee al usuario, valida y escribe balance,
+    suscripción y transacción en una sola transacción de escritura: con
+    BEGIN IMMEDIATE nadie más escribe entre la lectura y el commit, ni en
+    este proceso ni en otro. Como en los otros backends, cada escritura
+    incrementa `version`, que save_user_funds usa como bloqueo optimista.
+    """
+
+    def __init__(self, database: Optional[SQLiteDatabase] = None):
+        self.database = database or get_database()
+        self.transactions = self.database.transactions
+
+    async def get_user_funds(self, user_id: str) -> Dict:
+        """
+        Obtener los fondos y balance del usuario (lo crea si no existe)
+        """
+        user_data = await self.database.run(self.database.read, lambda c: _load_user(c, user_id))
+        if user_data is None:
+            user_data = await self.database.run(
+                self.database.write, lambda c: _load_user(c, user_id) or _create_user(c, user_id)
+            )
+        return user_data
+
+    async def save_user_funds(self, user_id: str, user_data: Dict):
+        """
+        Reemplazar los fondos del usuario. Si user_data trae la versión
+        leída, se rechaza la escritura cuando el registro cambió. El balance
+        debe ser el guardado (ValueError si no): solo cambia junto con sus
+        transacciones, en subscribe, unsubscribe y save_batch.
+        """
+        def write(connection):
+            _save_user(connection, user_id, user_data)
+        await self.database.run(self.database.write, write)
+
+    async def subscribe(self, user_id: str, subscription: Dict, transaction: Dict) -> Dict:
+        """
+        Descontar el monto, agregar la suscripción y registrar la transacción
+        """
+        def write(connection):
+            user_data = _load_user(connection, user_id) or _create_user(connection, user_id)
+            if any(f["id"] == subscription["id"] for f in user_data["subscribed_funds"]):
+                raise ValueError("Ya está suscrito a este fondo")
+            if user_data["balance"] < subscription["amount"]:
+                raise ValueError(f"No tiene saldo disponible para vincularse al fondo {subscription['name']}")
+
+            user_data["balance"] -= subscription["amount"]
+            user_data["subscribed_funds"].append(subscription)
+            apply_delta(user_data["summary"], subscription_delta(
+                subscription["amount"], subscription.get("category", UNKNOWN_CATEGORY)
+            ))
+            _update_user(connection, user_id, user_data)
+            connection.execute(_INSERT_SUBSCRIPTION, _subscription_row(user_id, subscription))
+            insert_transactions(connection, [transaction])
+            return user_data
+        return await self.database.run(self.database.write, write)
+
+    async def unsubscribe(
+        self,
+        user_id: str,
+        fund_id: str,
+        build_transaction: Callable[[Dict], Dict],
+        category: str = UNKNOWN_CATEGORY
+    ) -> Tuple[Dict, Dict]:
+        """
+        Devolver el monto de la suscripción al balance y registrar la transacción.
+        `category` es la del fondo si la suscripción no la guardó.
+        """
+        def write(connection):
+            user_data = _load_user(connection, user_id) or _create_user(connection, user_id)
+            subscription = next((f for f in user_data["subscribed_funds"] if f["id"] == fund_id), None)
+            if not subscription:
+                raise ValueError("No está suscrito a este fondo")
+
+            transaction = build_transaction(subscription)
+            user_data["balance"] += subscription["amount"]
+            user_data["subscribed_funds"] = [f for f in user_data["subscribed_funds"] if f["id"] != fund_id]
+            apply_delta(user_data["summary"], cancellation_delta(
+                subscription["amount"], subscription.get("category", category)
+            ))
+            _update_user(connection, user_id, user_data)
+            connection.execute(_DELETE_SUBSCRIPTION, {"user_id": user_id, "fund_id": fund_id})
+            insert_transactions(connection, [transaction])
+            return user_data, transaction
+        return await self.database.run(self.database.write, write)
+
+    async def save_batch(self, user_id: str, user_data: Dict, transactions: List[Dict]) -> Dict:
+        """
+        Guardar el resultado de varias operaciones (versionado, como
+        save_user_funds) y todas sus transacciones en una sola transacción
+        """
+        def write(connection):
+            _save_user(connection, user_id, user_data, transactions)
+            insert_transactions(connection, transactions)
+            return user_data
+        return await self.database.run(self.database.write, write)
+
+    async def balance_at(self, user_id: str, timestamp: str) -> float:
+        """
+        Saldo del usuario con las transacciones hasta `timestamp` (inclusive):
+        el saldo actual menos los movimientos posteriores, leídos en la misma
+        transacción
+        """
+        def query(connection):
+            row = connection.execute(_SELECT_USER, {"user_id": user_id}).first()
+            if row is None:
+                return INITIAL_BALANCE
+            later = connection.execute(_DELTA_AFTER, {"user_id": user_id, "timestamp": timestamp}).scalar()
+            return row.balance - later
+        return await self.database.run(self.database.read, query)
+
+    async def iter_user_ids(self) -> AsyncIterator[str]:
+        """
+        Recorrer los ids de todos los usuarios (por páginas)
+        """
+        last = ""
+        while True:
+            page = (
+                select(user_funds.c.user_id)
+                .where(user_funds.c.user_id > last)
+                .order_by(user_funds.c.user_id)
+                .limit(SCAN_PAGE_SIZE)
+            )
+            user_ids = await self.database.run(self.database.read, lambda c, page=page: c.execute(page).scalars().all())
+            for user_id in user_ids:
+                yield user_id
+            if len(user_ids) < SCAN_PAGE_SIZE:
+                return
+            last = user_ids[-1]
+
+    async def iter_fund_subscribers(self, fund_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Recorrer los usuarios suscritos a un fondo: (user_id, suscripción),
+        por páginas del índice de suscripciones por fondo
+        """
+        last = ""
+        while True:
+            page = (
+                select(subscriptions)
+                .where(subscriptions.c.fund_id == fund_id, subscriptions.c.user_id > last)
+                .order_by(subscriptions.c.user_id)
+                .limit(SCAN_PAGE_SIZE)
+            )
+            rows = await self.database.run(
+                self.database.read, lambda c, page=page: [dict(row._mapping) for row in c.execute(page)]
+            )
+            for row in rows:
+                yield row["user_id"], _to_subscription(row)
+            if len(rows) < SCAN_PAGE_SIZE:
+                return
+            last = rows[-1]["user_id"]
+
+    def close(self):
+        close_database()
+
+
+class SQLiteFundSource:
+    """
+    Fondos de la tabla funds; la versión del contenido está en
+    catalog_version (una consulta por revisión si no cambió)
+    """
+
+    async def version(self) -> Optional[str]:
+        database = get_database()
+        query = select(catalog_version.c.version).where(catalog_version.c.id == 1)
+        return await database.run(database.read, lambda c: c.execute(query).scalar())
+
+    async def load(self) -> List[Dict[str, Any]]:
+        database = get_database()
+        query = select(funds).order_by(funds.c.id)
+        return await database.run(database.read, lambda c: [dict(row._mapping) for row in c.execute(query)])
+
+    async def save(self, catalog: List[Dict[str, Any]]):
+        """
+        Reemplazar los fondos y la versión del catálogo (inserción en bloque)
+        """
+        from app.services.fund_catalog import content_version
+
+        def write(connection):
+            connection.execute(delete(funds))
+            connection.execute(insert(funds), [
+                {name: fund[name] for name in ("id", "nombre", "monto_minimo", "categoria")}
+                for fund in catalog
+            ])
+            connection.execute(
+                insert(catalog_version).prefix_with("OR REPLACE"),
+                {"id": 1, "version": content_version(catalog)}
+            )
+        database = get_database()
+        await database.run(database.write, write)
+
+
+def _load_user(connection: Connection, user_id: str) -> Optional[Dict]:
+    row = connection.execute(_SELECT_USER, {"user_id": user_id}).first()
+    if row is None:
+        return None
+    return {
+        "balance": row.balance,
+        "subscribed_funds": [
+            _to_subscription(dict(s._mapping))
+            for s in connection.execute(_SELECT_SUBSCRIPTIONS, {"user_id": user_id})
+        ],
+        "summary": json.loads(row.summary),
+        "version": row.version
+    }
+
+
+def _create_user(connection: Connection, user_id: str) -> Dict:
+    connection.execute(_CREATE_USER, {
+        "user_id": user_id,
+        "balance": INITIAL_BALANCE,
+        "version": 0,
+        "summary": json.dumps(empty_summary())
+    })
+    return _load_user(connection, user_id)
+
+
+def _update_user(connection: Connection, user_id: str, user_data: Dict):
+    # Solo dentro de una escritura que ya leyó al usuario
+    user_data["version"] += 1
+    connection.execute(_UPDATE_USER, {
+        "owner": user_id,
+        "new_balance": user_data["balance"],
+        "new_summary": json.dumps(user_data["summary"]),
+        "next_version": user_data["version"]
+    })
+
+
+def _save_user(connection: Connection, user_id: str, user_data: Dict, pending: Iterable[Dict] = ()):
+    current = _load_user(connection, user_id) or _create_user(connection, user_id)
+    expected = user_data.get("version")
+    if expected is not None and expected != current["version"]:
+        raise ConcurrentUpdateError(user_id)
+    # Como en el store en memoria: el balance es el guardado más lo que
+    # mueven las transacciones `pending` que se insertan con esta escritura
+    if user_data["balance"] != current["balance"] + sum(entry_delta(t) for t in pending):
+        raise ValueError("El saldo solo cambia registrando transacciones")
+    summary = copy_summary(user_data.get("summary", current["summary"]))
+    result = connection.execute(_UPDATE_USER_IF_VERSION, {
+        "owner": user_id,
+        "new_balance": user_data["balance"],
+        "new_summary": json.dumps(summary),
+        "next_version": current["version"] + 1,
+        "expected": current["version"]
+    })
+    if result.rowcount != 1:
+        raise ConcurrentUpdateError(user_id)
+    connection.execute(_DELETE_SUBSCRIPTIONS, {"user_id": user_id})
+    if user_data["subscribed_funds"]:
+        connection.execute(_INSERT_SUBSCRIPTION, [
+            _subscription_row(user_id, subscription) for subscription in user_data["subscribed_funds"]
+        ])
+    user_data["version"] = current["version"] + 1
+
+
+def _subscription_row(user_id: str, subscription: Dict) -> Dict:
+    row = {
+        "user_id": user_id,
+        "fund_id": subscription["id"],
+        "name": subscription["name"],
+        "subscription_date": subscription["subscription_date"],
+        "amount": subscription["amount"]
+    }
+    for name in SUBSCRIPTION_OPTIONAL:
+        row[name] = subscription.get(name)
+    return row
+
+
+def _to_subscription(row: Dict) -> Dict:
+    subscription = {
+        "id": row["fund_id"],
+        "name": row["name"],
+        "subscription_date": row["subscription_date"],
+        "amount": row["amount"]
+    }
+    for name in SUBSCRIPTION_OPTIONAL:
+        if row[name] is not None:
+            subscription[name] = row[name]
+    return subscription
+
+
+def _transaction_row(transaction: Dict) -> Dict:
+    return {name: transaction[name] for name in ("id", "user_id", "fund_id", "fund_name", "type", "amount", "timestamp")}
+
+
+_database: Optional[SQLiteDatabase] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> SQLiteDatabase:
+    """
+    Obtener (y crear la primera vez) la base configurada en SQLITE_PATH
+    """
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = SQLiteDatabase()
+    return _database
+
+
+def close_database():
+    """
+    Cerrar la base actual (se vuelve a abrir según la configuración)
+    """
+    global _database
+    with _database_lock:
+        if _database is not None:
+            _database.close()
+            _database = None
@@ -0,0 +1,256 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Iterator
+
+from app.api.storage import INITIAL_BALANCE
+from app.api.storage.ledger import Ledger, entry_delta
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def timestamp_to_micros(timestamp: str) -> int:
+    """
+    Convertir un timestamp ISO en microsegundos desde epoch (para ordenar)
+    """
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+class TransactionRecord:
+    """
+    Transacción inmutable con __slots__ (sin __dict__ por instancia)
+    """
+    __slots__ = ("id", "user_id", "fund_id", "fund_name", "type", "amount", "timestamp")
+
+    def __init__(self, transaction: Dict):
+        self.id = transaction["id"]
+        self.user_id = transaction["user_id"]
+        self.fund_id = transaction["fund_id"]
+        # Nombres de fondo y tipos se repiten en millones de registros
+        self.fund_name = sys.intern(transaction["fund_name"])
+        self.type = sys.intern(transaction["type"])
+        self.amount = transaction["amount"]
+        self.timestamp = transaction["timestamp"]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "fund_id": self.fund_id,
+            "fund_name": self.fund_name,
+            "type": self.type,
+            "amount": self.amount,
+            "timestamp": self.timestamp
+        }
+
+
+class UserTransactions:
+    """
+    Historial de un usuario (o de un fondo) ordenado por fecha: una columna
+    array('q') con los timestamps (para bisect) y la lista paralela de registros
+    """
+    __slots__ = ("timestamps", "records")
+
+    def __init__(self):
+        self.timestamps = array("q")
+        self.records: List[TransactionRecord] = []
+
+    def add(self, record: TransactionRecord, micros: Optional[int] = None):
+        if micros is None:
+            micros = timestamp_to_micros(record.timestamp)
+        if not self.timestamps or micros >= self.timestamps[-1]:
+            # Caso normal: las transacciones llegan en orden
+            self.timestamps.append(micros)
+            self.records.append(record)
+        else:
+            position = bisect_right(self.timestamps, micros)
+            self.timestamps.insert(position, micros)
+            self.records.insert(position, record)
+
+    def bounds(self, start: Optional[str], end: Optional[str], before: Optional[str]) -> slice:
+        """
+        Posiciones [lo, hi) de las transacciones con start <= timestamp <= end
+        y timestamp < before, en O(log n)
+        """
+        lo = bisect_left(self.timestamps, timestamp_to_micros(start)) if start else 0
+        hi = bisect_right(self.timestamps, timestamp_to_micros(end)) if end else len(self.timestamps)
+        if before:
+            hi = min(hi, bisect_left(self.timestamps, timestamp_to_micros(before)))
+        return slice(lo, max(lo, hi))
+
+    def position_after(self, record: TransactionRecord) -> int:
+        """
+        Posición siguiente a `record` (o -1 si no está en este historial)
+        """
+        micros = timestamp_to_micros(record.timestamp)
+        position = bisect_left(self.timestamps, micros)
+        while position < len(self.records) and self.timestamps[position] == micros:
+            if self.records[position] is record:
+                return position + 1
+            position += 1
+        return -1
+
+
+class TransactionIndex:
+    """
+    Almacén de transacciones en memoria, solo de inserción.
+
+    Indexa por id (búsqueda O(1)), por usuario (historial ordenado con
+    cortes por rango de fechas en O(log n)) y por fondo, en lugar de filtrar
+    y ordenar la lista global en cada consulta. Cada transacción es además
+    un movimiento del ledger del usuario, del que se derivan los saldos.
+    """
+
+    def __init__(self, ledger: Optional[Ledger] = None):
+        self._by_id: Dict[str, TransactionRecord] = {}
+        self._by_user: Dict[str, UserTransactions] = {}
+        self._by_fund: Dict[int, UserTransactions] = {}
+        self.ledger = ledger if ledger is not None else Ledger(INITIAL_BALANCE)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for record in self._by_id.values():
+            yield record.to_dict()
+
+    def append(self, transaction: Dict):
+        """
+        Registrar una transacción nueva
+        """
+        if transaction["id"] in self._by_id:
+            raise ValueError(f"Transacción duplicada: {transaction['id']}")
+        record = TransactionRecord(transaction)
+        delta = entry_delta(transaction)
+        micros = timestamp_to_micros(record.timestamp)
+        history = self._by_user.get(record.user_id)
+        if history is None:
+            history = self._by_user[record.user_id] = UserTransactions()
+        history.add(record, micros)
+        fund_history = self._by_fund.get(record.fund_id)
+        if fund_history is None:
+            fund_history = self._by_fund[record.fund_id] = UserTransactions()
+        fund_history.add(record, micros)
+        self.ledger.append(record.user_id, micros, delta)
+        self._by_id[record.id] = record
+
+    def balance(self, user_id: str) -> float:
+        """
+        Saldo actual del usuario según el ledger
+        """
+        return self.ledger.balance(user_id)
+
+    def balance_at(self, user_id: str, timestamp: str) -> float:
+        """
+        Saldo del usuario con las transacciones hasta `timestamp` (inclusive)
+        """
+        return self.ledger.balance_at(user_id, timestamp_to_micros(timestamp))
+
+    def get(self, transaction_id: str) -> Optional[Dict]:
+        """
+        Obtener una transacción por su id
+        """
+        record = self._by_id.get(transaction_id)
+        return record.to_dict() if record else None
+
+    def user_history(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Transacciones del usuario, más recientes primero. `before` es
+        exclusivo (cursor), `start` y `end` son inclusivos. Con `before_id`
+        (la última transacción de la página anterior) el corte es esa
+        posición, así que las de su mismo timestamp que no cupieron siguen.
+        """
+        history = self._by_user.get(user_id)
+        if history is None:
+            if before_id is not None:
+                raise ValueError("Cursor inválido")
+            return []
+        lo, hi = self._window(history, before, start, end, before_id)
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return [history.records[i].to_dict() for i in range(hi - 1, lo - 1, -1)]
+
+    def count(
+        self,
+        user_id: str,
+        before: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> int:
+        """
+        Cantidad de transacciones del usuario dentro del rango
+        """
+        history = self._by_user.get(user_id)
+        if history is None:
+            return 0
+        lo, hi = self._window(history, before, start, end, before_id)
+        return hi - lo
+
+    def _window(
+        self,
+        history: UserTransactions,
+        before: Optional[str],
+        start: Optional[str],
+        end: Optional[str],
+        before_id: Optional[str]
+    ):
+        if before_id is None:
+            window = history.bounds(start, end, before)
+            return window.start, window.stop
+        record = self._by_id.get(before_id)
+        position = history.position_after(record) - 1 if record is not None else -1
+        if position < 0:
+            raise ValueError("Cursor inválido")
+        window = history.bounds(start, end, None)
+        return window.start, max(window.start, min(window.stop, position))
+
+    def iter_history(
+        self,
+        user_id: Optional[str] = None,
+        fund_id: Optional[int] = None,
+        after_id: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Recorrer el historial de un usuario o de un fondo, más antiguas
+        primero, sin copiarlo. `after_id` es la última transacción ya
+        recibida (para continuar una exportación).
+        """
+        if user_id is not None:
+            history = self._by_user.get(user_id)
+        else:
+            history = self._by_fund.get(fund_id)
+        position = 0
+        if after_id is not None:
+            record = self._by_id.get(after_id)
+            position = history.position_after(record) if history is not None and record is not None else -1
+            if position < 0:
+                raise ValueError("Cursor inválido")
+        # El cursor se valida aquí, antes de empezar a recorrer
+        return self._iterate(history, position) if history is not None else iter(())
+
+    @staticmethod
+    def _iterate(history: UserTransactions, position: int) -> Iterator[Dict]:
+        # Se relee el largo: las transacciones nuevas también se recorren
+        while position < len(history.records):
+            yield history.records[position].to_dict()
+            position += 1
+
+    def clear(self):
+        self._by_id.clear()
+        self._by_user.clear()
+        self._by_fund.clear()
+        self.ledger.clear()
@@ -0,0 +1 @@
+# Iniciamos el modulo
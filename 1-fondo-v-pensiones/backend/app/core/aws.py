@@ -0,0 +1,193 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Callable, Any
+
+import boto3
+from botocore.config import Config
+
+from app.core.metrics import metrics
+
+# Variable de entorno con el endpoint de cada servicio (dynamodb-local, localstack)
+ENDPOINT_VARIABLES = {
+    "dynamodb": "DYNAMODB_ENDPOINT",
+    "ses": "SES_ENDPOINT",
+    "sns": "SNS_ENDPOINT",
+}
+
+_lock = threading.Lock()
+_session = None
+_clients: Dict[str, object] = {}
+_resources: Dict[str, object] = {}
+_tables: Dict[Tuple[str, str], object] = {}
+
+# Pool de hilos para las llamadas bloqueantes de boto3
+_executor = None
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def client_config() -> Config:
+    """
+    Configuración común de los clientes: tamaño del pool HTTP, keep-alive,
+    modo de reintentos y timeouts (todo configurable por variables de entorno)
+    """
+    return Config(
+        region_name=os.environ.get('AWS_REGION', 'us-east-1'),
+        max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50')),
+        tcp_keepalive=os.environ.get('AWS_TCP_KEEPALIVE', 'true').lower() == 'true',
+        connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '2')),
+        read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '10')),
+        retries={
+            'mode': os.environ.get('AWS_RETRY_MODE', 'standard'),
+            'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '3'))
+        }
+    )
+
+
+def _get_session():
+    # boto3.Session no es seguro entre hilos; se usa siempre bajo _lock
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
+def get_client(service: str):
+    """
+    Obtener el cliente compartido de un servicio (se crea en el primer uso)
+    """
+    client = _clients.get(service)
+    if client is None:
+        with _lock:
+            client = _clients.get(service)
+            if client is None:
+                client = _get_session().client(
+                    service,
+                    endpoint_url=os.environ.get(ENDPOINT_VARIABLES.get(service, ''), None) or None,
+                    config=client_config()
+                )
+                _clients[service] = client
+    return client
+
+
+def get_resource(service: str):
+    """
+    Obtener el resource compartido de un servicio (se crea en el primer uso)
+    """
+    resource = _resources.get(service)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(service)
+            if resource is None:
+                resource = _get_session().resource(
+                    service,
+                    endpoint_url=os.environ.get(ENDPOINT_VARIABLES.get(service, ''), None) or None,
+                    config=client_config()
+                )
+                _resources[service] = resource
+    return resource
+
+
+def get_table(table_name: str):
+    """
+    Obtener la tabla de DynamoDB `table_name` sobre el resource compartido
+    """
+    table = _tables.get(("dynamodb", table_name))
+    if table is None:
+        table = get_resource('dynamodb').Table(table_name)
+        _tables[("dynamodb", table_name)] = table
+    return table
+
+
+def set_client(service: str, client):
+    """
+    Registrar un cliente ya construido (dobles de prueba, benchmarks)
+    """
+    with _lock:
+        _clients[service] = client
+
+
+def reset_clients():
+    """
+    Descartar los clientes creados (cambio de configuración, pruebas con moto)
+    """
+    global _session
+    with _lock:
+        _session = None
+        _clients.clear()
+        _resources.clear()
+        _tables.clear()
+
+
+def _io_max_workers() -> int:
+    return int(os.environ.get('AWS_IO_MAX_WORKERS', '32'))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_io_max_workers(),
+                    thread_name_prefix="aws-io"
+                )
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Un semáforo por event loop (pruebas y Mangum pueden usar varios)
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        max_pending = int(os.environ.get('AWS_IO_MAX_PENDING', str(_io_max_workers() * 4)))
+        semaphore = _semaphores[loop] = asyncio.Semaphore(max_pending)
+    return semaphore
+
+
+async def call_aws(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Ejecutar una llamada bloqueante de boto3 sin bloquear el event loop.
+
+    La llamada corre en un pool de hilos acotado (AWS_IO_MAX_WORKERS). Como
+    mucho AWS_IO_MAX_PENDING llamadas esperan o corren a la vez; las demás
+    esperan aquí, en el event loop, en lugar de acumularse en la cola del
+    pool (backpressure). Con AWS_IO_MODE=inline se llama directamente, como
+    antes (útil para comparar en los benchmarks).
+
+    La duración (incluida la espera por el pool) y los errores quedan en
+    las métricas de la operación (aws_call_duration_seconds).
+    """
+    call_metrics = metrics.aws_call(fn)
+    started = time.perf_counter()
+    try:
+        if os.environ.get('AWS_IO_MODE', 'thread') == 'inline':
+            return fn(*args, **kwargs)
+
+        async with _get_semaphore():
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                _get_executor(),
+                functools.partial(context.run, fn, *args, **kwargs)
+            )
+    except Exception:
+        call_metrics.errors += 1
+        raise
+    finally:
+        call_metrics.latency.observe(time.perf_counter() - started)
+
+
+def shutdown_io():
+    """
+    Cerrar el pool de hilos de I/O (apagado de la aplicación)
+    """
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
@@ -0,0 +1,37 @@
+import os
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict
+
+from fastapi import Request
+
+
+def cache_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    """
+    Encabezados de validación (ETag / Last-Modified) de una respuesta
+    cacheable por clientes y CDNs durante HTTP_CACHE_MAX_AGE segundos
+    """
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": f"public, max-age={os.environ.get('HTTP_CACHE_MAX_AGE', '60')}"
+    }
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """
+    Si la copia del cliente sigue vigente (If-None-Match tiene prioridad
+    sobre If-Modified-Since, como indica RFC 9110)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
@@ -0,0 +1,98 @@
+import itertools
+import os
+import time
+import uuid
+from typing import Callable
+
+# Alfabeto Crockford base32 (sin I, L, O, U): los ids se ordenan como texto
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Cada entrada codifica 10 bits en 2 caracteres
+_PAIRS = [a + b for a in _ALPHABET for b in _ALPHABET]
+
+_NODE_BITS = 30
+_SEQUENCE_BITS = 50
+_SEQUENCE_MASK = (1 << _SEQUENCE_BITS) - 1
+
+
+def _encode(value: int, chars: int) -> str:
+    """
+    Codificar `value` en `chars` caracteres base32 (chars debe ser par)
+    """
+    return "".join(
+        _PAIRS[(value >> shift) & 1023]
+        for shift in range(5 * (chars - 2), -1, -10)
+    )
+
+
+class UlidGenerator:
+    """
+    Ids de 26 caracteres al estilo ULID: 48 bits de milisegundos, 30 bits de
+    nodo aleatorio por proceso y 50 bits de secuencia.
+
+    - Ordenables por tiempo como texto (el prefijo es el milisegundo).
+    - Monótonos dentro de un proceso: la secuencia sale de itertools.count,
+      cuyo next() es atómico con el GIL, así que no hace falta un lock.
+    - Únicos entre procesos/instancias: cada proceso (también tras un fork)
+      toma un nodo aleatorio de 30 bits y una secuencia con inicio aleatorio.
+    """
+
+    def __init__(self):
+        self._reseed()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reseed)
+
+    def _reseed(self):
+        node = int.from_bytes(os.urandom(4), "big") >> (32 - _NODE_BITS)
+        start = int.from_bytes(os.urandom(7), "big") >> (56 - _SEQUENCE_BITS + 1)
+        self._node = _encode(node, 6)
+        self._sequence = itertools.count(start)
+        # Tuplas (valor, texto) que se reemplazan de una vez: otro hilo nunca
+        # ve un texto que no corresponde a su valor
+        self._time = (0, _encode(0, 10))
+        self._high = (-1, "")
+
+    def __call__(self) -> str:
+        sequence = next(self._sequence) & _SEQUENCE_MASK
+        ms = time.time_ns() // 1_000_000
+        last_ms, prefix = self._time
+        if ms > last_ms:
+            # El prefijo de tiempo se codifica una vez por milisegundo. Si el
+            # reloj retrocede se conserva el último prefijo (monotonía).
+            prefix = _encode(ms, 10)
+            self._time = (ms, prefix)
+        high, high_chars = self._high
+        if sequence >> 20 != high:
+            # Los 30 bits altos de la secuencia cambian cada ~1M ids
+            high_chars = _encode(sequence >> 20, 6)
+            self._high = (sequence >> 20, high_chars)
+        return (
+            prefix + self._node + high_chars
+            + _PAIRS[(sequence >> 10) & 1023] + _PAIRS[sequence & 1023]
+        )
+
+
+def _uuid4() -> str:
+    return str(uuid.uuid4())
+
+
+_GENERATORS = {
+    "ulid": UlidGenerator,
+    "uuid4": lambda: _uuid4,
+}
+
+_generator: Callable[[], str] = _GENERATORS[os.environ.get("ID_GENERATOR", "ulid").lower()]()
+
+
+def new_id() -> str:
+    """
+    Generar un id nuevo con el generador configurado (ID_GENERATOR)
+    """
+    return _generator()
+
+
+def set_id_generator(generator: Callable[[], str]):
+    """
+    Reemplazar el generador de ids (por ejemplo en pruebas)
+    """
+    global _generator
+    _generator = generator
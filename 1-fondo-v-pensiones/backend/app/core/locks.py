@@ -0,0 +1,37 @@
+import asyncio
+import weakref
+import zlib
+
+
+class StripedLocks:
+    """
+    Locks asyncio por llave repartidos en `stripes` franjas fijas.
+
+    Dos llaves distintas solo se bloquean entre sí si caen en la misma
+    franja (hash % stripes), y la memoria no crece con la cantidad de
+    usuarios. Cada event loop tiene su propio juego de locks.
+    """
+
+    def __init__(self, stripes: int = 1024):
+        if stripes < 1:
+            raise ValueError("Se necesita al menos una franja")
+        self.stripes = stripes
+        self._locks = weakref.WeakKeyDictionary()
+
+    def _stripe(self, key: str) -> int:
+        # crc32 es estable entre procesos (hash() de str no lo es)
+        return zlib.crc32(key.encode()) % self.stripes
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """
+        Lock de la franja de `key` en el event loop actual
+        """
+        loop = asyncio.get_running_loop()
+        locks = self._locks.get(loop)
+        if locks is None:
+            locks = self._locks[loop] = {}
+        stripe = self._stripe(key)
+        lock = locks.get(stripe)
+        if lock is None:
+            lock = locks[stripe] = asyncio.Lock()
+        return lock
@@ -0,0 +1,218 @@
+"""
+Logging estructurado de la aplicación.
+
+- Salida JSON (una línea por registro) con el id de la petición y los
+  campos de contexto pasados en `extra` (user_id, fund_id, job_id, ...)
+- Los registros pasan por una cola acotada: en el event loop solo se
+  encola el registro; el formato y la escritura los hace un hilo aparte.
+  Si la cola se llena (p. ej. una ráfaga de errores con SES caído) se
+  descartan registros en lugar de bloquear, y después se avisa cuántos.
+- Muestreo de los registros INFO/DEBUG de alto volumen
+  (LOG_INFO_SAMPLE_RATE); WARNING y superiores se registran siempre.
+
+Configuración (variables de entorno): LOG_LEVEL (INFO), LOG_FORMAT
+(json o text), LOG_INFO_SAMPLE_RATE (1.0), LOG_QUEUE_SIZE (10000).
+"""
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import orjson
+
+from app.core.ids import new_id
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Id de la petición en curso; call_aws copia el contexto a sus hilos
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos propios de LogRecord: todo lo demás viene de `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id", "taskName"
+}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Un objeto JSON por registro
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Tomar el id de la petición en el hilo que registra (antes de encolar)
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Dejar pasar solo una fracción `rate` de los registros por debajo de
+    WARNING
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloquea: con la cola llena descarta el registro
+    y lo cuenta. Tampoco formatea: el registro viaja tal cual al hilo del
+    QueueListener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        # enqueue corre en cualquier hilo: el contador se lee, incrementa y
+        # reinicia bajo este lock (put_nowait no bloquea)
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        with self._dropped_lock:
+            try:
+                if self.dropped:
+                    # Primero el aviso de lo descartado, luego el registro nuevo
+                    self.queue.put_nowait(self._dropped_notice(self.dropped))
+                    self.dropped = 0
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    @staticmethod
+    def _dropped_notice(dropped: int) -> logging.LogRecord:
+        notice = logging.LogRecord(
+            "app.core.logs", logging.WARNING, __file__, 0,
+            "Se descartaron %d registros de log (cola llena)", (dropped,), None
+        )
+        notice.dropped = dropped
+        notice.request_id = None
+        return notice
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(stream=None) -> NonBlockingQueueHandler:
+    """
+    Instalar el logging estructurado en el logger raíz (una sola vez; las
+    llamadas siguientes devuelven el handler ya instalado)
+    """
+    global _handler, _listener
+    if _handler is not None:
+        return _handler
+
+    if os.environ.get("LOG_FORMAT", "json").lower() == "text":
+        formatter = logging.Formatter(TEXT_FORMAT)
+    else:
+        formatter = JSONFormatter()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(formatter)
+
+    handler = NonBlockingQueueHandler(queue.Queue(int(os.environ.get("LOG_QUEUE_SIZE", "10000"))))
+    handler.addFilter(SamplingFilter(float(os.environ.get("LOG_INFO_SAMPLE_RATE", "1.0"))))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    root.addHandler(handler)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    _handler = handler
+    return handler
+
+
+def shutdown_logging():
+    """
+    Escribir lo que quede en la cola y quitar el handler (apagado)
+    """
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+    _handler = _listener = None
+
+
+def _valid_request_id(value: str) -> bool:
+    return 0 < len(value) <= 128 and value.isascii() and value.isprintable()
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI: toma el X-Request-ID entrante (o genera uno), lo deja
+    en request_id_var para los logs de la petición y lo devuelve en la
+    respuesta
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._header = REQUEST_ID_HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self._header:
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None or not _valid_request_id(request_id):
+            request_id = new_id()
+        header = (self._header, request_id.encode())
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
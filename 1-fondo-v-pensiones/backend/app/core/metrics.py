@@ -0,0 +1,225 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+
+- Latencia por ruta (histograma), respuestas por clase de estado y
+  peticiones en curso (MetricsMiddleware)
+- Latencia y errores de cada llamada a AWS por servicio y operación
+  (call_aws), p. ej. dynamodb/query, ses/send_email, sns/publish
+
+Todo se actualiza desde el hilo del event loop (las llamadas a AWS se miden
+alrededor del await, no en el pool de hilos), así que los contadores son
+enteros simples sin locks. Cada ruta u operación tiene su objeto de métricas,
+creado una vez con sus etiquetas ya formateadas: registrar una petición no
+arma dicts de etiquetas ni strings.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Límites superiores (segundos) de los buckets de los histogramas
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "<sin_ruta>"
+# Métodos con etiqueta propia; cualquier otro (lo elige el cliente) va a
+# OTHER_METHOD para que las series no crezcan sin límite
+STANDARD_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"))
+OTHER_METHOD = "OTHER"
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+class Histogram:
+    """
+    Histograma de latencias con buckets fijos
+    """
+    __slots__ = ("labels", "bounds", "counts", "sum", "count")
+
+    def __init__(self, labels: str, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.labels = labels
+        self.bounds = bounds
+        # Un contador por bucket más el de +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def render(self, name: str, lines: List[str]):
+        cumulative = 0
+        prefix = f"{name}_bucket{{{self.labels},le=" if self.labels else f"{name}_bucket{{le="
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{prefix}"{bound}"}} {cumulative}')
+        lines.append(f'{prefix}"+Inf"}} {self.count}')
+        suffix = f"{{{self.labels}}}" if self.labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+
+
+class RouteMetrics:
+    """
+    Latencia y respuestas por clase de estado de una ruta y un método
+    """
+    __slots__ = ("latency", "statuses")
+
+    def __init__(self, method: str, route: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.latency = Histogram(format_labels(method=method, route=route), buckets)
+        self.statuses = [0] * len(STATUS_CLASSES)
+
+    def record(self, status: int, seconds: float):
+        self.latency.observe(seconds)
+        self.statuses[min(max(status // 100, 1), 5) - 1] += 1
+
+
+class AWSCallMetrics:
+    """
+    Latencia y errores de una operación de AWS
+    """
+    __slots__ = ("latency", "errors")
+
+    def __init__(self, service: str, operation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.latency = Histogram(format_labels(service=service, operation=operation), buckets)
+        self.errors = 0
+
+
+def aws_call_labels(fn: Callable) -> Tuple[str, str]:
+    """
+    (servicio, operación) de un método de un cliente o resource de boto3.
+    Otras funciones (p. ej. un batch_writer envuelto) van como servicio "aws".
+    """
+    owner = getattr(fn, "__self__", None)
+    meta = getattr(owner, "meta", None)
+    # Los resources (Table) tienen el cliente en meta.client
+    client_meta = getattr(getattr(meta, "client", None), "meta", meta)
+    service_model = getattr(client_meta, "service_model", None)
+    service = getattr(service_model, "service_name", None) or "aws"
+    return service, getattr(fn, "__name__", "unknown")
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        # {id(ruta): (ruta, {método: RouteMetrics})}; las rutas de FastAPI no
+        # son hashables. Se guarda la ruta para que su id no se reutilice.
+        self._routes: Dict[int, Tuple[object, Dict[str, RouteMetrics]]] = {}
+        self._route_order: List[RouteMetrics] = []
+        # Por función de boto3 (estable por cliente) y por etiquetas
+        self._aws_by_function: Dict[Callable, AWSCallMetrics] = {}
+        self._aws_by_labels: Dict[Tuple[str, str], AWSCallMetrics] = {}
+
+    def route(self, route: Optional[object], method: str) -> RouteMetrics:
+        """
+        Métricas de la ruta (APIRoute de FastAPI, o None si no hubo match)
+        """
+        if method not in STANDARD_METHODS:
+            method = OTHER_METHOD
+        entry = self._routes.get(id(route))
+        if entry is None:
+            entry = self._routes[id(route)] = (route, {})
+        by_method = entry[1]
+        metrics = by_method.get(method)
+        if metrics is None:
+            path = getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+            metrics = by_method[method] = RouteMetrics(method, path, self.buckets)
+            self._route_order.append(metrics)
+        return metrics
+
+    def aws_call(self, fn: Callable) -> AWSCallMetrics:
+        """
+        Métricas de la operación de AWS que ejecuta `fn`
+        """
+        function = getattr(fn, "__func__", None)
+        if function is not None:
+            metrics = self._aws_by_function.get(function)
+            if metrics is not None:
+                return metrics
+        labels = aws_call_labels(fn)
+        metrics = self._aws_by_labels.get(labels)
+        if metrics is None:
+            metrics = self._aws_by_labels[labels] = AWSCallMetrics(*labels, self.buckets)
+        if function is not None:
+            self._aws_by_function[function] = metrics
+        return metrics
+
+    def render(self) -> str:
+        """
+        Todas las métricas en formato de texto de Prometheus
+        """
+        lines = [
+            "# HELP http_requests_in_flight Peticiones HTTP en curso",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_request_duration_seconds Latencia de las peticiones HTTP por ruta",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        for metrics in self._route_order:
+            metrics.latency.render("http_request_duration_seconds", lines)
+        lines += [
+            "# HELP http_responses_total Respuestas HTTP por ruta y clase de estado",
+            "# TYPE http_responses_total counter"
+        ]
+        for metrics in self._route_order:
+            for status, count in zip(STATUS_CLASSES, metrics.statuses):
+                if count:
+                    lines.append(f'http_responses_total{{{metrics.latency.labels},status="{status}"}} {count}')
+        lines += [
+            "# HELP aws_call_duration_seconds Latencia de las llamadas a AWS por operación",
+            "# TYPE aws_call_duration_seconds histogram"
+        ]
+        for metrics in self._aws_by_labels.values():
+            metrics.latency.render("aws_call_duration_seconds", lines)
+        lines += [
+            "# HELP aws_call_errors_total Llamadas a AWS que terminaron en error",
+            "# TYPE aws_call_errors_total counter"
+        ]
+        for metrics in self._aws_by_labels.values():
+            lines.append(f"aws_call_errors_total{{{metrics.latency.labels}}} {metrics.errors}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP. La ruta se toma de
+    scope["route"] (la deja FastAPI al hacer match), así que la etiqueta es
+    la plantilla (/api/funds/{fund_id}) y no la URL.
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            registry.route(scope.get("route"), scope["method"]).record(status, time.perf_counter() - started)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,33 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Limitador de tasa (token bucket) para el event loop.
+
+    `rate` tokens por segundo con ráfagas de hasta `capacity`. Cada acquire
+    reserva sus tokens de inmediato (el saldo puede quedar negativo) y espera
+    hasta que la deuda se paga, así los que llegan después esperan detrás y
+    una petición mayor que la capacidad (un lote de 50 emails) también pasa.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("La tasa debe ser mayor que cero")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self, tokens: float = 1):
+        """
+        Esperar hasta poder consumir `tokens`
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= tokens
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
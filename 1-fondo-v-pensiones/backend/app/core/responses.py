@@ -0,0 +1,36 @@
+"""
+Respuestas JSON para los endpoints de lectura más frecuentes.
+
+Con response_model, FastAPI valida cada respuesta con Pydantic y la
+codifica con json; en endpoints tan pequeños eso domina el tiempo de la
+petición. Los endpoints que lo eligen devuelven directamente:
+
+- JSONBytesResponse: bytes ya serializados (datos inmutables, como el
+  catálogo de fondos, que se serializa una vez por versión)
+- ORJSONResponse: contenido dinámico codificado con orjson
+
+Al devolver una Response, FastAPI no aplica response_model (sigue sirviendo
+para la documentación); los datos deben traer ya los campos del esquema.
+Las pruebas comparan la salida con la del response_model.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from starlette.responses import Response
+
+__all__ = ["JSONBytesResponse", "ORJSONResponse", "dumps"]
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializar a JSON compacto (UTF-8), igual que las respuestas de FastAPI
+    """
+    return orjson.dumps(content)
+
+
+class JSONBytesResponse(Response):
+    """
+    Respuesta con un cuerpo JSON ya serializado
+    """
+    media_type = "application/json"
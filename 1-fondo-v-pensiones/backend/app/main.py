@@ -1,8 +1,20 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 
 from app.routers import funds, transactions, notifications
+from app.api.routes import funds as api_funds
+from app.api.routes import transactions as api_transactions
+from app.api.routes import notifications as api_notifications
+from app.api.storage import reset_user_funds_store
+from app.core.aws import shutdown_io
+from app.core.logs import REQUEST_ID_HEADER, RequestIdMiddleware, configure_logging, shutdown_logging
+from app.core.metrics import MetricsMiddleware, metrics
+from app.services.notification_outbox import notification_outbox
+from app.services.bulk_notification_service import bulk_notification_service
+
+# Logs en JSON, formateados y escritos fuera del event loop
+configure_logging()
 
 app = FastAPI(
     title="Fondos API",
@@ -17,16 +29,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Idempotent-Replayed", REQUEST_ID_HEADER],
 )
 
-# Include routers
+# Latencia por ruta, peticiones en curso y errores (ver /metrics)
+app.add_middleware(MetricsMiddleware, registry=metrics)
+# Id de la petición en los logs y en la respuesta (X-Request-ID)
+app.add_middleware(RequestIdMiddleware)
+
+# Include routers: /api/* (frontend) y /funds, /transactions, /notifications
+# usan los mismos handlers y la misma capa de servicio (FundModel,
+# TransactionModel) con el backend de STORAGE_BACKEND
 app.include_router(funds.router)
 app.include_router(transactions.router)
 app.include_router(notifications.router)
+app.include_router(api_funds.router, prefix="/funds", tags=["funds"])
+app.include_router(api_transactions.router, prefix="/transactions", tags=["transactions"])
+app.include_router(api_notifications.router, prefix="/notifications", tags=["notifications"])
+
+@app.on_event("startup")
+async def start_notification_workers():
+    # Sin efecto si ya está configurado; lo reinstala tras un apagado
+    configure_logging()
+    await notification_outbox.start()
+
+@app.on_event("shutdown")
+async def close_aws_io():
+    await bulk_notification_service.wait()
+    await notification_outbox.stop()
+    # Cierra el pool de conexiones del backend (SQLite)
+    reset_user_funds_store()
+    shutdown_io()
+    shutdown_logging()
 
 @app.get("/", tags=["health"])
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # AWS Lambda handler
 handler = Mangum(app) 
\ No newline at end of file
@@ -1,27 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from app.services.transaction_service import transaction_service
-from pydantic import BaseModel
-from typing import Dict, Any
+from fastapi import APIRouter
 
+from app.api.routes import transactions
+
+# Los mismos endpoints de app/api (TransactionModel) bajo el prefijo que usa
+# el frontend
 router = APIRouter(
     prefix="/api/transactions",
     tags=["transactions"]
 )
-
-class TransactionRequest(BaseModel):
-    type: str
-    fund_id: int
-    amount: float
-
-@router.get("/")
-async def get_transactions():
-    """Obtiene todas las transacciones"""
-    return await transaction_service.get_all_transactions()
-
-@router.post("/")
-async def create_transaction(transaction: TransactionRequest):
-    """Crea una nueva transacción"""
-    try:
-        return await transaction_service.add_transaction(transaction.dict())
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+router.include_router(transactions.router)
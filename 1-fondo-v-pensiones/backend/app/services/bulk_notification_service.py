@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+
+from app.api.storage import get_user_funds_store
+from app.core.ids import new_id
+from app.core.rate_limit import TokenBucket
+from app.services.notification_outbox import notification_outbox, EMAIL, SMS
+from app.services.notification_service import notification_service, MAX_BULK_DESTINATIONS
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+Recipient = Tuple[str, str]  # (canal, contacto)
+
+
+async def fund_subscribers(fund_id: int) -> AsyncIterator[Recipient]:
+    """
+    Contactos de los suscriptores de un fondo, leídos del store de
+    suscripciones sin cargarlos todos en memoria
+    """
+    async for _, subscription in get_user_funds_store().iter_fund_subscribers(str(fund_id)):
+        if subscription.get("recipient"):
+            yield subscription.get("notification_type", EMAIL), subscription["recipient"]
+
+
+async def listed_recipients(recipients: List[Recipient]) -> AsyncIterator[Recipient]:
+    for recipient in recipients:
+        yield recipient
+
+
+class BulkNotificationService:
+    """
+    Avisos masivos de un fondo.
+
+    Los emails se agrupan de a MAX_BULK_DESTINATIONS por llamada a
+    send_bulk_templated_email; los SMS son publish concurrentes de SNS. Como
+    mucho BULK_NOTIFICATION_CONCURRENCY llamadas corren a la vez y cada canal
+    respeta su tasa máxima (la cuota de envío de SES, NOTIFICATION_SMS_RATE
+    para SNS). Los destinatarios que fallan pasan al outbox, que los
+    reintenta. El progreso de cada envío se consulta con get().
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, keep_runs: int = 1000):
+        self.concurrency = concurrency or int(os.environ.get('BULK_NOTIFICATION_CONCURRENCY', '8'))
+        self._runs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._keep_runs = keep_runs
+        self._tasks = set()
+        self._email_bucket: Optional[TokenBucket] = None
+        self._sms_bucket: Optional[TokenBucket] = None
+
+    async def _buckets(self) -> Tuple[TokenBucket, TokenBucket]:
+        if self._email_bucket is None:
+            rate = os.environ.get('NOTIFICATION_EMAIL_RATE')
+            if rate is None:
+                try:
+                    rate = await notification_service.get_send_rate()
+                except Exception as e:
+                    logger.error("No se pudo leer la cuota de SES: %s", e)
+                    rate = 1  # Cuota del sandbox de SES
+            self._email_bucket = TokenBucket(float(rate))
+        if self._sms_bucket is None:
+            self._sms_bucket = TokenBucket(float(os.environ.get('NOTIFICATION_SMS_RATE', '20')))
+        return self._email_bucket, self._sms_bucket
+
+    async def start(
+        self,
+        fund: Dict[str, Any],
+        recipients: Optional[List[Recipient]] = None
+    ) -> Dict:
+        """
+        Iniciar el envío a `recipients` o, si no se indican, a los
+        suscriptores del fondo. Devuelve el progreso inicial.
+        """
+        run = {
+            "id": new_id(),
+            "fund_id": fund["id"],
+            "status": RUNNING,
+            "total": 0,
+            "sent": 0,
+            "failed": 0,
+            "started_at": time.time(),
+            "finished_at": None
+        }
+        self._runs[run["id"]] = run
+        while len(self._runs) > self._keep_runs:
+            self._runs.popitem(last=False)
+
+        source = listed_recipients(recipients) if recipients is not None else fund_subscribers(fund["id"])
+        task = asyncio.create_task(self._run(run, fund, source))
+        # Se guarda una referencia para que la tarea no sea recolectada
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(run)
+
+    def get(self, run_id: str) -> Optional[Dict]:
+        """
+        Progreso de un envío masivo
+        """
+        run = self._runs.get(run_id)
+        return dict(run) if run else None
+
+    async def wait(self):
+        """
+        Esperar a que terminen los envíos en curso (pruebas, apagado)
+        """
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, run: Dict, fund: Dict[str, Any], source: AsyncIterator[Recipient]):
+        email_bucket, sms_bucket = await self._buckets()
+        slots = asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async def dispatch(coro):
+            # Se espera un cupo antes de crear la tarea: no se acumulan
+            # tareas por cada destinatario leído
+            await slots.acquire()
+            task = asyncio.create_task(coro)
+            pending.add(task)
+            task.add_done_callback(lambda t: (pending.discard(t), slots.release()))
+
+        try:
+            emails = []
+            async for channel, contact in source:
+                run["total"] += 1
+                if channel == SMS:
+                    await dispatch(self._send_sms(run, fund, contact, sms_bucket))
+                    continue
+                emails.append(contact)
+                if len(emails) == MAX_BULK_DESTINATIONS:
+                    await dispatch(self._send_emails(run, fund, emails, email_bucket))
+                    emails = []
+            if emails:
+                await dispatch(self._send_emails(run, fund, emails, email_bucket))
+            await asyncio.gather(*pending)
+            run["status"] = COMPLETED
+        except Exception as e:
+            logger.error("Error en el envío masivo: %s", e, extra={"run_id": run["id"], "fund_id": fund["id"]})
+            run["status"] = FAILED
+        finally:
+            run["finished_at"] = time.time()
+
+    async def _send_emails(self, run: Dict, fund: Dict[str, Any], emails: List[str], bucket: TokenBucket):
+        await bucket.acquire(len(emails))
+        try:
+            results = await notification_service.send_bulk_email(emails, fund)
+        except Exception as e:
+            results = [(email, False, str(e)) for email in emails]
+        for email, success, message in results:
+            await self._record(run, fund, EMAIL, email, success, message)
+
+    async def _send_sms(self, run: Dict, fund: Dict[str, Any], phone: str, bucket: TokenBucket):
+        await bucket.acquire()
+        try:
+            success, message = await notification_service.send_sms(phone, fund)
+        except Exception as e:
+            success, message = False, str(e)
+        await self._record(run, fund, SMS, phone, success, message)
+
+    async def _record(self, run: Dict, fund: Dict[str, Any], channel: str, contact: str, success: bool, message: str):
+        if success:
+            run["sent"] += 1
+            return
+        run["failed"] += 1
+        logger.error("Falló el aviso: %s", message, extra={"run_id": run["id"], "fund_id": fund["id"], "channel": channel})
+        try:
+            await notification_outbox.enqueue(channel, contact, fund)
+        except Exception as e:
+            # Un fallo al encolar el reintento no detiene el resto del envío
+            logger.error(
+                "Error encolando el reintento del aviso: %s", e,
+                extra={"run_id": run["id"], "fund_id": fund["id"], "channel": channel}
+            )
+
+
+bulk_notification_service = BulkNotificationService()
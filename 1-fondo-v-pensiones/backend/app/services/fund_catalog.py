@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Iterable
+
+from app.api.storage import get_backend_name, DYNAMODB_BACKEND, SQLITE_BACKEND
+from app.api.storage.dynamodb import to_dynamo, from_dynamo
+from app.core.aws import get_table, call_aws
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Archivo con los fondos iniciales (desarrollo, pruebas y carga inicial)
+SEED_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'funds.json')
+
+# Registro de la tabla Funds con la versión del catálogo (no es un fondo)
+VERSION_ITEM_ID = "_catalog"
+
+SEED_SOURCE = "seed"
+DYNAMODB_SOURCE = "dynamodb"
+SQLITE_SOURCE = "sqlite"
+
+
+def load_seed_funds(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Leer los fondos del archivo semilla
+    """
+    with open(path or os.environ.get('FUND_CATALOG_SEED', SEED_FILE), encoding='utf-8') as seed:
+        return json.load(seed)
+
+
+def encode_fund(fund: Dict[str, Any]) -> bytes:
+    """
+    JSON de un fondo con los campos y el orden del esquema Fund
+    """
+    return dumps({
+        "nombre": fund["nombre"],
+        "monto_minimo": float(fund["monto_minimo"]),
+        "categoria": fund["categoria"],
+        "id": fund["id"]
+    })
+
+
+def content_version(funds: Iterable[Dict[str, Any]]) -> str:
+    """
+    Hash del contenido del catálogo (mismo contenido, misma versión)
+    """
+    raw = json.dumps(list(funds), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class CatalogSnapshot:
+    """
+    Versión inmutable del catálogo con sus índices: por id (O(1)), por
+    categoría y por monto mínimo (ordenado, para cortes con bisect).
+    Los dicts de los fondos se comparten: son de solo lectura. El JSON de
+    cada fondo (y el del catálogo completo) se serializa una sola vez.
+    """
+    __slots__ = (
+        "funds", "by_id", "by_category", "_amounts", "_by_amount", "_encoded", "_body",
+        "version", "last_modified"
+    )
+
+    def __init__(self, funds: Iterable[Dict[str, Any]], last_modified: Optional[datetime] = None):
+        self.funds = tuple(sorted(funds, key=lambda f: f["id"]))
+        self.by_id = MappingProxyType({f["id"]: f for f in self.funds})
+
+        categories: Dict[str, List[Dict]] = {}
+        for fund in self.funds:
+            categories.setdefault(fund["categoria"], []).append(fund)
+        self.by_category = MappingProxyType({k: tuple(v) for k, v in categories.items()})
+
+        self._by_amount = tuple(sorted(self.funds, key=lambda f: (f["monto_minimo"], f["id"])))
+        self._amounts = tuple(f["monto_minimo"] for f in self._by_amount)
+
+        self._encoded = {f["id"]: encode_fund(f) for f in self.funds}
+        self._body = self._join(self.funds)
+
+        self.version = content_version(self.funds)
+        # Last-Modified tiene resolución de segundos
+        self.last_modified = last_modified or datetime.now(timezone.utc).replace(microsecond=0)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def get(self, fund_id: int) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(fund_id)
+
+    def search(self, categoria: Optional[str] = None, monto_maximo: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Fondos de una categoría y/o con monto mínimo <= monto_maximo,
+        ordenados por id
+        """
+        if categoria is not None:
+            funds = self.by_category.get(categoria, ())
+            if monto_maximo is not None:
+                return [f for f in funds if f["monto_minimo"] <= monto_maximo]
+            return list(funds)
+        if monto_maximo is not None:
+            affordable = self._by_amount[:bisect_right(self._amounts, monto_maximo)]
+            return sorted(affordable, key=lambda f: f["id"])
+        return list(self.funds)
+
+    def search_json(self, categoria: Optional[str] = None, monto_maximo: Optional[float] = None) -> bytes:
+        """
+        Resultado de search() como JSON, armado con los fondos ya serializados
+        """
+        if categoria is None and monto_maximo is None:
+            return self._body
+        return self._join(self.search(categoria, monto_maximo))
+
+    def _join(self, funds: Iterable[Dict[str, Any]]) -> bytes:
+        return b"[" + b",".join([self._encoded[f["id"]] for f in funds]) + b"]"
+
+
+class SeedFileFundSource:
+    """
+    Fondos del archivo semilla; la versión es la fecha de modificación
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('FUND_CATALOG_SEED', SEED_FILE)
+
+    async def version(self) -> Optional[str]:
+        return str(os.stat(self.path).st_mtime_ns)
+
+    async def load(self) -> List[Dict[str, Any]]:
+        return load_seed_funds(self.path)
+
+
+class DynamoDBFundSource:
+    """
+    Fondos de la tabla Funds. El registro `_catalog` guarda la versión del
+    contenido; si existe, una revisión sin cambios cuesta un solo GetItem.
+    """
+
+    def __init__(self):
+        self.table = get_table(os.environ.get('FUNDS_TABLE', 'Funds'))
+
+    async def version(self) -> Optional[str]:
+        response = await call_aws(self.table.get_item, Key={'id': VERSION_ITEM_ID})
+        return response.get('Item', {}).get('version')
+
+    async def load(self) -> List[Dict[str, Any]]:
+        scan = {}
+        funds = []
+        while True:
+            response = await call_aws(self.table.scan, **scan)
+            for item in response.get('Items', []):
+                if item['id'] == VERSION_ITEM_ID:
+                    continue
+                fund = from_dynamo(item)
+                fund['id'] = int(fund['id'])
+                funds.append(fund)
+            if 'LastEvaluatedKey' not in response:
+                return funds
+            scan['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    async def save(self, funds: List[Dict[str, Any]]):
+        """
+        Escribir los fondos y la versión del catálogo
+        """
+        def write():
+            with self.table.batch_writer() as batch:
+                for fund in funds:
+                    batch.put_item(Item=to_dynamo(dict(fund, id=str(fund['id']))))
+                batch.put_item(Item={'id': VERSION_ITEM_ID, 'version': content_version(funds)})
+        await call_aws(write)
+
+
+def create_fund_source():
+    """
+    Origen del catálogo según FUND_CATALOG_SOURCE (por defecto la tabla
+    de fondos del backend con STORAGE_BACKEND=dynamodb o sqlite y el archivo
+    semilla en otro caso)
+    """
+    default = {DYNAMODB_BACKEND: DYNAMODB_SOURCE, SQLITE_BACKEND: SQLITE_SOURCE}.get(get_backend_name(), SEED_SOURCE)
+    source = os.environ.get('FUND_CATALOG_SOURCE', default).lower()
+    if source == DYNAMODB_SOURCE:
+        return DynamoDBFundSource()
+    if source == SQLITE_SOURCE:
+        from app.api.storage.sqlite import SQLiteFundSource
+        return SQLiteFundSource()
+    if source == SEED_SOURCE:
+        return SeedFileFundSource()
+    raise ValueError(f"Origen del catálogo de fondos desconocido: {source}")
+
+
+class FundCatalog:
+    """
+    Catálogo de fondos compartido por toda la aplicación.
+
+    La primera consulta carga el catálogo. Después, si pasaron más de
+    FUND_CATALOG_TTL segundos desde la última revisión, se responde con la
+    versión actual y se revisa en segundo plano: si la versión del origen no
+    cambió no se recarga nada, y si el contenido es el mismo se conserva la
+    versión anterior (mismo ETag y Last-Modified).
+    """
+
+    def __init__(self, source=None, ttl: Optional[float] = None):
+        self._source = source
+        self.ttl = ttl if ttl is not None else float(os.environ.get('FUND_CATALOG_TTL', '60'))
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._source_version: Optional[str] = None
+        self._checked_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+
+    @property
+    def source(self):
+        if self._source is None:
+            self._source = create_fund_source()
+        return self._source
+
+    async def snapshot(self) -> CatalogSnapshot:
+        """
+        Versión actual del catálogo
+        """
+        if self._snapshot is None:
+            return await self.refresh()
+        if time.monotonic() - self._checked_at > self.ttl and self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._refresh_in_background())
+        return self._snapshot
+
+    async def refresh(self, force: bool = False) -> CatalogSnapshot:
+        """
+        Revisar el origen y recargar el catálogo si cambió
+        """
+        version = await self.source.version()
+        if force or self._snapshot is None or version is None or version != self._source_version:
+            snapshot = CatalogSnapshot(await self.source.load())
+            if self._snapshot is None or snapshot.version != self._snapshot.version:
+                self._snapshot = snapshot
+            self._source_version = version
+        self._checked_at = time.monotonic()
+        return self._snapshot
+
+    async def _refresh_in_background(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Se sigue sirviendo la versión anterior; se reintenta tras el TTL
+            logger.error("Error actualizando el catálogo de fondos: %s", e)
+            self._checked_at = time.monotonic()
+        finally:
+            self._refreshing = None
+
+    def invalidate(self):
+        """
+        Forzar la revisión del origen en la próxima consulta
+        """
+        self._source_version = None
+        self._checked_at = 0.0
+
+    def reset(self, source=None):
+        """
+        Descartar el catálogo cargado (cambio de configuración, pruebas)
+        """
+        self._source = source
+        self._snapshot = None
+        self._source_version = None
+        self._checked_at = 0.0
+
+
+fund_catalog = FundCatalog()
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from app.api.storage import ConcurrentUpdateError
+from app.services.idempotency_stores import IN_PROGRESS, COMPLETED, FAILED, create_idempotency_store
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """
+    La llave ya se usó con otra petición
+    """
+
+
+class IdempotencyInProgressError(ValueError):
+    """
+    Otra instancia está procesando la misma llave
+    """
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """
+    Hash del cuerpo de la petición (mismo contenido, misma huella)
+    """
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Respuestas guardadas por llave de idempotencia (encabezado Idempotency-Key).
+
+    La primera petición con una llave se ejecuta y su resultado (respuesta o
+    error de negocio) se guarda IDEMPOTENCY_TTL segundos; los reintentos con
+    la misma llave reciben ese resultado sin volver a escribir. Los
+    duplicados concurrentes en el proceso esperan a la primera ejecución; en
+    otra instancia reciben IdempotencyInProgressError mientras dure la
+    reserva (IDEMPOTENCY_LOCK_SECONDS).
+
+    Los conflictos de versión y los errores inesperados no se guardan: la
+    llave se libera y el cliente puede reintentar.
+    """
+
+    def __init__(self, store=None, ttl: Optional[float] = None, lease: Optional[float] = None):
+        self._store = store
+        self.ttl = ttl or float(os.environ.get('IDEMPOTENCY_TTL', '86400'))
+        self.lease = lease or float(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '30'))
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def store(self):
+        # Se crea en el primer uso, no al importar
+        if self._store is None:
+            self._store = create_idempotency_store()
+        return self._store
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        payload: Dict[str, Any],
+        execute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict, bool]:
+        """
+        Ejecutar `execute` una sola vez por (scope, key). Devuelve el registro
+        guardado ({"status": completed|failed, "outcome": ...}) y si es una
+        repetición de una ejecución anterior.
+        """
+        full_key = f"{scope}:{key}"
+        fingerprint = request_fingerprint(payload)
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            record, _ = await asyncio.shield(inflight)
+            return self._replay(record, fingerprint), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            result = await self._execute(full_key, fingerprint, execute)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Sin duplicados esperando, la excepción ya se propagó aquí
+            future.exception()
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def _execute(self, key: str, fingerprint: str, execute) -> Tuple[Dict, bool]:
+        now = time.time()
+        record = await self.store.claim(key, fingerprint, now, self.lease)
+        if record is not None:
+            if record["status"] == IN_PROGRESS and record["fingerprint"] == fingerprint:
+                raise IdempotencyInProgressError("La petición con esta llave de idempotencia aún se está procesando")
+            return self._replay(record, fingerprint), True
+
+        try:
+            outcome = await execute()
+            status = COMPLETED
+        except ConcurrentUpdateError:
+            await self.store.release(key)
+            raise
+        except ValueError as e:
+            # Error de negocio: el reintento debe recibir el mismo error
+            outcome, status = str(e), FAILED
+        except BaseException:
+            await self.store.release(key)
+            raise
+
+        record = {
+            "key": key,
+            "fingerprint": fingerprint,
+            "status": status,
+            "outcome": outcome,
+            "expires_at": time.time() + self.ttl
+        }
+        await self.store.complete(record)
+        return record, False
+
+    @staticmethod
+    def _replay(record: Dict, fingerprint: str) -> Dict:
+        if record["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReusedError("La llave de idempotencia ya se usó con otra petición")
+        return record
+
+
+idempotency_service = IdempotencyService()
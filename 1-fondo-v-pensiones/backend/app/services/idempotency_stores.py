@@ -0,0 +1,143 @@
+import json
+import os
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from app.api.storage.dynamodb import from_dynamo
+from app.core.aws import get_table, call_aws
+
+# Estados de una llave de idempotencia
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+FAILED = "failed"
+
+MEMORY_IDEMPOTENCY = "memory"
+DYNAMODB_IDEMPOTENCY = "dynamodb"
+
+
+class MemoryIdempotencyStore:
+    """
+    Llaves de idempotencia en el proceso: un LRU de a lo sumo `max_keys`
+    registros que además vencen por fecha (expires_at).
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys or int(os.environ.get('IDEMPOTENCY_MAX_KEYS', '100000'))
+        self._records: "OrderedDict[str, Dict]" = OrderedDict()
+
+    async def claim(self, key: str, fingerprint: str, now: float, lease: float) -> Optional[Dict]:
+        record = self._records.get(key)
+        if record is not None and record["expires_at"] > now:
+            self._records.move_to_end(key)
+            return dict(record)
+
+        self._records[key] = {
+            "key": key,
+            "fingerprint": fingerprint,
+            "status": IN_PROGRESS,
+            "expires_at": now + lease
+        }
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_keys:
+            self._records.popitem(last=False)
+        return None
+
+    async def complete(self, record: Dict):
+        if record["key"] in self._records:
+            self._records[record["key"]] = dict(record)
+
+    async def release(self, key: str):
+        record = self._records.get(key)
+        if record is not None and record["status"] == IN_PROGRESS:
+            del self._records[key]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class DynamoDBIdempotencyStore:
+    """
+    Llaves de idempotencia en la tabla IdempotencyKeys, compartidas por
+    todas las instancias. La llave se reclama con un put condicional y la
+    tabla borra los registros vencidos (TTL sobre expires_at).
+    """
+
+    def __init__(self):
+        self.table = get_table(os.environ.get('IDEMPOTENCY_TABLE', 'IdempotencyKeys'))
+
+    async def claim(self, key: str, fingerprint: str, now: float, lease: float) -> Optional[Dict]:
+        try:
+            await call_aws(
+                self.table.put_item,
+                Item={
+                    'key': key,
+                    'fingerprint': fingerprint,
+                    'status': IN_PROGRESS,
+                    'expires_at': _decimal(now + lease)
+                },
+                # El TTL de DynamoDB borra tarde: un registro vencido se puede reclamar
+                ConditionExpression='attribute_not_exists(#key) OR expires_at <= :now',
+                ExpressionAttributeNames={'#key': 'key'},
+                ExpressionAttributeValues={':now': _decimal(now)}
+            )
+            return None
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+        response = await call_aws(self.table.get_item, Key={'key': key}, ConsistentRead=True)
+        item = response.get('Item')
+        if item is None:
+            # Se liberó entre el put y la lectura
+            return await self.claim(key, fingerprint, now, lease)
+        return _from_item(item)
+
+    async def complete(self, record: Dict):
+        item = {
+            'key': record["key"],
+            'fingerprint': record["fingerprint"],
+            'status': record["status"],
+            'expires_at': _decimal(record["expires_at"]),
+            # La respuesta se guarda como JSON (sin conversión a Decimal)
+            'outcome': json.dumps(record.get("outcome"))
+        }
+        await call_aws(self.table.put_item, Item=item)
+
+    async def release(self, key: str):
+        try:
+            await call_aws(
+                self.table.delete_item,
+                Key={'key': key},
+                ConditionExpression='#status = :in_progress',
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={':in_progress': IN_PROGRESS}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+
+def _decimal(value: float) -> Decimal:
+    return Decimal(str(value))
+
+
+def _from_item(item: Dict) -> Dict:
+    record = from_dynamo(item)
+    record["outcome"] = json.loads(record["outcome"]) if "outcome" in record else None
+    return record
+
+
+def create_idempotency_store(backend: Optional[str] = None):
+    """
+    Crear el store de llaves de idempotencia según IDEMPOTENCY_BACKEND
+    (memory por defecto o dynamodb)
+    """
+    backend = (backend or os.environ.get('IDEMPOTENCY_BACKEND', MEMORY_IDEMPOTENCY)).lower()
+    if backend == DYNAMODB_IDEMPOTENCY:
+        return DynamoDBIdempotencyStore()
+    if backend == MEMORY_IDEMPOTENCY:
+        return MemoryIdempotencyStore()
+    raise ValueError(f"Backend de idempotencia desconocido: {backend}")
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+from app.core.ids import new_id
+from app.services.notification_service import notification_service
+from app.services.outbox_stores import PENDING, DEFAULT_LEASE_SECONDS, create_outbox_store
+
+logger = logging.getLogger(__name__)
+
+# Canales de envío
+EMAIL = "email"
+SMS = "sms"
+
+Deliver = Callable[[Dict], Awaitable[Tuple[bool, str]]]
+
+
+async def deliver_with_aws(job: Dict) -> Tuple[bool, str]:
+    """
+    Enviar el trabajo por SES o SNS con el servicio de notificaciones
+    """
+    if job["channel"] == EMAIL:
+        return await notification_service.send_email(job["recipient"], job["fund"], job.get("locale"))
+    if job["channel"] == SMS:
+        return await notification_service.send_sms(job["recipient"], job["fund"], job.get("locale"))
+    return False, f"Canal de notificación desconocido: {job['channel']}"
+
+
+class NotificationOutbox:
+    """
+    Outbox de notificaciones.
+
+    Las peticiones solo guardan el trabajo (enqueue) y responden; un grupo de
+    workers asyncio lo envía después. Un envío fallido se reintenta con
+    backoff exponencial (con jitter) hasta NOTIFICATION_MAX_ATTEMPTS intentos
+    y luego pasa a la cola de mensajes muertos (status "dead").
+
+    El store es configurable (NOTIFICATION_OUTBOX_BACKEND): memory (por
+    defecto), sqlite o dynamodb. Con un store durable los trabajos sobreviven
+    a un reinicio y cualquier instancia puede enviarlos.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        deliver: Deliver = deliver_with_aws,
+        workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base: Optional[float] = None,
+        retry_max: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        lease: float = DEFAULT_LEASE_SECONDS
+    ):
+        self._store = store
+        self.deliver = deliver
+        self.workers = workers or int(os.environ.get('NOTIFICATION_WORKERS', '4'))
+        self.max_attempts = max_attempts or int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', '5'))
+        self.retry_base = retry_base or float(os.environ.get('NOTIFICATION_RETRY_BASE', '2'))
+        self.retry_max = retry_max or float(os.environ.get('NOTIFICATION_RETRY_MAX', '300'))
+        self.poll_interval = poll_interval or float(os.environ.get('NOTIFICATION_POLL_INTERVAL', '1'))
+        self.lease = lease
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def store(self):
+        # Se crea en el primer uso, no al importar
+        if self._store is None:
+            self._store = create_outbox_store()
+        return self._store
+
+    async def enqueue(
+        self,
+        channel: str,
+        recipient: str,
+        fund: Dict[str, Any],
+        user_id: Optional[str] = None,
+        locale: Optional[str] = None
+    ) -> Dict:
+        """
+        Guardar una notificación para enviarla en segundo plano
+        """
+        if channel not in (EMAIL, SMS):
+            raise ValueError(f"Canal de notificación desconocido: {channel}")
+        now = time.time()
+        job = {
+            "id": new_id(),
+            "status": PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+            "channel": channel,
+            "recipient": recipient,
+            "fund": fund,
+            "user_id": user_id,
+            "locale": locale
+        }
+        await self.store.add(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Obtener el estado de un trabajo
+        """
+        return await self.store.get(job_id)
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict]:
+        """
+        Trabajos que agotaron sus intentos
+        """
+        return await self.store.dead_letters(limit)
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Espera antes del siguiente intento: base * 2^(intentos-1), con tope
+        y jitter para que los reintentos no lleguen todos juntos
+        """
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def process_due(self, limit: int = 10) -> int:
+        """
+        Reclamar y enviar los trabajos vencidos (una pasada). Devuelve
+        cuántos trabajos se procesaron.
+        """
+        jobs = await self.store.claim(time.time(), limit, self.lease)
+        for job in jobs:
+            await self._process(job)
+        return len(jobs)
+
+    async def _process(self, job: Dict):
+        try:
+            success, message = await self.deliver(job)
+        except Exception as e:
+            success, message = False, str(e)
+
+        now = time.time()
+        if success:
+            await self.store.complete(job["id"], now)
+        elif job["attempts"] >= self.max_attempts:
+            logger.error(
+                "Notificación descartada tras %d intentos: %s", job["attempts"], message,
+                extra={"job_id": job["id"], "channel": job["channel"], "user_id": job.get("user_id")}
+            )
+            await self.store.dead_letter(job["id"], message, now)
+        else:
+            await self.store.retry(job["id"], now + self.backoff(job["attempts"]), message, now)
+
+    async def _work(self):
+        while True:
+            # Se limpia antes de reclamar para no perder un enqueue concurrente
+            self._wakeup.clear()
+            try:
+                if await self.process_due(limit=1):
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Un error del store no debe detener al worker
+                logger.error("Error procesando el outbox de notificaciones: %s", e)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        """
+        Iniciar los workers en el event loop actual
+        """
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Detener los workers. Los trabajos reclamados y no terminados se
+        reintentan cuando vence su lease.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+
+notification_outbox = NotificationOutbox()
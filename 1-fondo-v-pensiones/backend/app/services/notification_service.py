@@ -1,106 +1,179 @@
-import boto3
 import os
+import json
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, List, Optional
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from app.core.aws import get_client, call_aws
+from app.services.notification_templates import (
+    EMAIL_TEMPLATES,
+    FUND_INFO,
+    fund_template_data,
+    get_email_template,
+    render_fund_email,
+    render_fund_sms
+)
+
 # Cargar variables de entorno
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# SES acepta hasta 50 destinos por llamada a send_bulk_templated_email
+MAX_BULK_DESTINATIONS = 50
+
 class NotificationService:
     def __init__(self):
-        # Configurar clientes de AWS
-        self.ses_client = boto3.client('ses',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
-        self.sns_client = boto3.client('sns',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
         self.source_email = os.getenv('AWS_SES_SOURCE_EMAIL')
+        # Prefijo de las plantillas guardadas en SES
+        self.template_prefix = os.getenv('AWS_SES_TEMPLATE_PREFIX', 'Fondos')
+        # Con plantillas de SES cada envío lleva solo las variables
+        self.use_ses_templates = os.getenv('NOTIFICATION_SES_TEMPLATES', 'false').lower() == 'true'
+        self._templates_ready = set()
 
-    async def send_email(self, email: str, fund_data: Dict[str, Any]) -> Tuple[bool, str]:
+    @property
+    def ses_client(self):
+        # Cliente compartido; se crea en el primer envío, no al importar
+        return get_client('ses')
+
+    @property
+    def sns_client(self):
+        return get_client('sns')
+
+    async def send_email(self, email: str, fund_data: Dict[str, Any], locale: Optional[str] = None) -> Tuple[bool, str]:
         """
         Envía un email usando AWS SES
         Returns: (success: bool, message: str)
         """
         try:
-            subject = f"Notificación sobre el fondo {fund_data['nombre']}"
-            body_html = f"""
-                <html>
-                <head></head>
-                <body>
-                    <h2>Información sobre su fondo</h2>
-                    <p>Detalles del fondo:</p>
-                    <ul>
-                        <li>Nombre: {fund_data['nombre']}</li>
-                        <li>Categoría: {fund_data['categoria']}</li>
-                        <li>Monto mínimo: ${fund_data['monto_minimo']:,}</li>
-                    </ul>
-                    <p>Gracias por confiar en nosotros para administrar sus inversiones.</p>
-                </body>
-                </html>
-            """
-            body_text = f"""
-                Información sobre su fondo
-                
-                Detalles del fondo:
-                - Nombre: {fund_data['nombre']}
-                - Categoría: {fund_data['categoria']}
-                - Monto mínimo: ${fund_data['monto_minimo']:,}
-                
-                Gracias por confiar en nosotros para administrar sus inversiones.
-            """
-
-            response = self.ses_client.send_email(
-                Source=self.source_email,
-                Destination={
-                    'ToAddresses': [email]
-                },
-                Message={
-                    'Subject': {
-                        'Data': subject
+            if self.use_ses_templates:
+                response = await call_aws(
+                    self.ses_client.send_templated_email,
+                    Source=self.source_email,
+                    Destination={
+                        'ToAddresses': [email]
+                    },
+                    Template=await self.ensure_email_template(FUND_INFO, locale),
+                    TemplateData=json.dumps(fund_template_data(fund_data))
+                )
+            else:
+                subject, body_html, body_text = render_fund_email(fund_data, locale)
+
+                response = await call_aws(
+                    self.ses_client.send_email,
+                    Source=self.source_email,
+                    Destination={
+                        'ToAddresses': [email]
                     },
-                    'Body': {
-                        'Text': {
-                            'Data': body_text
+                    Message={
+                        'Subject': {
+                            'Data': subject
                         },
-                        'Html': {
-                            'Data': body_html
+                        'Body': {
+                            'Text': {
+                                'Data': body_text
+                            },
+                            'Html': {
+                                'Data': body_html
+                            }
                         }
                     }
-                }
-            )
-            logger.info(f"Email enviado exitosamente: {response['MessageId']}")
+                )
+            logger.info("Email enviado", extra={"channel": "email", "message_id": response['MessageId']})
             return True, "Email enviado exitosamente"
         except ClientError as e:
             error_message = str(e)
             if "Email address is not verified" in error_message:
-                logger.error(f"Error: Dirección de correo no verificada en AWS SES: {email}")
+                logger.error("Dirección de correo no verificada en AWS SES", extra={"channel": "email"})
                 return False, f"La dirección de correo {email} no está verificada en AWS SES. Por favor, verifica la dirección en la consola de AWS SES."
-            logger.error(f"Error al enviar email: {error_message}")
+            logger.error("Error al enviar email: %s", error_message, extra={"channel": "email"})
             return False, f"Error al enviar el email: {error_message}"
 
-    async def send_sms(self, phone: str, fund_data: Dict[str, Any]) -> Tuple[bool, str]:
+    async def ensure_email_template(self, name: str = FUND_INFO, locale: Optional[str] = None) -> str:
+        """
+        Guardar en SES (una vez por proceso) la plantilla de email `name`
+        y devolver su nombre en SES
+        """
+        template = get_email_template(name, locale)
+        template_name = template.ses_name(self.template_prefix)
+        if template_name in self._templates_ready:
+            return template_name
+        definition = template.to_ses(self.template_prefix)
+        try:
+            await call_aws(self.ses_client.create_template, Template=definition)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('AlreadyExists', 'TemplateNameAlreadyExists'):
+                raise
+            # La plantilla puede ser de un despliegue anterior
+            await call_aws(self.ses_client.update_template, Template=definition)
+        self._templates_ready.add(template_name)
+        return template_name
+
+    async def push_templates(self) -> List[str]:
+        """
+        Guardar en SES todas las plantillas de email (despliegue)
+        """
+        return [
+            await self.ensure_email_template(name, locale)
+            for name, locale in EMAIL_TEMPLATES
+        ]
+
+    async def send_bulk_email(
+        self,
+        emails: List[str],
+        fund_data: Dict[str, Any],
+        locale: Optional[str] = None
+    ) -> List[Tuple[str, bool, str]]:
+        """
+        Envía el email del fondo a varios destinatarios (hasta
+        MAX_BULK_DESTINATIONS) con una sola llamada a SES
+        Returns: [(email, success, message)]
+        """
+        if len(emails) > MAX_BULK_DESTINATIONS:
+            raise ValueError(f"Máximo {MAX_BULK_DESTINATIONS} destinatarios por envío")
+        template_name = await self.ensure_email_template(FUND_INFO, locale)
+        response = await call_aws(
+            self.ses_client.send_bulk_templated_email,
+            Source=self.source_email,
+            Template=template_name,
+            DefaultTemplateData=json.dumps(fund_template_data(fund_data)),
+            Destinations=[
+                {
+                    'Destination': {'ToAddresses': [email]},
+                    'ReplacementTemplateData': '{}'
+                }
+                for email in emails
+            ]
+        )
+        statuses = response.get('Status', [])
+        results = []
+        for index, email in enumerate(emails):
+            # SES devuelve un estado por destino; sin estado la llamada fue aceptada
+            status = statuses[index] if index < len(statuses) else {'Status': 'Success'}
+            if status.get('Status') == 'Success':
+                results.append((email, True, "Email enviado exitosamente"))
+            else:
+                results.append((email, False, status.get('Error') or status.get('Status', '')))
+        return results
+
+    async def get_send_rate(self) -> float:
+        """
+        Máximo de emails por segundo de la cuenta (cuota de SES)
+        """
+        response = await call_aws(self.ses_client.get_send_quota)
+        return float(response['MaxSendRate'])
+
+    async def send_sms(self, phone: str, fund_data: Dict[str, Any], locale: Optional[str] = None) -> Tuple[bool, str]:
         """
         Envía un SMS usando AWS SNS
         Returns: (success: bool, message: str)
         """
         try:
-            message = f"""
-                Información del fondo {fund_data['nombre']}:
-                Categoría: {fund_data['categoria']}
-                Monto mínimo: ${fund_data['monto_minimo']:,}
-                Gracias por confiar en nosotros.
-            """
-
-            response = self.sns_client.publish(
+            message = render_fund_sms(fund_data, locale)
+
+            response = await call_aws(
+                self.sns_client.publish,
                 PhoneNumber=phone,
                 Message=message,
                 MessageAttributes={
@@ -114,11 +187,11 @@ class NotificationService:
                     }
                 }
             )
-            logger.info(f"SMS enviado exitosamente: {response['MessageId']}")
+            logger.info("SMS enviado", extra={"channel": "sms", "message_id": response['MessageId']})
             return True, "SMS enviado exitosamente"
         except ClientError as e:
             error_message = str(e)
-            logger.error(f"Error al enviar SMS: {error_message}")
+            logger.error("Error al enviar SMS: %s", error_message, extra={"channel": "sms"})
             return False, f"Error al enviar el SMS: {error_message}"
 
 notification_service = NotificationService() 
\ No newline at end of file
@@ -0,0 +1,243 @@
+import html
+import os
+import string
+from functools import lru_cache
+from typing import Dict, Any, Tuple, Optional
+
+# Idioma por defecto de las notificaciones
+DEFAULT_LOCALE = os.environ.get('NOTIFICATION_LOCALE', 'es')
+
+# Plantilla con los datos de un fondo y plantilla de mensaje libre
+FUND_INFO = "fund_info"
+MESSAGE = "message"
+
+_formatter = string.Formatter()
+
+
+class CompiledTemplate:
+    """
+    Plantilla `{campo}` separada una sola vez en (texto, campo). Renderizar
+    es unir las partes; con escape=True los valores se escapan para HTML.
+    Los valores deben ser str (ver fund_template_data).
+    """
+    __slots__ = ("parts", "escape")
+
+    def __init__(self, source: str, escape: bool = False):
+        parts = []
+        for literal, field, format_spec, conversion in _formatter.parse(source):
+            if format_spec or conversion:
+                # El formato de los valores se hace al armar los datos
+                raise ValueError(f"Formato no soportado en la plantilla: {field}")
+            parts.append((literal, field))
+        self.parts = tuple(parts)
+        self.escape = escape
+
+    def render(self, data: Dict[str, Any]) -> str:
+        out = []
+        append = out.append
+        for literal, field in self.parts:
+            append(literal)
+            if field is not None:
+                value = data[field]
+                append(html.escape(value) if self.escape else value)
+        return "".join(out)
+
+    def to_ses(self) -> str:
+        """
+        La misma plantilla en sintaxis de SES (Handlebars): {{campo}} escapa
+        HTML, {{{campo}}} no
+        """
+        start, end = ("{{", "}}") if self.escape else ("{{{", "}}}")
+        return "".join(
+            literal if field is None else f"{literal}{start}{field}{end}"
+            for literal, field in self.parts
+        )
+
+
+class EmailTemplate:
+    """
+    Asunto, html y texto de un email
+    """
+    __slots__ = ("name", "locale", "subject", "html", "text")
+
+    def __init__(self, name: str, locale: str, subject: str, html_body: str, text_body: str):
+        self.name = name
+        self.locale = locale
+        self.subject = CompiledTemplate(subject)
+        self.html = CompiledTemplate(html_body, escape=True)
+        self.text = CompiledTemplate(text_body)
+
+    def render(self, data: Dict[str, Any]) -> Tuple[str, str, str]:
+        return self.subject.render(data), self.html.render(data), self.text.render(data)
+
+    def ses_name(self, prefix: str) -> str:
+        return f"{prefix}-{self.name}-{self.locale}"
+
+    def to_ses(self, prefix: str) -> Dict[str, str]:
+        """
+        Definición de la plantilla guardada en SES
+        """
+        return {
+            'TemplateName': self.ses_name(prefix),
+            'SubjectPart': self.subject.to_ses(),
+            'HtmlPart': self.html.to_ses(),
+            'TextPart': self.text.to_ses()
+        }
+
+
+# Todas las plantillas se compilan al importar el módulo
+EMAIL_TEMPLATES = {
+    (FUND_INFO, "es"): EmailTemplate(
+        FUND_INFO, "es",
+        "Notificación sobre el fondo {nombre}",
+        """
+                <html>
+                <head></head>
+                <body>
+                    <h2>Información sobre su fondo</h2>
+                    <p>Detalles del fondo:</p>
+                    <ul>
+                        <li>Nombre: {nombre}</li>
+                        <li>Categoría: {categoria}</li>
+                        <li>Monto mínimo: ${monto_minimo}</li>
+                    </ul>
+                    <p>Gracias por confiar en nosotros para administrar sus inversiones.</p>
+                </body>
+                </html>
+            """,
+        """
+                Información sobre su fondo
+
+                Detalles del fondo:
+                - Nombre: {nombre}
+                - Categoría: {categoria}
+                - Monto mínimo: ${monto_minimo}
+
+                Gracias por confiar en nosotros para administrar sus inversiones.
+            """
+    ),
+    (FUND_INFO, "en"): EmailTemplate(
+        FUND_INFO, "en",
+        "Notification about the {nombre} fund",
+        """
+                <html>
+                <head></head>
+                <body>
+                    <h2>Your fund information</h2>
+                    <p>Fund details:</p>
+                    <ul>
+                        <li>Name: {nombre}</li>
+                        <li>Category: {categoria}</li>
+                        <li>Minimum amount: ${monto_minimo}</li>
+                    </ul>
+                    <p>Thank you for trusting us with your investments.</p>
+                </body>
+                </html>
+            """,
+        """
+                Your fund information
+
+                Fund details:
+                - Name: {nombre}
+                - Category: {categoria}
+                - Minimum amount: ${monto_minimo}
+
+                Thank you for trusting us with your investments.
+            """
+    ),
+    (MESSAGE, "es"): EmailTemplate(
+        MESSAGE, "es",
+        "{subject}",
+        "<html><body><p>{message}</p></body></html>",
+        "{message}"
+    ),
+    (MESSAGE, "en"): EmailTemplate(
+        MESSAGE, "en",
+        "{subject}",
+        "<html><body><p>{message}</p></body></html>",
+        "{message}"
+    ),
+}
+
+SMS_TEMPLATES = {
+    (FUND_INFO, "es"): CompiledTemplate("""
+                Información del fondo {nombre}:
+                Categoría: {categoria}
+                Monto mínimo: ${monto_minimo}
+                Gracias por confiar en nosotros.
+            """),
+    (FUND_INFO, "en"): CompiledTemplate("""
+                {nombre} fund information:
+                Category: {categoria}
+                Minimum amount: ${monto_minimo}
+                Thank you for trusting us.
+            """),
+}
+
+
+def fund_template_data(fund_data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Valores de las plantillas para un fondo
+    """
+    return {
+        "nombre": fund_data['nombre'],
+        "categoria": fund_data['categoria'],
+        "monto_minimo": f"{fund_data['monto_minimo']:,}"
+    }
+
+
+def _lookup(templates: Dict, name: str, locale: Optional[str]):
+    template = templates.get((name, locale or DEFAULT_LOCALE))
+    if template is None:
+        template = templates.get((name, DEFAULT_LOCALE))
+    if template is None:
+        raise ValueError(f"Plantilla desconocida: {name}")
+    return template
+
+
+def get_email_template(name: str, locale: Optional[str] = None) -> EmailTemplate:
+    """
+    Plantilla de email en el idioma pedido (o en el idioma por defecto)
+    """
+    return _lookup(EMAIL_TEMPLATES, name, locale)
+
+
+def get_sms_template(name: str, locale: Optional[str] = None) -> CompiledTemplate:
+    """
+    Plantilla de SMS en el idioma pedido (o en el idioma por defecto)
+    """
+    return _lookup(SMS_TEMPLATES, name, locale)
+
+
+@lru_cache(maxsize=4096)
+def _render_fund_email(locale: Optional[str], nombre: str, categoria: str, monto_minimo: float) -> Tuple[str, str, str]:
+    data = fund_template_data({"nombre": nombre, "categoria": categoria, "monto_minimo": monto_minimo})
+    return get_email_template(FUND_INFO, locale).render(data)
+
+
+@lru_cache(maxsize=4096)
+def _render_fund_sms(locale: Optional[str], nombre: str, categoria: str, monto_minimo: float) -> str:
+    data = fund_template_data({"nombre": nombre, "categoria": categoria, "monto_minimo": monto_minimo})
+    return get_sms_template(FUND_INFO, locale).render(data)
+
+
+def render_fund_email(fund_data: Dict[str, Any], locale: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    Asunto, html y texto del email de un fondo. Se cachea por idioma y por
+    los datos del fondo que usa la plantilla (si el fondo cambia, cambia la llave).
+    """
+    return _render_fund_email(locale, fund_data['nombre'], fund_data['categoria'], fund_data['monto_minimo'])
+
+
+def render_fund_sms(fund_data: Dict[str, Any], locale: Optional[str] = None) -> str:
+    """
+    Texto del SMS de un fondo (cacheado como render_fund_email)
+    """
+    return _render_fund_sms(locale, fund_data['nombre'], fund_data['categoria'], fund_data['monto_minimo'])
+
+
+def render_message_email(subject: str, message: str, locale: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    Email con un mensaje libre (escapado en el html; no se cachea)
+    """
+    return get_email_template(MESSAGE, locale).render({"subject": subject, "message": message})
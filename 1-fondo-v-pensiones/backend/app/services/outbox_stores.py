@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from app.api.storage.dynamodb import to_dynamo, from_dynamo
+from app.core.aws import get_table, call_aws
+
+# Estados de un trabajo del outbox
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"
+
+MEMORY_OUTBOX = "memory"
+SQLITE_OUTBOX = "sqlite"
+DYNAMODB_OUTBOX = "dynamodb"
+
+# Un trabajo reclamado vuelve a estar disponible si su worker no lo termina
+# en este tiempo (proceso caído a mitad de un envío)
+DEFAULT_LEASE_SECONDS = 60
+
+
+class MemoryOutboxStore:
+    """
+    Outbox en el proceso: un dict de trabajos y un heap por fecha del
+    próximo intento. No sobrevive a un reinicio.
+    """
+
+    def __init__(self, keep_sent: int = 10000):
+        self._jobs: Dict[str, Dict] = {}
+        self._due: List = []
+        self._sent: "OrderedDict[str, None]" = OrderedDict()
+        self._keep_sent = keep_sent
+
+    async def add(self, job: Dict):
+        self._jobs[job["id"]] = dict(job)
+        heapq.heappush(self._due, (job["next_attempt_at"], job["id"]))
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def claim(self, now: float, limit: int, lease: float = DEFAULT_LEASE_SECONDS) -> List[Dict]:
+        claimed = []
+        while self._due and self._due[0][0] <= now and len(claimed) < limit:
+            next_attempt_at, job_id = heapq.heappop(self._due)
+            job = self._jobs.get(job_id)
+            # Entradas viejas del heap (el trabajo ya se reprogramó o terminó)
+            if job is None or job["status"] != PENDING or job["next_attempt_at"] != next_attempt_at:
+                continue
+            job["attempts"] += 1
+            job["next_attempt_at"] = now + lease
+            heapq.heappush(self._due, (job["next_attempt_at"], job_id))
+            claimed.append(dict(job))
+        return claimed
+
+    async def complete(self, job_id: str, now: float):
+        job = self._jobs[job_id]
+        job.update(status=SENT, updated_at=now)
+        self._sent[job_id] = None
+        while len(self._sent) > self._keep_sent:
+            self._jobs.pop(self._sent.popitem(last=False)[0], None)
+
+    async def retry(self, job_id: str, next_attempt_at: float, error: str, now: float):
+        job = self._jobs[job_id]
+        job.update(next_attempt_at=next_attempt_at, last_error=error, updated_at=now)
+        heapq.heappush(self._due, (next_attempt_at, job_id))
+
+    async def dead_letter(self, job_id: str, error: str, now: float):
+        self._jobs[job_id].update(status=DEAD, last_error=error, updated_at=now)
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict]:
+        dead = [dict(job) for job in self._jobs.values() if job["status"] == DEAD]
+        return dead[:limit]
+
+
+class SQLiteOutboxStore:
+    """
+    Outbox durable en un archivo SQLite (WAL). Varios procesos pueden
+    compartir el archivo: reclamar es un único UPDATE ... RETURNING.
+    """
+
+    COLUMNS = ("id", "status", "attempts", "next_attempt_at", "last_error", "created_at", "updated_at")
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('NOTIFICATION_OUTBOX_PATH', 'notification_outbox.db')
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notification_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS notification_jobs_due "
+            "ON notification_jobs (status, next_attempt_at)"
+        )
+
+    async def _run(self, sql: str, params=()) -> List[sqlite3.Row]:
+        def execute():
+            with self._lock:
+                return self._connection.execute(sql, params).fetchall()
+        return await asyncio.to_thread(execute)
+
+    def _to_job(self, row) -> Dict:
+        job = dict(zip(self.COLUMNS, row[:-1]))
+        job.update(json.loads(row[-1]))
+        return job
+
+    async def add(self, job: Dict):
+        payload = {k: v for k, v in job.items() if k not in self.COLUMNS}
+        await self._run(
+            "INSERT INTO notification_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job["id"], job["status"], job["attempts"], job["next_attempt_at"],
+                job["last_error"], job["created_at"], job["updated_at"], json.dumps(payload)
+            )
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        rows = await self._run("SELECT * FROM notification_jobs WHERE id = ?", (job_id,))
+        return self._to_job(rows[0]) if rows else None
+
+    async def claim(self, now: float, limit: int, lease: float = DEFAULT_LEASE_SECONDS) -> List[Dict]:
+        rows = await self._run(
+            """
+            UPDATE notification_jobs
+            SET attempts = attempts + 1, next_attempt_at = ?
+            WHERE id IN (
+                SELECT id FROM notification_jobs
+                WHERE status = ? AND next_attempt_at <= ?
+                ORDER BY next_attempt_at LIMIT ?
+            )
+            RETURNING *
+            """,
+            (now + lease, PENDING, now, limit)
+        )
+        return [self._to_job(row) for row in rows]
+
+    async def complete(self, job_id: str, now: float):
+        await self._run(
+            "UPDATE notification_jobs SET status = ?, updated_at = ? WHERE id = ?",
+            (SENT, now, job_id)
+        )
+
+    async def retry(self, job_id: str, next_attempt_at: float, error: str, now: float):
+        await self._run(
+            "UPDATE notification_jobs SET next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+            (next_attempt_at, error, now, job_id)
+        )
+
+    async def dead_letter(self, job_id: str, error: str, now: float):
+        await self._run(
+            "UPDATE notification_jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+            (DEAD, error, now, job_id)
+        )
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict]:
+        rows = await self._run(
+            "SELECT * FROM notification_jobs WHERE status = ? ORDER BY updated_at LIMIT ?",
+            (DEAD, limit)
+        )
+        return [self._to_job(row) for row in rows]
+
+
+class DynamoDBOutboxStore:
+    """
+    Outbox durable en la tabla NotificationOutbox. El índice status-index
+    (status, next_attempt_at) da los trabajos pendientes y vencidos; un
+    trabajo se reclama con un update condicional sobre next_attempt_at.
+    """
+
+    def __init__(self):
+        self.table = get_table(os.environ.get('NOTIFICATION_OUTBOX_TABLE', 'NotificationOutbox'))
+
+    async def add(self, job: Dict):
+        await call_aws(self.table.put_item, Item=_to_item(job))
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        response = await call_aws(self.table.get_item, Key={'id': job_id}, ConsistentRead=True)
+        item = response.get('Item')
+        return _from_item(item) if item else None
+
+    async def claim(self, now: float, limit: int, lease: float = DEFAULT_LEASE_SECONDS) -> List[Dict]:
+        response = await call_aws(
+            self.table.query,
+            IndexName='status-index',
+            KeyConditionExpression=Key('status').eq(PENDING) & Key('next_attempt_at').lte(_decimal(now)),
+            Limit=limit
+        )
+        claimed = []
+        for item in response.get('Items', []):
+            try:
+                updated = await call_aws(
+                    self.table.update_item,
+                    Key={'id': item['id']},
+                    UpdateExpression='SET attempts = attempts + :one, next_attempt_at = :lease',
+                    # Otro worker pudo reclamarlo entre la consulta y el update
+                    ConditionExpression='#status = :pending AND next_attempt_at = :seen',
+                    ExpressionAttributeNames={'#status': 'status'},
+                    ExpressionAttributeValues={
+                        ':one': 1,
+                        ':lease': _decimal(now + lease),
+                        ':pending': PENDING,
+                        ':seen': item['next_attempt_at']
+                    },
+                    ReturnValues='ALL_NEW'
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                continue
+            claimed.append(_from_item(updated['Attributes']))
+        return claimed
+
+    async def complete(self, job_id: str, now: float):
+        await self._update(job_id, {'status': SENT, 'updated_at': now})
+
+    async def retry(self, job_id: str, next_attempt_at: float, error: str, now: float):
+        await self._update(job_id, {'next_attempt_at': next_attempt_at, 'last_error': error, 'updated_at': now})
+
+    async def dead_letter(self, job_id: str, error: str, now: float):
+        await self._update(job_id, {'status': DEAD, 'last_error': error, 'updated_at': now})
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict]:
+        response = await call_aws(
+            self.table.query,
+            IndexName='status-index',
+            KeyConditionExpression=Key('status').eq(DEAD),
+            Limit=limit
+        )
+        return [_from_item(item) for item in response.get('Items', [])]
+
+    async def _update(self, job_id: str, values: Dict):
+        names = {f"#{name}": name for name in values}
+        await call_aws(
+            self.table.update_item,
+            Key={'id': job_id},
+            UpdateExpression="SET " + ", ".join(f"#{name} = :{name}" for name in values),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=_to_item({f":{name}": value for name, value in values.items()})
+        )
+
+
+def _decimal(value: float) -> Decimal:
+    return Decimal(str(value))
+
+
+def _to_item(job: Dict) -> Dict:
+    # Los None no se guardan (un atributo nulo no se puede indexar)
+    return to_dynamo({k: v for k, v in job.items() if v is not None})
+
+
+def _from_item(item: Dict) -> Dict:
+    job = from_dynamo(item)
+    job.setdefault("last_error", None)
+    return job
+
+
+def create_outbox_store(backend: Optional[str] = None):
+    """
+    Crear el store del outbox según NOTIFICATION_OUTBOX_BACKEND
+    (memory por defecto, sqlite o dynamodb)
+    """
+    backend = (backend or os.environ.get('NOTIFICATION_OUTBOX_BACKEND', MEMORY_OUTBOX)).lower()
+    if backend == SQLITE_OUTBOX:
+        return SQLiteOutboxStore()
+    if backend == DYNAMODB_OUTBOX:
+        return DynamoDBOutboxStore()
+    if backend == MEMORY_OUTBOX:
+        return MemoryOutboxStore()
+    raise ValueError(f"Backend de outbox desconocido: {backend}")
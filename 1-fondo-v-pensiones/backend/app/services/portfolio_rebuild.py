@@ -0,0 +1,58 @@
+"""
+Verificación de los resúmenes de portafolio.
+
+Recalcula el resumen de cada usuario desde la tabla Transactions y lo
+compara con el que se mantiene en cada escritura. Con --fix guarda el
+recalculado en los usuarios que no cuadran.
+
+Uso (desde backend/):
+    python -m app.services.portfolio_rebuild [--user USER_ID] [--fix]
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.api.models.fund import FundModel
+from app.api.storage import get_user_funds_store
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_portfolio_summaries(fix: bool = False, user_id: Optional[str] = None) -> Dict:
+    """
+    Revisar todos los usuarios (o uno). Devuelve los revisados y los que
+    no cuadraban.
+    """
+    checked, mismatched = 0, []
+
+    async def check(uid: str):
+        nonlocal checked
+        result = await FundModel.rebuild_portfolio_summary(uid, fix=fix)
+        checked += 1
+        if not result["consistent"]:
+            logger.warning("Resumen inconsistente para %s: %s != %s", uid, result['stored'], result['summary'])
+            mismatched.append(uid)
+
+    if user_id is not None:
+        await check(user_id)
+    else:
+        async for uid in get_user_funds_store().iter_user_ids():
+            await check(uid)
+
+    return {"checked": checked, "mismatched": mismatched, "fixed": fix}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="revisar solo este usuario")
+    parser.add_argument("--fix", action="store_true", help="guardar el resumen recalculado")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(rebuild_portfolio_summaries(fix=args.fix, user_id=args.user))
+    print(f"Usuarios revisados: {result['checked']}, inconsistentes: {len(result['mismatched'])}")
+
+
+if __name__ == "__main__":
+    main()
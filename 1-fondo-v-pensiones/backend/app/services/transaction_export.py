@@ -0,0 +1,63 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Dict, List
+
+from app.core.responses import dumps
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv"
+}
+
+# Columnas del CSV (y orden de los campos en NDJSON)
+COLUMNS = ("id", "user_id", "fund_id", "fund_name", "type", "amount", "timestamp")
+
+
+async def encode_pages(pages: AsyncIterator[List[Dict]], export_format: str) -> AsyncIterator[bytes]:
+    """
+    Convertir cada página de transacciones en un bloque NDJSON o CSV. En
+    memoria solo hay una página a la vez.
+    """
+    if export_format == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        async for page in pages:
+            writer.writerows([row.get(column) for column in COLUMNS] for row in page)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        # Historial vacío: solo el encabezado
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    async for page in pages:
+        if page:
+            yield b"".join([dumps({column: row.get(column) for column in COLUMNS}) + b"\n" for row in page])
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """
+    Comprimir el flujo con gzip a medida que se genera
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(pages: AsyncIterator[List[Dict]], export_format: str, compress: bool = False) -> AsyncIterator[bytes]:
+    """
+    Cuerpo de la exportación: NDJSON o CSV, opcionalmente con gzip
+    """
+    if export_format not in MEDIA_TYPES:
+        raise ValueError(f"Formato de exportación no soportado: {export_format}")
+    chunks = encode_pages(pages, export_format)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,6 @@
+import os
+
+# Credenciales falsas: ninguna prueba debe llegar a una cuenta real de AWS
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.api.storage import memory
+from app.api.storage.transaction_index import TransactionIndex
+from app.api.models import transaction as transaction_module
+
+client = TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def clean_transactions(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    index = TransactionIndex()
+    monkeypatch.setattr(memory, "TRANSACTIONS", index)
+    monkeypatch.setattr(transaction_module, "TRANSACTIONS", index)
+
+
+def test_api_and_plain_routes_share_the_service_layer():
+    user = {"user_id": "routes_user"}
+    subscribed = client.post("/api/funds/subscribe", params=user, json={"fund_id": 3})
+    assert subscribed.status_code == 200
+    assert subscribed.json()["new_balance"] == 450000
+
+    # Lo escrito por /api/funds se lee en /funds y viceversa
+    user_funds = client.get("/funds/user", params=user).json()
+    assert user_funds == client.get("/api/funds/user", params=user).json()
+    assert user_funds["balance"] == 450000
+    assert [f["id"] for f in user_funds["subscribed_funds"]] == ["3"]
+
+    cancelled = client.post("/funds/unsubscribe", params=user, json={"fund_id": "3"})
+    assert cancelled.json()["new_balance"] == 500000
+    history = client.get("/api/transactions/", params=user).json()
+    assert [(t["type"], t["fund_id"]) for t in history] == [("CANCELLATION", 3), ("SUBSCRIPTION", 3)]
+    assert client.get("/transactions/", params=user).json() == history
+
+
+def test_api_routes_report_business_errors():
+    user = {"user_id": "routes_poor_user"}
+    for fund_id in (4, 1, 2):
+        client.post("/api/funds/subscribe", params=user, json={"fund_id": fund_id})
+
+    response = client.post("/api/funds/subscribe", params=user, json={"fund_id": 5})
+    assert response.status_code == 400
+    assert "No tiene saldo disponible" in response.json()["detail"]
+    assert client.get("/api/funds/99").status_code == 404
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from app.api import storage
+from app.api.storage import memory
+from app.core import aws
+from app.core.rate_limit import TokenBucket
+from app.services import bulk_notification_service as bulk_module
+from app.services.bulk_notification_service import BulkNotificationService
+from app.services.notification_outbox import NotificationOutbox
+from app.services.notification_service import notification_service
+from app.services.outbox_stores import MemoryOutboxStore
+
+FUND = {"id": 4, "nombre": "FDO-ACCIONES", "monto_minimo": 250000, "categoria": "FIC"}
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class FakeSES:
+    def __init__(self, rejected=()):
+        self.rejected = set(rejected)
+        self.bulk_calls = []
+        self.templates = []
+
+    def create_template(self, Template):
+        self.templates.append(Template)
+
+    def get_send_quota(self):
+        return {"MaxSendRate": 1000.0}
+
+    def send_bulk_templated_email(self, **kwargs):
+        self.bulk_calls.append(kwargs)
+        return {"Status": [
+            {"Status": "MessageRejected", "Error": "Email address is not verified"}
+            if d["Destination"]["ToAddresses"][0] in self.rejected else {"Status": "Success"}
+            for d in kwargs["Destinations"]
+        ]}
+
+
+class FakeSNS:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, **kwargs):
+        self.published.append(kwargs["PhoneNumber"])
+        return {"MessageId": "sms"}
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.setattr(notification_service, "_templates_ready", set())
+    storage.reset_user_funds_store()
+    ses, sns = FakeSES(rejected={"user7@example.com"}), FakeSNS()
+    aws.set_client("ses", ses)
+    aws.set_client("sns", sns)
+    outbox = NotificationOutbox(store=MemoryOutboxStore())
+    monkeypatch.setattr(bulk_module, "notification_outbox", outbox)
+    yield ses, sns, outbox
+    aws.reset_clients()
+
+
+def test_fund_subscribers_are_sent_in_batches_of_50(clients, monkeypatch):
+    ses, sns, outbox = clients
+    users = {
+        f"user_{i}": {"balance": 250000, "subscribed_funds": [
+            {"id": "4", "name": "FDO-ACCIONES", "subscription_date": "2024-03-01T00:00:00",
+             "amount": 250000, "recipient": f"user{i}@example.com", "notification_type": "email"}
+        ]}
+        for i in range(120)
+    }
+    users["sms_user"] = {"balance": 250000, "subscribed_funds": [
+        {"id": "4", "name": "FDO-ACCIONES", "subscription_date": "2024-03-01T00:00:00",
+         "amount": 250000, "recipient": "+573001234567", "notification_type": "sms"}
+    ]}
+    users["no_contact"] = {"balance": 250000, "subscribed_funds": [
+        {"id": "4", "name": "FDO-ACCIONES", "subscription_date": "2024-03-01T00:00:00", "amount": 250000}
+    ]}
+    monkeypatch.setattr(memory, "USER_FUNDS", users)
+    service = BulkNotificationService()
+
+    async def scenario():
+        started = await service.start(FUND)
+        await service.wait()
+        return service.get(started["id"])
+
+    progress = run(scenario())
+    assert progress["status"] == "completed"
+    assert (progress["total"], progress["sent"], progress["failed"]) == (121, 120, 1)
+    assert [len(call["Destinations"]) for call in ses.bulk_calls] == [50, 50, 20]
+    assert "{{nombre}}" in ses.templates[0]["SubjectPart"]
+    assert sns.published == ["+573001234567"]
+
+    # El destinatario rechazado queda en el outbox para reintentarse
+    retry = run(outbox.store.claim(time.time(), 10))
+    assert [job["recipient"] for job in retry] == ["user7@example.com"]
+
+
+def test_explicit_recipients(clients):
+    ses, sns, _ = clients
+    service = BulkNotificationService()
+
+    async def scenario():
+        started = await service.start(FUND, [("email", "a@example.com"), ("sms", "+573000000000")])
+        await service.wait()
+        return service.get(started["id"])
+
+    progress = run(scenario())
+    assert (progress["total"], progress["sent"]) == (2, 2)
+    assert sns.published == ["+573000000000"]
+
+
+def test_outbox_failure_does_not_abort_the_run(clients, monkeypatch):
+    ses, sns, outbox = clients
+
+    async def broken_enqueue(*args, **kwargs):
+        raise RuntimeError("outbox caído")
+
+    monkeypatch.setattr(outbox, "enqueue", broken_enqueue)
+    service = BulkNotificationService()
+    recipients = [("email", f"user{i}@example.com") for i in range(10)] + [("sms", "+573000000000")]
+
+    async def scenario():
+        started = await service.start(FUND, recipients)
+        await service.wait()
+        return service.get(started["id"])
+
+    progress = run(scenario())
+    assert progress["status"] == "completed"
+    assert (progress["total"], progress["sent"], progress["failed"]) == (11, 10, 1)
+    assert sns.published == ["+573000000000"]
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=100, capacity=10)
+
+    async def scenario():
+        start = time.perf_counter()
+        for _ in range(3):
+            await bucket.acquire(10)
+        return time.perf_counter() - start
+
+    # La primera ráfaga es gratis; las otras dos esperan 0.1 s cada una
+    assert run(scenario()) >= 0.19
@@ -0,0 +1,273 @@
+import asyncio
+import os
+
+import boto3
+import pytest
+from moto import mock_dynamodb
+
+from app.api import storage
+from app.api.models.fund import FundModel
+from app.api.models.transaction import TransactionModel
+from app.api.storage.dynamodb import create_tables
+from app.core.aws import reset_clients
+from app.services.fund_catalog import fund_catalog
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    """Mocked AWS Credentials for boto3"""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def dynamodb_backend(aws_credentials, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "dynamodb")
+    monkeypatch.delenv("DYNAMODB_ENDPOINT", raising=False)
+    with mock_dynamodb():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        create_tables(dynamodb)
+        # Los clientes compartidos deben crearse dentro del mock
+        reset_clients()
+        storage.reset_user_funds_store()
+        # Con este backend el catálogo de fondos sale de la tabla Funds
+        fund_catalog.reset()
+        run(FundModel.initialize_database())
+        yield dynamodb
+        fund_catalog.reset()
+        storage.reset_user_funds_store()
+        reset_clients()
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_subscribe_writes_balance_subscription_and_transaction(dynamodb_backend):
+    result = run(FundModel.subscribe_to_fund("user_1", 1))
+    assert result["new_balance"] == 425000
+
+    item = dynamodb_backend.Table('UserFunds').get_item(Key={'user_id': 'user_1'})['Item']
+    assert item["balance"] == 425000
+    assert "1" in item["subscribed_funds"]
+
+    transactions = run(TransactionModel.get_user_transactions("user_1"))
+    assert len(transactions) == 1
+    assert transactions[0]["id"] == result["transaction_id"]
+    assert transactions[0]["type"] == "SUBSCRIPTION"
+
+
+def test_double_subscribe_is_rejected_by_the_database(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 1))
+    with pytest.raises(ValueError, match="Ya está suscrito"):
+        run(FundModel.subscribe_to_fund("user_1", 1))
+
+    user_data = run(FundModel.get_user_funds("user_1"))
+    assert user_data["balance"] == 425000
+    assert len(run(TransactionModel.get_user_transactions("user_1"))) == 1
+
+
+def test_insufficient_balance_is_rejected_by_the_database(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 4))  # -250000
+    run(FundModel.subscribe_to_fund("user_1", 2))  # -125000
+    run(FundModel.subscribe_to_fund("user_1", 5))  # -100000
+    with pytest.raises(ValueError, match="No tiene saldo disponible"):
+        run(FundModel.subscribe_to_fund("user_1", 1))  # 75000 > 25000
+
+    user_data = run(FundModel.get_user_funds("user_1"))
+    assert user_data["balance"] == 25000
+    assert [f["id"] for f in user_data["subscribed_funds"]] == ["4", "2", "5"]
+
+
+def test_unsubscribe_returns_amount(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 1))
+    result = run(FundModel.unsubscribe_from_fund("user_1", "1"))
+    assert result["new_balance"] == 500000
+
+    with pytest.raises(ValueError, match="No está suscrito"):
+        run(FundModel.unsubscribe_from_fund("user_1", "1"))
+
+    transactions = run(TransactionModel.get_user_transactions("user_1"))
+    assert [t["type"] for t in transactions] == ["CANCELLATION", "SUBSCRIPTION"]
+
+
+def test_transactions_are_paginated_server_side(dynamodb_backend):
+    table = dynamodb_backend.Table('Transactions')
+    with table.batch_writer() as batch:
+        for day in range(1, 11):
+            batch.put_item(Item={
+                "id": f"tx_{day}",
+                "user_id": "user_1",
+                "fund_id": 1,
+                "fund_name": "FPV_EL_CLIENTE_RECAUDADORA",
+                "type": "SUBSCRIPTION",
+                "amount": 75000,
+                "timestamp": f"2024-03-{day:02d}T10:00:00"
+            })
+
+    first = run(TransactionModel.get_user_transactions_page("user_1", limit=4))
+    assert [t["id"] for t in first["items"]] == ["tx_10", "tx_9", "tx_8", "tx_7"]
+
+    second = run(TransactionModel.get_user_transactions_page("user_1", limit=4, cursor=first["next_cursor"]))
+    assert [t["id"] for t in second["items"]] == ["tx_6", "tx_5", "tx_4", "tx_3"]
+
+    in_range = run(TransactionModel.get_user_transactions_page(
+        "user_1", limit=10, start="2024-03-02T00:00:00", end="2024-03-04T23:59:59"
+    ))
+    assert [t["id"] for t in in_range["items"]] == ["tx_4", "tx_3", "tx_2"]
+
+    with pytest.raises(ValueError):
+        run(TransactionModel.get_user_transactions_page("user_2", cursor=first["next_cursor"]))
+
+
+def test_fund_subscribers_are_streamed_from_the_table(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 3, recipient="user1@example.com"))
+    run(FundModel.subscribe_to_fund("user_2", 3))
+    run(FundModel.subscribe_to_fund("user_3", 1, recipient="user3@example.com"))
+
+    async def collect():
+        store = storage.get_user_funds_store()
+        return [(user_id, s.get("recipient")) async for user_id, s in store.iter_fund_subscribers("3")]
+
+    assert sorted(run(collect())) == [("user_1", "user1@example.com"), ("user_2", None)]
+
+
+def test_save_with_stale_version_is_rejected(dynamodb_backend):
+    stale = run(FundModel.get_user_funds("user_1"))
+    run(FundModel.subscribe_to_fund("user_1", 1))
+
+    with pytest.raises(storage.ConcurrentUpdateError):
+        run(FundModel.update_user_funds("user_1", stale))
+
+    current = run(FundModel.get_user_funds("user_1"))
+    assert current["version"] == stale["version"] + 1
+    run(FundModel.update_user_funds("user_1", current))
+    assert run(FundModel.get_user_funds("user_1"))["version"] == stale["version"] + 2
+
+
+def test_save_rejects_balance_changes_without_transactions(dynamodb_backend):
+    user_data = run(FundModel.get_user_funds("user_1"))
+    user_data["balance"] += 1000
+    with pytest.raises(ValueError, match="registrando transacciones"):
+        run(FundModel.update_user_funds("user_1", user_data))
+
+    item = dynamodb_backend.Table('UserFunds').get_item(Key={'user_id': 'user_1'})['Item']
+    assert item["balance"] == 500000
+    assert item["version"] == user_data["version"]
+
+
+def test_save_without_version_still_bumps_it(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 1))
+    stale = run(FundModel.get_user_funds("user_1"))
+    unversioned = dict(stale)
+    del unversioned["version"]
+
+    run(FundModel.update_user_funds("user_1", unversioned))
+    assert unversioned["version"] == stale["version"] + 1
+    item = dynamodb_backend.Table('UserFunds').get_item(Key={'user_id': 'user_1'})['Item']
+    assert item["version"] == stale["version"] + 1
+    assert item["summary_active_subscriptions"] == 1
+
+    # Una escritura condicionada con la versión anterior ya no pasa
+    with pytest.raises(storage.ConcurrentUpdateError):
+        run(FundModel.update_user_funds("user_1", stale))
+
+
+def test_batch_writes_user_and_transactions_together(dynamodb_backend):
+    result = run(FundModel.apply_operations("user_1", [
+        {"action": "subscribe", "fund_id": 1},
+        {"action": "subscribe", "fund_id": 3},
+        {"action": "unsubscribe", "fund_id": 1}
+    ]))
+    assert result["new_balance"] == 450000
+
+    item = dynamodb_backend.Table('UserFunds').get_item(Key={'user_id': 'user_1'})['Item']
+    assert item["balance"] == 450000
+    assert set(item["subscribed_funds"]) == {"3"}
+    transactions = run(TransactionModel.get_user_transactions("user_1"))
+    assert [t["type"] for t in transactions] == ["CANCELLATION", "SUBSCRIPTION", "SUBSCRIPTION"]
+
+    with pytest.raises(ValueError):
+        run(FundModel.apply_operations("user_1", [
+            {"action": "subscribe", "fund_id": 4},
+            {"action": "subscribe", "fund_id": 3}
+        ]))
+    assert dynamodb_backend.Table('UserFunds').get_item(Key={'user_id': 'user_1'})['Item']["balance"] == 450000
+    assert len(run(TransactionModel.get_user_transactions("user_1"))) == 3
+
+
+def test_portfolio_summary_is_updated_with_each_write(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 1))
+    run(FundModel.subscribe_to_fund("user_1", 4))
+    run(FundModel.unsubscribe_from_fund("user_1", "1"))
+    run(FundModel.apply_operations("user_1", [{"action": "subscribe", "fund_id": 3}]))
+
+    summary = run(FundModel.get_portfolio_summary("user_1"))
+    assert summary["total_invested"] == 300000
+    assert summary["exposure"] == {"FPV": 0, "FIC": 300000}
+    assert (summary["subscriptions"], summary["cancellations"]) == (3, 1)
+    assert run(FundModel.rebuild_portfolio_summary("user_1"))["consistent"]
+
+
+def test_rebuild_fix_does_not_wipe_the_summary_on_read_errors(dynamodb_backend, monkeypatch):
+    from app.api.models import transaction as transaction_module
+    run(FundModel.subscribe_to_fund("user_1", 4))
+
+    def broken_table():
+        raise RuntimeError("DynamoDB no disponible")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(transaction_module, "transactions_table", broken_table)
+        with pytest.raises(RuntimeError):
+            run(FundModel.rebuild_portfolio_summary("user_1", fix=True))
+
+    summary = run(FundModel.get_portfolio_summary("user_1"))
+    assert summary["total_invested"] == 250000
+    assert run(FundModel.rebuild_portfolio_summary("user_1"))["consistent"]
+
+
+def test_history_export_pages_through_the_table(dynamodb_backend, monkeypatch):
+    from app.api.models import transaction as transaction_module
+    monkeypatch.setattr(transaction_module, "EXPORT_PAGE_SIZE", 2)
+    table = dynamodb_backend.Table('Transactions')
+    with table.batch_writer() as batch:
+        for day in range(1, 6):
+            batch.put_item(Item={
+                "id": f"tx_{day}",
+                "user_id": "user_1" if day % 2 else "user_2",
+                "fund_id": 1,
+                "fund_name": "FPV_EL_CLIENTE_RECAUDADORA",
+                "type": "SUBSCRIPTION",
+                "amount": 75000,
+                "timestamp": f"2024-03-{day:02d}T10:00:00"
+            })
+
+    async def export(**filters):
+        pages = await TransactionModel.open_history(**filters)
+        return [[t["id"] for t in page] async for page in pages]
+
+    assert [i for page in run(export(user_id="user_1")) for i in page] == ["tx_1", "tx_3", "tx_5"]
+    by_fund = run(export(fund_id=1))
+    assert all(len(page) <= 2 for page in by_fund)
+    assert [i for page in by_fund for i in page] == ["tx_1", "tx_2", "tx_3", "tx_4", "tx_5"]
+    assert [i for page in run(export(fund_id=1, after_id="tx_3")) for i in page] == ["tx_4", "tx_5"]
+
+    with pytest.raises(ValueError):
+        run(export(user_id="user_2", after_id="tx_3"))
+
+
+def test_balance_as_of_date_subtracts_later_transactions(dynamodb_backend):
+    run(FundModel.subscribe_to_fund("user_1", 1))  # -75000
+    run(FundModel.subscribe_to_fund("user_1", 3))  # -50000
+    run(FundModel.unsubscribe_from_fund("user_1", "1"))
+    history = run(TransactionModel.get_user_transactions("user_1"))
+    cancelled, second, first = [t["timestamp"] for t in history]
+
+    assert run(FundModel.get_balance("user_1", first))["balance"] == 425000
+    assert run(FundModel.get_balance("user_1", second))["balance"] == 375000
+    assert run(FundModel.get_balance("user_1", cancelled))["balance"] == 450000
+    assert run(FundModel.get_balance("user_1", "2000-01-01T00:00:00"))["balance"] == 500000
+    assert run(FundModel.get_balance("user_1"))["balance"] == 450000
@@ -0,0 +1,94 @@
+import asyncio
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.api import storage
+from app.api.models.fund import FundModel
+from app.api.models import transaction as transaction_module
+from app.api.routes import funds, transactions
+from app.api.schemas.fund import Fund, UserFunds
+from app.api.schemas.transaction import TransactionResponse
+from app.api.storage import memory
+from app.api.storage.transaction_index import TransactionIndex
+from app.services.fund_catalog import CatalogSnapshot, fund_catalog
+
+app = FastAPI()
+app.include_router(funds.router, prefix="/funds")
+app.include_router(transactions.router, prefix="/transactions")
+client = TestClient(app)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def schema_json(schema, data) -> bytes:
+    """
+    Lo que FastAPI respondería con response_model=schema
+    """
+    adapter = TypeAdapter(schema)
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    index = TransactionIndex()
+    monkeypatch.setattr(memory, "TRANSACTIONS", index)
+    monkeypatch.setattr(transaction_module, "TRANSACTIONS", index)
+    storage.reset_user_funds_store()
+    fund_catalog.reset()
+    yield
+    storage.reset_user_funds_store()
+
+
+# Las respuestas rápidas no pasan por response_model: deben ser idénticas
+# (byte a byte) a lo que produciría la validación del esquema
+
+@pytest.mark.parametrize("params", [{}, {"categoria": "FPV"}, {"monto_maximo": 100000}, {"categoria": "OTRA"}])
+def test_catalog_matches_the_fund_schema(params):
+    response = client.get("/funds/", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    catalog = run(FundModel.get_catalog())
+    expected = catalog.search(params.get("categoria"), params.get("monto_maximo"))
+    assert response.content == schema_json(List[Fund], expected)
+
+
+def test_catalog_json_leaves_out_fields_outside_the_schema():
+    snapshot = CatalogSnapshot([
+        {"id": 2, "nombre": "FIC_B", "monto_minimo": 1500.5, "categoria": "FIC", "creado_por": "admin"},
+        {"id": 1, "nombre": "FPV_Ñ", "monto_minimo": 1000, "categoria": "FPV"}
+    ])
+    assert snapshot.search_json() == schema_json(List[Fund], list(snapshot.funds))
+    assert snapshot.search_json(monto_maximo=1200) == schema_json(List[Fund], [snapshot.get(1)])
+
+
+def test_user_funds_match_the_schema():
+    client.post("/funds/subscribe", params={"user_id": "user_1"}, json={"fund_id": 1})
+    client.post("/funds/subscribe", params={"user_id": "user_1"}, json={"fund_id": 3})
+
+    response = client.get("/funds/user", params={"user_id": "user_1"})
+    assert response.status_code == 200
+
+    stored = run(FundModel.get_user_funds("user_1"))
+    assert response.content == schema_json(UserFunds, stored)
+    assert set(response.json()) == {"balance", "subscribed_funds"}
+
+
+def test_transactions_match_the_schema():
+    for fund_id in (1, 3, 2):
+        client.post("/funds/subscribe", params={"user_id": "user_1"}, json={"fund_id": fund_id})
+
+    response = client.get("/transactions/", params={"user_id": "user_1", "limit": 2})
+    assert response.status_code == 200
+    assert "X-Next-Cursor" in response.headers
+
+    expected = run(transaction_module.TransactionModel.get_user_transactions_page("user_1", limit=2))["items"]
+    assert response.content == schema_json(List[TransactionResponse], expected)
@@ -0,0 +1,77 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import storage
+from app.api.routes import funds
+from app.api.storage import INITIAL_BALANCE, memory
+from app.api.storage.transaction_index import TransactionIndex
+from app.services.fund_catalog import fund_catalog
+from app.services.idempotency import IdempotencyService
+from app.services.idempotency_stores import MemoryIdempotencyStore
+
+app = FastAPI()
+app.include_router(funds.router, prefix="/funds")
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    monkeypatch.setattr(memory, "TRANSACTIONS", TransactionIndex())
+    monkeypatch.setattr(funds, "idempotency_service", IdempotencyService(store=MemoryIdempotencyStore()))
+    storage.reset_user_funds_store()
+    fund_catalog.reset()
+    yield
+    storage.reset_user_funds_store()
+
+
+def batch(*operations, **params):
+    return client.post("/funds/batch", json={
+        "operations": [{"action": action, "fund_id": fund_id} for action, fund_id in operations]
+    }, params=params)
+
+
+def test_batch_applies_all_operations_in_order():
+    response = batch(("subscribe", 1), ("subscribe", 3), ("subscribe", 5))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["new_balance"] == INITIAL_BALANCE - 75000 - 50000 - 100000
+    assert [(r["action"], r["fund_id"], r["amount"]) for r in body["results"]] == [
+        ("subscribe", 1, 75000), ("subscribe", 3, 50000), ("subscribe", 5, 100000)
+    ]
+
+    history = memory.TRANSACTIONS.user_history("default_user")
+    assert {t["id"] for t in history} == {r["transaction_id"] for r in body["results"]}
+    timestamps = [r["timestamp"] for r in sorted(history, key=lambda t: t["timestamp"])]
+    assert len(set(timestamps)) == 3
+
+
+def test_cancellations_free_balance_for_later_subscriptions():
+    # Quedan 50000: sin cancelar el fondo 1 no alcanza para el 5
+    assert batch(("subscribe", 4), ("subscribe", 2), ("subscribe", 1)).status_code == 200
+    assert batch(("subscribe", 5)).status_code == 400
+    response = batch(("unsubscribe", 1), ("subscribe", 5))
+    assert response.status_code == 200
+    assert response.json()["new_balance"] == INITIAL_BALANCE - 250000 - 125000 - 100000
+    funds_ids = [f["id"] for f in memory.USER_FUNDS["default_user"]["subscribed_funds"]]
+    assert sorted(funds_ids) == ["2", "4", "5"]
+
+
+def test_invalid_operation_rolls_back_the_whole_batch():
+    response = batch(("subscribe", 4), ("subscribe", 2), ("subscribe", 1), ("subscribe", 5))
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Operación 4: No tiene saldo")
+
+    user_data = client.get("/funds/user").json()
+    assert user_data == {"balance": INITIAL_BALANCE, "subscribed_funds": []}
+    assert len(memory.TRANSACTIONS) == 0
+
+
+def test_batch_rejects_unknown_funds_and_oversized_batches():
+    assert batch(("subscribe", 99)).status_code == 400
+    assert batch(("unsubscribe", 1)).status_code == 400
+    too_many = [("subscribe", 1)] * 26
+    assert batch(*too_many).status_code == 400
+    assert client.post("/funds/batch", json={"operations": []}).status_code == 422
@@ -0,0 +1,103 @@
+import asyncio
+import os
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_dynamodb
+
+from app.api.models.fund import FundModel
+from app.api.storage.dynamodb import create_tables
+from app.core.aws import reset_clients
+from app.routers import funds
+from app.services.fund_catalog import (
+    CatalogSnapshot,
+    DynamoDBFundSource,
+    FundCatalog,
+    SeedFileFundSource,
+    fund_catalog
+)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def make_funds(count):
+    return [
+        {"id": i, "nombre": f"FONDO_{i}", "monto_minimo": 10000 * (i % 50 + 1), "categoria": ("FPV", "FIC")[i % 2]}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_snapshot_indexes():
+    catalog = CatalogSnapshot(make_funds(5000))
+    assert catalog.get(4321)["nombre"] == "FONDO_4321"
+    assert catalog.get(0) is None
+    assert all(f["categoria"] == "FPV" for f in catalog.search(categoria="FPV"))
+    assert len(catalog.search(categoria="FPV")) == 2500
+
+    affordable = catalog.search(monto_maximo=30000)
+    assert [f["id"] for f in affordable] == sorted(f["id"] for f in make_funds(5000) if f["monto_minimo"] <= 30000)
+    assert all(f["categoria"] == "FIC" and f["monto_minimo"] <= 30000
+               for f in catalog.search(categoria="FIC", monto_maximo=30000))
+    with pytest.raises(TypeError):
+        catalog.by_id[1] = {}
+
+
+def test_unchanged_content_keeps_the_version(tmp_path):
+    seed = tmp_path / "funds.json"
+    seed.write_text('[{"id": 1, "nombre": "A", "monto_minimo": 1000, "categoria": "FPV"}]')
+    catalog = FundCatalog(SeedFileFundSource(str(seed)), ttl=0)
+
+    first = run(catalog.refresh())
+    os.utime(seed)  # Otra fecha, mismo contenido
+    assert run(catalog.refresh()) is first
+
+    seed.write_text('[{"id": 1, "nombre": "B", "monto_minimo": 1000, "categoria": "FPV"}]')
+    os.utime(seed, ns=(0, os.stat(seed).st_mtime_ns + 1))
+    second = run(catalog.refresh())
+    assert second.get(1)["nombre"] == "B"
+    assert second.etag != first.etag
+
+
+def test_catalog_loads_from_the_funds_table(monkeypatch):
+    monkeypatch.delenv("DYNAMODB_ENDPOINT", raising=False)
+    with mock_dynamodb():
+        create_tables(boto3.resource('dynamodb', region_name='us-east-1'))
+        reset_clients()
+        try:
+            source = DynamoDBFundSource()
+            run(source.save(make_funds(120)))
+            catalog = FundCatalog(source)
+            snapshot = run(catalog.refresh())
+            assert len(snapshot.funds) == 120
+            assert snapshot.get(7)["monto_minimo"] == 80000
+            assert run(source.version()) == snapshot.version
+        finally:
+            reset_clients()
+
+
+def test_funds_endpoint_revalidates_with_etag():
+    app = FastAPI()
+    app.include_router(funds.router)
+    client = TestClient(app)
+
+    response = client.get("/api/funds/")
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    assert client.get("/api/funds/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/funds/", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/api/funds/", headers={"If-None-Match": '"otra"'}).status_code == 200
+
+    filtered = client.get("/api/funds/", params={"categoria": "FIC", "monto_maximo": 100000}).json()
+    assert [f["id"] for f in filtered] == [3]
+
+
+def test_fund_model_uses_the_catalog():
+    assert run(FundModel.get_fund(4))["nombre"] == "FDO-ACCIONES"
+    assert run(FundModel.get_fund(99)) is None
+    assert run(FundModel.get_all_funds()) == list(run(fund_catalog.snapshot()).funds)
@@ -1,12 +1,20 @@
+import asyncio
+import os
+
+import boto3
 import pytest
 from fastapi.testclient import TestClient
 from moto import mock_dynamodb
-import boto3
-import os
-import json
 
 from app.main import app
+from app.api import storage
+from app.api.models import transaction as transaction_module
 from app.api.models.fund import FundModel
+from app.api.storage import memory
+from app.api.storage.dynamodb import create_tables
+from app.api.storage.transaction_index import TransactionIndex
+from app.core.aws import reset_clients
+from app.services.fund_catalog import fund_catalog
 
 client = TestClient(app)
 
@@ -20,92 +28,42 @@ def aws_credentials():
     os.environ["AWS_SESSION_TOKEN"] = "testing"
     os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 
-@pytest.fixture(scope="function")
-def dynamodb(aws_credentials):
+@pytest.fixture(scope="function", params=["memory", "dynamodb"])
+def backend(request, aws_credentials, monkeypatch):
+    """
+    Store vacío del backend del parámetro: cada prueba empieza con
+    default_user sin suscripciones ni transacciones
+    """
+    monkeypatch.setenv("STORAGE_BACKEND", request.param)
+    monkeypatch.delenv("DYNAMODB_ENDPOINT", raising=False)
+    index = TransactionIndex()
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    monkeypatch.setattr(memory, "TRANSACTIONS", index)
+    monkeypatch.setattr(transaction_module, "TRANSACTIONS", index)
     with mock_dynamodb():
-        # Create DynamoDB tables
         dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        
-        # Create Funds table
-        dynamodb.create_table(
-            TableName='Funds',
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'}  # Primary key
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'S'}
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
-        )
-        
-        # Create UserFunds table
-        dynamodb.create_table(
-            TableName='UserFunds',
-            KeySchema=[
-                {'AttributeName': 'user_id', 'KeyType': 'HASH'}  # Primary key
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'user_id', 'AttributeType': 'S'}
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
-        )
-        
-        # Create Transactions table
-        dynamodb.create_table(
-            TableName='Transactions',
-            KeySchema=[
-                {'AttributeName': 'user_id', 'KeyType': 'HASH'},  # Partition key
-                {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}  # Sort key
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'user_id', 'AttributeType': 'S'},
-                {'AttributeName': 'timestamp', 'AttributeType': 'S'},
-                {'AttributeName': 'id', 'AttributeType': 'S'}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'id-index',
-                    'KeySchema': [
-                        {'AttributeName': 'id', 'KeyType': 'HASH'}
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
-        )
-        
-        # Initialize database
-        import asyncio
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(FundModel.initialize_database())
-        
+        create_tables(dynamodb)
+        # Los clientes compartidos deben crearse dentro del mock
+        reset_clients()
+        storage.reset_user_funds_store()
+        fund_catalog.reset()
+        asyncio.get_event_loop().run_until_complete(FundModel.initialize_database())
         yield dynamodb
+        fund_catalog.reset()
+        storage.reset_user_funds_store()
+        reset_clients()
 
 # Test getting all funds
-def test_get_all_funds(dynamodb):
+def test_get_all_funds(backend):
     response = client.get("/api/funds/")
     assert response.status_code == 200
     funds = response.json()
     assert len(funds) == 5
-    assert funds[0]["name"] == "FPV_EL CLIENTE_RECAUDADORA"
+    # Fund schema of app/api: nombre, monto_minimo, categoria and an int id
+    assert funds[0]["nombre"] == "FPV_EL_CLIENTE_RECAUDADORA"
 
 # Test getting user funds
-def test_get_user_funds(dynamodb):
+def test_get_user_funds(backend):
     response = client.get("/api/funds/user")
     assert response.status_code == 200
     user_data = response.json()
@@ -113,7 +71,7 @@ def test_get_user_funds(dynamodb):
     assert len(user_data["subscribed_funds"]) == 0
 
 # Test subscribing to a fund
-def test_subscribe_to_fund(dynamodb):
+def test_subscribe_to_fund(backend):
     # First, try to subscribe to a fund
     response = client.post(
         "/api/funds/subscribe",
@@ -136,25 +94,26 @@ def test_subscribe_to_fund(dynamodb):
     transactions = response.json()
     assert len(transactions) == 1
     assert transactions[0]["type"] == "SUBSCRIPTION"
-    assert transactions[0]["fund_id"] == "1"
+    assert transactions[0]["fund_id"] == 1  # Transaction.fund_id is an int
 
 # Test insufficient balance
-def test_insufficient_balance(dynamodb):
+def test_insufficient_balance(backend):
     # First, subscribe to funds to reduce balance
     client.post("/api/funds/subscribe", json={"fund_id": "1"})  # -75000
     client.post("/api/funds/subscribe", json={"fund_id": "2"})  # -125000
-    client.post("/api/funds/subscribe", json={"fund_id": "3"})  # -50000
+    client.post("/api/funds/subscribe", json={"fund_id": "4"})  # -250000
     
-    # Try to subscribe to an expensive fund
+    # Try to subscribe to a fund above the remaining 50000 (funds 1, 2 and 3
+    # would leave exactly the 250000 that fund 4 costs)
     response = client.post(
         "/api/funds/subscribe",
-        json={"fund_id": "4"}  # 250000
+        json={"fund_id": "5"}  # 100000
     )
     assert response.status_code == 400
     assert "No tiene saldo disponible" in response.json()["detail"]
 
 # Test unsubscribing from a fund
-def test_unsubscribe_from_fund(dynamodb):
+def test_unsubscribe_from_fund(backend):
     # First, subscribe to a fund
     client.post("/api/funds/subscribe", json={"fund_id": "1"})
     
@@ -179,4 +138,4 @@ def test_unsubscribe_from_fund(dynamodb):
     transactions = response.json()
     assert len(transactions) == 2  # Subscription + Cancellation
     assert transactions[0]["type"] == "CANCELLATION"
-    assert transactions[0]["fund_id"] == "1" 
\ No newline at end of file
+    assert transactions[0]["fund_id"] == 1  # Transaction.fund_id is an int 
\ No newline at end of file
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_dynamodb
+
+from app.api import storage
+from app.api.models.fund import FundModel
+from app.api.routes import funds
+from app.api.storage import INITIAL_BALANCE, memory
+from app.api.storage.dynamodb import create_tables
+from app.api.storage.transaction_index import TransactionIndex
+from app.core.aws import reset_clients
+from app.services import idempotency as idempotency_module
+from app.services.fund_catalog import fund_catalog
+from app.services.idempotency import IdempotencyService
+from app.services.idempotency_stores import (
+    COMPLETED,
+    IN_PROGRESS,
+    MemoryIdempotencyStore,
+    DynamoDBIdempotencyStore
+)
+
+app = FastAPI()
+app.include_router(funds.router, prefix="/funds")
+client = TestClient(app)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture(params=["memory", "dynamodb"])
+def store(request, monkeypatch):
+    if request.param == "dynamodb":
+        monkeypatch.delenv("DYNAMODB_ENDPOINT", raising=False)
+        with mock_dynamodb():
+            create_tables(boto3.resource('dynamodb', region_name='us-east-1'))
+            reset_clients()
+            yield DynamoDBIdempotencyStore()
+            reset_clients()
+    else:
+        yield MemoryIdempotencyStore()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    monkeypatch.setattr(memory, "TRANSACTIONS", TransactionIndex())
+    storage.reset_user_funds_store()
+    fund_catalog.reset()
+    service = IdempotencyService(store=MemoryIdempotencyStore())
+    monkeypatch.setattr(funds, "idempotency_service", service)
+    yield service
+    storage.reset_user_funds_store()
+
+
+def test_store_claims_a_key_once(store):
+    now = time.time()
+    assert run(store.claim("k", "fp", now, 30)) is None
+
+    pending = run(store.claim("k", "fp", now, 30))
+    assert pending["status"] == IN_PROGRESS
+
+    run(store.complete({"key": "k", "fingerprint": "fp", "status": COMPLETED,
+                        "outcome": {"new_balance": 425000}, "expires_at": now + 60}))
+    done = run(store.claim("k", "fp", now, 30))
+    assert done["status"] == COMPLETED
+    assert done["outcome"] == {"new_balance": 425000}
+
+    # Vencida, la llave se puede volver a reclamar
+    assert run(store.claim("k", "fp", now + 61, 30)) is None
+
+
+def test_store_release_frees_an_in_progress_key(store):
+    now = time.time()
+    run(store.claim("k", "fp", now, 30))
+    run(store.release("k"))
+    assert run(store.claim("k", "fp", now, 30)) is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryIdempotencyStore(max_keys=2)
+    now = time.time()
+    for key in ("a", "b"):
+        run(store.claim(key, "fp", now, 30))
+    run(store.claim("a", "fp", now, 30))
+    run(store.claim("c", "fp", now, 30))
+    assert len(store) == 2
+    assert run(store.claim("b", "fp", now, 30)) is None
+
+
+def test_retried_subscription_is_replayed_without_side_effects(service):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/funds/subscribe", json={"fund_id": 1}, headers=headers)
+    second = client.post("/funds/subscribe", json={"fund_id": 1}, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(memory.TRANSACTIONS) == 1
+    assert run(FundModel.get_user_funds("default_user"))["balance"] == INITIAL_BALANCE - 75000
+
+    # Sin llave (o con otra) es una petición nueva: el fondo ya está suscrito
+    assert client.post("/funds/subscribe", json={"fund_id": 1}).status_code == 400
+
+
+def test_business_errors_are_replayed(service):
+    headers = {"Idempotency-Key": "cancel-1"}
+    first = client.post("/funds/unsubscribe", json={"fund_id": "2"}, headers=headers)
+    client.post("/funds/subscribe", json={"fund_id": 2})
+    second = client.post("/funds/unsubscribe", json={"fund_id": "2"}, headers=headers)
+
+    assert first.status_code == second.status_code == 400
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+
+def test_key_reused_with_another_body_is_rejected(service):
+    headers = {"Idempotency-Key": "retry-2"}
+    assert client.post("/funds/subscribe", json={"fund_id": 3}, headers=headers).status_code == 200
+    assert client.post("/funds/subscribe", json={"fund_id": 4}, headers=headers).status_code == 422
+    assert len(memory.TRANSACTIONS) == 1
+
+
+def test_concurrent_duplicates_run_once(service, monkeypatch):
+    calls = []
+    original = FundModel.subscribe_to_fund
+
+    async def slow_subscribe(*args, **kwargs):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(FundModel, "subscribe_to_fund", slow_subscribe)
+
+    async def scenario():
+        async def execute():
+            return await FundModel.subscribe_to_fund("user_1", 1)
+        return await asyncio.gather(*[
+            service.run("user_1:subscribe", "storm", {"fund_id": 1}, execute)
+            for _ in range(20)
+        ])
+
+    results = run(scenario())
+    assert len(calls) == 1
+    assert sum(1 for _, replayed in results if not replayed) == 1
+    assert len({record["outcome"]["transaction_id"] for record, _ in results}) == 1
+    assert len(memory.TRANSACTIONS) == 1
+
+
+def test_unexpected_errors_release_the_key(service):
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("timeout")
+        return {"ok": True}
+
+    with pytest.raises(RuntimeError):
+        run(service.run("user_1:subscribe", "k", {}, flaky))
+    record, replayed = run(service.run("user_1:subscribe", "k", {}, flaky))
+    assert record["outcome"] == {"ok": True} and not replayed
+
+
+def test_default_service_uses_configured_backend(monkeypatch):
+    monkeypatch.setenv("IDEMPOTENCY_BACKEND", "memory")
+    assert isinstance(idempotency_module.IdempotencyService().store, MemoryIdempotencyStore)
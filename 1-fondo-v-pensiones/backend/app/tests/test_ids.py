@@ -0,0 +1,45 @@
+import itertools
+import threading
+
+from app.core import ids
+from app.core.ids import UlidGenerator
+
+
+def test_ids_are_unique_and_sorted_within_a_process():
+    generator = UlidGenerator()
+    batch = [generator() for _ in range(10000)]
+    assert len(set(batch)) == len(batch)
+    assert batch == sorted(batch)
+    assert all(len(i) == 26 for i in batch)
+
+
+def test_ids_stay_sorted_when_the_sequence_carries():
+    generator = UlidGenerator()
+    generator._sequence = itertools.count((1 << 20) - 2)
+    batch = [generator() for _ in range(4)]
+    assert batch == sorted(batch)
+
+
+def test_ids_are_unique_across_threads_and_generators():
+    generator = UlidGenerator()
+    results = []
+
+    def run():
+        results.extend(generator() for _ in range(2000))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    other = [UlidGenerator()() for _ in range(100)]
+    assert len(set(results + other)) == len(results) + len(other)
+
+
+def test_generator_is_pluggable():
+    previous = ids._generator
+    try:
+        ids.set_id_generator(lambda: "fixed")
+        assert ids.new_id() == "fixed"
+    finally:
+        ids.set_id_generator(previous)
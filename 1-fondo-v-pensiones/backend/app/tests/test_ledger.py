@@ -0,0 +1,82 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.models import transaction as transaction_module
+from app.api.models.fund import FundModel
+from app.api.routes import funds
+from app.api.storage import INITIAL_BALANCE, memory
+from app.api.storage.ledger import AccountLedger, Ledger
+from app.api.storage.transaction_index import TransactionIndex
+
+app = FastAPI()
+app.include_router(funds.router, prefix="/funds")
+client = TestClient(app)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture
+def ledger_store(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    index = TransactionIndex(Ledger(INITIAL_BALANCE, snapshot_every=4))
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    monkeypatch.setattr(memory, "TRANSACTIONS", index)
+    monkeypatch.setattr(transaction_module, "TRANSACTIONS", index)
+    return index
+
+
+def test_snapshots_and_replay_match_the_full_history():
+    rng = random.Random(21)
+    account = AccountLedger(1000, snapshot_every=7)
+    entries = []
+    for i in range(500):
+        # Algunos movimientos llegan fuera de orden
+        micros = i * 10 - (rng.randrange(60) if rng.random() < 0.1 else 0)
+        delta = float(rng.choice((-75000, -50000, 50000, 125000)))
+        account.append(micros, delta)
+        entries.append((micros, delta))
+
+    assert len(account.snapshots) == 500 // 7
+    assert account.entries_since_snapshot() == 500 % 7
+    assert account.balance() == account.replay() == 1000 + sum(d for _, d in entries)
+    for cutoff in rng.sample(range(-100, 5100), 200):
+        assert account.balance_at(cutoff) == 1000 + sum(d for m, d in entries if m <= cutoff)
+
+
+def test_store_balance_is_derived_from_the_ledger(ledger_store):
+    for fund_id in (1, 3, 2, 5):
+        run(FundModel.subscribe_to_fund("user_1", fund_id))
+    run(FundModel.unsubscribe_from_fund("user_1", "3"))
+
+    account = ledger_store.ledger.account("user_1")
+    assert (len(account), len(account.snapshots)) == (5, 1)
+    user_data = run(FundModel.get_user_funds("user_1"))
+    assert user_data["balance"] == 500000 - 75000 - 125000 - 100000 == account.replay()
+    # El saldo no se guarda aparte: cambiarlo sin transacción se rechaza
+    assert "balance" not in memory.USER_FUNDS["user_1"]
+    user_data["balance"] += 1000
+    with pytest.raises(ValueError):
+        run(FundModel.update_user_funds("user_1", user_data))
+    assert run(FundModel.get_user_funds("user_1"))["balance"] == account.replay()
+
+
+def test_balance_as_of_date(ledger_store):
+    run(FundModel.subscribe_to_fund("user_1", 1))
+    run(FundModel.subscribe_to_fund("user_1", 3))
+    first, second = reversed([t["timestamp"] for t in ledger_store.user_history("user_1")])
+    before = (datetime.fromisoformat(first) - timedelta(days=1)).isoformat()
+
+    balances = [
+        client.get("/funds/user/balance", params={"user_id": "user_1", "as_of": as_of}).json()["balance"]
+        for as_of in (before, first, second)
+    ]
+    assert balances == [500000, 425000, 375000]
+    current = client.get("/funds/user/balance", params={"user_id": "user_1"}).json()
+    assert current == {"user_id": "user_1", "balance": 375000, "as_of": None}
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueListener
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.models import transaction as transaction_module
+from app.core.logs import (
+    ContextFilter,
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    RequestIdMiddleware,
+    SamplingFilter,
+    request_id_var
+)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+        self.delay = delay
+        self.addFilter(ContextFilter())
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.threads.add(threading.get_ident())
+        self.records.append(record)
+
+
+def test_json_lines_carry_request_id_and_context():
+    record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "Error al enviar: %s", ("SES caído",), None)
+    record.user_id = "user_1"
+    record.fund_id = 3
+    record.request_id = "req-1"
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "Error al enviar: SES caído"
+    assert (entry["level"], entry["logger"], entry["request_id"]) == ("ERROR", "app.test", "req-1")
+    assert (entry["user_id"], entry["fund_id"]) == ("user_1", 3)
+    assert "args" not in entry and "msg" not in entry
+
+
+def test_info_logs_are_sampled_but_warnings_are_kept():
+    sampling = SamplingFilter(0.0)
+    info = logging.LogRecord("app.test", logging.INFO, __file__, 1, "Email enviado", (), None)
+    error = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "Error", (), None)
+    assert not sampling.filter(info)
+    assert sampling.filter(error)
+    assert SamplingFilter(1.0).filter(info)
+
+
+def test_error_storm_does_not_block_the_caller():
+    # Salida lenta (1 ms por registro) y cola de 100: el emisor no espera
+    slow_sink = ListHandler(delay=0.001)
+    handler = NonBlockingQueueHandler(queue.Queue(100))
+    listener = QueueListener(handler.queue, slow_sink)
+    logger = logging.getLogger("app.tests.storm")
+    logger.propagate = False
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        started = time.perf_counter()
+        for i in range(5000):
+            logger.error("Error al enviar email: %s", "Throttling", extra={"job_id": i})
+        elapsed = time.perf_counter() - started
+        time.sleep(0.3)
+        logger.error("Después de la ráfaga")
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    # 5000 registros a 1 ms serían 5 s si el emisor esperara a la salida
+    assert elapsed < 1.0
+    # Formato y escritura ocurren en el hilo del listener
+    assert threading.get_ident() not in slow_sink.threads
+    # Cada registro se escribió o quedó contado en un aviso de descarte
+    notices = [r for r in slow_sink.records if getattr(r, "dropped", None)]
+    written = len(slow_sink.records) - len(notices)
+    assert notices and handler.dropped == 0
+    assert written + sum(r.dropped for r in notices) == 5001
+    assert slow_sink.records[-1].getMessage() == "Después de la ráfaga"
+
+
+def test_request_id_is_propagated_to_logs_and_response():
+    sink = ListHandler()
+    logger = logging.getLogger("app.tests.request")
+    logger.addHandler(sink)
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        logger.warning("pong")
+        return {"request_id": request_id_var.get()}
+
+    client = TestClient(app)
+    try:
+        given = client.get("/ping", headers={"X-Request-ID": "abc-123"})
+        generated = client.get("/ping")
+        invalid = client.get("/ping", headers={"X-Request-ID": "x" * 500})
+    finally:
+        logger.removeHandler(sink)
+
+    assert given.headers["X-Request-ID"] == "abc-123" == given.json()["request_id"]
+    assert len(generated.headers["X-Request-ID"]) == 26
+    assert len(invalid.headers["X-Request-ID"]) == 26
+    assert [r.request_id for r in sink.records[:2]] == ["abc-123", generated.headers["X-Request-ID"]]
+
+
+def test_transaction_errors_are_logged_with_context(monkeypatch, caplog, capsys):
+    def broken_table():
+        raise RuntimeError("DynamoDB no disponible")
+
+    monkeypatch.setattr(transaction_module, "transactions_table", broken_table)
+    with caplog.at_level(logging.ERROR, logger="app.api.models.transaction"):
+        assert run(transaction_module.TransactionModel.get_transactions("user_9")) == []
+
+    record = caplog.records[-1]
+    assert record.user_id == "user_9"
+    assert "DynamoDB no disponible" in record.getMessage()
+    assert "DynamoDB no disponible" not in capsys.readouterr().out
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.aws import call_aws
+from app.core.metrics import MetricsMiddleware, MetricsRegistry, metrics
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture
+def instrumented():
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/funds/{fund_id}")
+    async def read_fund(fund_id: int):
+        if fund_id == 0:
+            raise HTTPException(status_code=404, detail="Fondo no encontrado")
+        assert registry.in_flight == 1
+        return {"id": fund_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("falla")
+
+    return registry, TestClient(app, raise_server_exceptions=False)
+
+
+def test_requests_are_grouped_by_route_template(instrumented):
+    registry, client = instrumented
+    for fund_id in (1, 2, 3, 0):
+        client.get(f"/funds/{fund_id}")
+    client.get("/boom")
+    client.get("/no-existe")
+
+    text = registry.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/funds/{fund_id}"} 4' in text
+    assert 'http_responses_total{method="GET",route="/funds/{fund_id}",status="2xx"} 3' in text
+    assert 'http_responses_total{method="GET",route="/funds/{fund_id}",status="4xx"} 1' in text
+    assert 'http_responses_total{method="GET",route="/boom",status="5xx"} 1' in text
+    assert 'route="<sin_ruta>",status="4xx"} 1' in text
+    assert "http_requests_in_flight 0" in text
+    # Una serie por plantilla, no por URL
+    assert "/funds/1" not in text
+
+
+def test_client_methods_do_not_create_unbounded_series(instrumented):
+    registry, client = instrumented
+    for i in range(50):
+        client.request(f"X-METHOD-{i}", "/no-existe")
+        client.request(f"Y-METHOD-{i}", "/funds/1")
+
+    text = registry.render()
+    assert 'http_request_duration_seconds_count{method="OTHER",route="<sin_ruta>"} 50' in text
+    assert "METHOD" not in text
+    assert len(registry._route_order) == 2
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.02, 0.2))
+    route = registry.route(None, "GET")
+    for seconds in (0.005, 0.05, 0.05, 2.0):
+        route.record(200, seconds)
+
+    text = registry.render()
+    assert 'route="<sin_ruta>",le="0.02"} 1' in text
+    assert 'route="<sin_ruta>",le="0.2"} 3' in text
+    assert 'route="<sin_ruta>",le="+Inf"} 4' in text
+    assert text.count('route="<sin_ruta>",le=') == 3
+
+
+class FakeSESClient:
+    class meta:
+        class service_model:
+            service_name = "ses"
+
+    def send_email(self, **kwargs):
+        return {"MessageId": "1"}
+
+    def get_send_quota(self):
+        raise RuntimeError("sin cuota")
+
+
+def test_aws_calls_are_timed_by_service_and_operation():
+    client = FakeSESClient()
+    sends = metrics.aws_call(client.send_email)
+    quota = metrics.aws_call(client.get_send_quota)
+    before = (sends.latency.count, quota.latency.count, quota.errors)
+
+    run(call_aws(client.send_email, Source="a@example.com"))
+    run(call_aws(client.send_email, Source="a@example.com"))
+    with pytest.raises(RuntimeError):
+        run(call_aws(client.get_send_quota))
+
+    assert (sends.latency.count, quota.latency.count, quota.errors) == (before[0] + 2, before[1] + 1, before[2] + 1)
+    assert 'aws_call_duration_seconds_count{service="ses",operation="send_email"}' in metrics.render()
+
+
+def test_metrics_endpoint_is_mounted_on_the_app():
+    client = TestClient(main.app)
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/"}' in response.text
@@ -0,0 +1,142 @@
+import asyncio
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_dynamodb
+
+from app.routers import notifications
+from app.api.models import notification as notification_module
+from app.api.routes import notifications as notification_routes
+from app.api.models import fund as fund_module
+from app.services.notification_outbox import NotificationOutbox
+from app.api.storage.dynamodb import create_tables
+from app.core.aws import reset_clients
+from app.services.outbox_stores import MemoryOutboxStore, SQLiteOutboxStore, DynamoDBOutboxStore
+
+FUND = {"id": 1, "nombre": "FPV_EL_CLIENTE_RECAUDADORA", "monto_minimo": 75000, "categoria": "FPV"}
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class FlakyDelivery:
+    """Falla las primeras `failures` entregas"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    async def __call__(self, job):
+        if self.failures:
+            self.failures -= 1
+            return False, "SES no disponible"
+        self.sent.append(job["recipient"])
+        return True, "Email enviado exitosamente"
+
+
+@pytest.fixture(params=["memory", "sqlite", "dynamodb"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        yield SQLiteOutboxStore(str(tmp_path / "outbox.db"))
+    elif request.param == "dynamodb":
+        monkeypatch.delenv("DYNAMODB_ENDPOINT", raising=False)
+        with mock_dynamodb():
+            create_tables(boto3.resource('dynamodb', region_name='us-east-1'))
+            reset_clients()
+            yield DynamoDBOutboxStore()
+            reset_clients()
+    else:
+        yield MemoryOutboxStore()
+
+
+def test_job_is_delivered_once(store):
+    delivery = FlakyDelivery()
+    outbox = NotificationOutbox(store=store, deliver=delivery)
+    job = run(outbox.enqueue("email", "user@example.com", FUND))
+
+    assert run(outbox.process_due()) == 1
+    assert run(outbox.process_due()) == 0
+    assert delivery.sent == ["user@example.com"]
+    assert run(outbox.get_job(job["id"]))["status"] == "sent"
+
+
+def test_failed_delivery_is_retried_with_backoff(store):
+    delivery = FlakyDelivery(failures=1)
+    outbox = NotificationOutbox(store=store, deliver=delivery, retry_base=60)
+    job = run(outbox.enqueue("sms", "+573001234567", FUND))
+
+    run(outbox.process_due())
+    pending = run(outbox.get_job(job["id"]))
+    assert pending["status"] == "pending"
+    assert pending["attempts"] == 1
+    assert pending["last_error"] == "SES no disponible"
+    # El siguiente intento no vence todavía
+    assert run(outbox.process_due()) == 0
+
+    run(store.retry(job["id"], 0, pending["last_error"], 0))
+    run(outbox.process_due())
+    assert run(outbox.get_job(job["id"]))["status"] == "sent"
+
+
+def test_exhausted_job_goes_to_dead_letters(store):
+    outbox = NotificationOutbox(store=store, deliver=FlakyDelivery(failures=10), max_attempts=3)
+    job = run(outbox.enqueue("email", "user@example.com", FUND))
+
+    for _ in range(3):
+        run(store.retry(job["id"], 0, "", 0))
+        run(outbox.process_due())
+
+    dead = run(outbox.dead_letters())
+    assert [d["id"] for d in dead] == [job["id"]]
+    assert dead[0]["attempts"] == 3
+
+
+def test_workers_drain_the_outbox():
+    delivery = FlakyDelivery()
+    outbox = NotificationOutbox(store=MemoryOutboxStore(), deliver=delivery, workers=2)
+
+    async def scenario():
+        await outbox.start()
+        for i in range(20):
+            await outbox.enqueue("email", f"user{i}@example.com", FUND)
+        for _ in range(100):
+            if len(delivery.sent) == 20:
+                break
+            await asyncio.sleep(0.01)
+        await outbox.stop()
+
+    run(scenario())
+    assert sorted(delivery.sent) == sorted(f"user{i}@example.com" for i in range(20))
+
+
+def test_send_endpoint_queues_and_returns_202(monkeypatch):
+    outbox = NotificationOutbox(store=MemoryOutboxStore(), deliver=FlakyDelivery())
+    monkeypatch.setattr(notification_module, "notification_outbox", outbox)
+    monkeypatch.setattr(notification_routes, "notification_outbox", outbox)
+    app = FastAPI()
+    app.include_router(notifications.router)
+    client = TestClient(app)
+
+    response = client.post("/api/notifications/send", json={
+        "fund_id": 1, "notification_type": "email", "contact_info": "user@example.com"
+    })
+    assert response.status_code == 202
+
+    job = client.get(f"/api/notifications/{response.json()['id']}").json()
+    assert job["status"] == "pending"
+    assert job["recipient"] == "user@example.com"
+    assert client.get("/api/notifications/desconocido").status_code == 404
+
+
+def test_subscription_queues_its_notification(monkeypatch):
+    outbox = NotificationOutbox(store=MemoryOutboxStore(), deliver=FlakyDelivery())
+    monkeypatch.setattr(fund_module, "notification_outbox", outbox)
+
+    run(fund_module.FundModel.subscribe_to_fund("outbox_user", 3, recipient="user@example.com"))
+    run(fund_module.FundModel.subscribe_to_fund("outbox_user", 5))
+
+    assert run(outbox.process_due()) == 1
+    assert outbox.deliver.sent == ["user@example.com"]
@@ -0,0 +1,43 @@
+import pytest
+
+from app.services import notification_templates as templates
+
+FUND = {"id": 1, "nombre": "FPV_EL_CLIENTE_RECAUDADORA", "monto_minimo": 75000, "categoria": "FPV"}
+
+
+def test_fund_email_matches_the_previous_content():
+    subject, body_html, body_text = templates.render_fund_email(FUND)
+    assert subject == "Notificación sobre el fondo FPV_EL_CLIENTE_RECAUDADORA"
+    assert "<li>Monto mínimo: $75,000</li>" in body_html
+    assert "- Categoría: FPV" in body_text
+    # Segundo render: mismo resultado desde la caché
+    assert templates.render_fund_email(FUND) is templates.render_fund_email(dict(FUND))
+
+
+def test_values_are_escaped_only_in_html():
+    fund = dict(FUND, nombre="<b>A & B</b>")
+    subject, body_html, body_text = templates.render_fund_email(fund)
+    assert "<li>Nombre: &lt;b&gt;A &amp; B&lt;/b&gt;</li>" in body_html
+    assert "<b>A & B</b>" in subject and "<b>A & B</b>" in body_text
+
+    _, message_html, _ = templates.render_message_email("Aviso", "<script>x</script>")
+    assert message_html == "<html><body><p>&lt;script&gt;x&lt;/script&gt;</p></body></html>"
+
+
+def test_locales_fall_back_to_the_default():
+    assert templates.render_fund_email(FUND, "en")[0] == "Notification about the FPV_EL_CLIENTE_RECAUDADORA fund"
+    assert templates.render_fund_email(FUND, "pt") == templates.render_fund_email(FUND)
+    assert "Minimum amount: $75,000" in templates.render_fund_sms(FUND, "en")
+
+
+def test_ses_definition_uses_handlebars():
+    definition = templates.get_email_template(templates.FUND_INFO).to_ses("Fondos")
+    assert definition["TemplateName"] == "Fondos-fund_info-es"
+    assert definition["SubjectPart"] == "Notificación sobre el fondo {{{nombre}}}"
+    assert "<li>Nombre: {{nombre}}</li>" in definition["HtmlPart"]
+    assert "- Nombre: {{{nombre}}}" in definition["TextPart"]
+
+
+def test_format_specs_are_rejected_at_compile_time():
+    with pytest.raises(ValueError):
+        templates.CompiledTemplate("{monto:,}")
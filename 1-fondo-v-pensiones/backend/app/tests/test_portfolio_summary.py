@@ -0,0 +1,118 @@
+import asyncio
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import storage
+from app.api.models.fund import FundModel
+from app.api.models import transaction as transaction_module
+from app.api.routes import funds
+from app.api.storage import INITIAL_BALANCE, memory
+from app.api.storage.transaction_index import TransactionIndex
+from app.services.fund_catalog import fund_catalog
+from app.services.portfolio_rebuild import rebuild_portfolio_summaries
+
+app = FastAPI()
+app.include_router(funds.router, prefix="/funds")
+client = TestClient(app)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    transactions = TransactionIndex()
+    monkeypatch.setattr(memory, "TRANSACTIONS", transactions)
+    monkeypatch.setattr(transaction_module, "TRANSACTIONS", transactions)
+    storage.reset_user_funds_store()
+    fund_catalog.reset()
+    yield
+    storage.reset_user_funds_store()
+
+
+def test_summary_endpoint_tracks_subscriptions_and_cancellations():
+    client.post("/funds/subscribe", json={"fund_id": 1})   # FPV 75000
+    client.post("/funds/subscribe", json={"fund_id": 3})   # FIC 50000
+    client.post("/funds/unsubscribe", json={"fund_id": "1"})
+
+    summary = client.get("/funds/user/summary").json()
+    assert summary == {
+        "user_id": "default_user",
+        "balance": INITIAL_BALANCE - 50000,
+        "total_invested": 50000,
+        "active_subscriptions": 1,
+        "exposure": {"FPV": 0, "FIC": 50000},
+        "lifetime_subscribed": 125000,
+        "lifetime_cancelled": 75000,
+        "subscriptions": 2,
+        "cancellations": 1
+    }
+
+
+def test_summary_matches_a_rebuild_after_random_operations():
+    rng = random.Random(3)
+
+    async def scenario():
+        for _ in range(300):
+            user_id = f"user_{rng.randint(0, 9)}"
+            fund_id = rng.randint(1, 5)
+            try:
+                if rng.random() < 0.2:
+                    await FundModel.apply_operations(user_id, [
+                        {"action": rng.choice(["subscribe", "unsubscribe"]), "fund_id": rng.randint(1, 5)}
+                        for _ in range(3)
+                    ])
+                elif rng.random() < 0.6:
+                    await FundModel.subscribe_to_fund(user_id, fund_id)
+                else:
+                    await FundModel.unsubscribe_from_fund(user_id, str(fund_id))
+            except ValueError:
+                pass
+        return await rebuild_portfolio_summaries()
+
+    result = run(scenario())
+    assert result == {"checked": 10, "mismatched": [], "fixed": False}
+    for user_id in memory.USER_FUNDS:
+        user_data = run(FundModel.get_user_funds(user_id))
+        summary = user_data["summary"]
+        assert summary["total_invested"] == INITIAL_BALANCE - user_data["balance"]
+        assert summary["active_subscriptions"] == len(user_data["subscribed_funds"])
+        assert sum(summary["exposure"].values()) == summary["total_invested"]
+
+
+def test_rebuild_detects_and_fixes_drift():
+    run(FundModel.subscribe_to_fund("user_1", 4))
+    memory.USER_FUNDS["user_1"]["summary"]["total_invested"] = 1
+
+    result = run(FundModel.rebuild_portfolio_summary("user_1"))
+    assert not result["consistent"]
+    assert result["summary"]["total_invested"] == 250000
+
+    assert run(rebuild_portfolio_summaries(fix=True)) == {"checked": 1, "mismatched": ["user_1"], "fixed": True}
+    assert run(FundModel.rebuild_portfolio_summary("user_1"))["consistent"]
+
+
+def test_rebuild_fix_rejects_a_write_between_its_reads(monkeypatch):
+    run(FundModel.subscribe_to_fund("user_1", 4))
+    memory.USER_FUNDS["user_1"]["summary"]["total_invested"] = 1
+    read_history = transaction_module.TransactionModel.get_user_transactions
+
+    async def history_after_a_write(user_id, strict=False):
+        # Otra escritura (sin el lock de este proceso) entre las dos lecturas
+        transaction = transaction_module.TransactionModel.build_transaction(
+            user_id, 3, "SUBSCRIPTION", 50000, "DEUDAPRIVADA"
+        )
+        subscription = {"id": "3", "name": "DEUDAPRIVADA", "amount": 50000,
+                        "subscription_date": transaction["timestamp"], "category": "FIC"}
+        await storage.get_user_funds_store().subscribe(user_id, subscription, transaction)
+        return await read_history(user_id, strict)
+
+    monkeypatch.setattr(transaction_module.TransactionModel, "get_user_transactions", history_after_a_write)
+    with pytest.raises(storage.ConcurrentUpdateError):
+        run(FundModel.rebuild_portfolio_summary("user_1", fix=True))
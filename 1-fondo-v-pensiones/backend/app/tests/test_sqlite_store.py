@@ -0,0 +1,125 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.api import storage
+from app.api.models.fund import FundModel
+from app.api.models.transaction import TransactionModel
+from app.api.storage import ConcurrentUpdateError
+from app.api.storage import sqlite as sqlite_storage
+from app.services.fund_catalog import fund_catalog
+
+
+@pytest.fixture(scope="function")
+def sqlite_backend(tmp_path, monkeypatch):
+    path = str(tmp_path / "fondos.db")
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", path)
+    storage.reset_user_funds_store()
+    sqlite_storage.close_database()
+    # Con este backend el catálogo de fondos sale de la tabla funds
+    fund_catalog.reset()
+    run(FundModel.initialize_database())
+    yield path
+    fund_catalog.reset()
+    storage.reset_user_funds_store()
+    sqlite_storage.close_database()
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_subscribe_and_unsubscribe_persist_in_sqlite(sqlite_backend):
+    result = run(FundModel.subscribe_to_fund("user_1", 1))
+    assert result["new_balance"] == 425000
+
+    connection = sqlite3.connect(sqlite_backend)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert connection.execute("SELECT balance FROM user_funds WHERE user_id = 'user_1'").fetchone() == (425000,)
+    assert connection.execute("SELECT fund_id FROM subscriptions").fetchall() == [("1",)]
+
+    transaction = run(TransactionModel.get_transaction(result["transaction_id"]))
+    assert (transaction["type"], transaction["amount"]) == ("SUBSCRIPTION", 75000)
+
+    cancelled = run(FundModel.unsubscribe_from_fund("user_1", "1"))
+    assert cancelled["new_balance"] == 500000
+    assert connection.execute("SELECT count(*) FROM subscriptions").fetchone() == (0,)
+    history = run(TransactionModel.get_user_transactions("user_1"))
+    assert [t["type"] for t in history] == ["CANCELLATION", "SUBSCRIPTION"]
+    connection.close()
+
+    # El saldo a una fecha descuenta los movimientos posteriores
+    store = storage.get_user_funds_store()
+    assert run(store.balance_at("user_1", history[1]["timestamp"])) == 425000
+    assert run(store.balance_at("user_1", "2000-01-01T00:00:00")) == 500000
+
+    with pytest.raises(ValueError, match="No tiene saldo disponible"):
+        for fund_id in (4, 1, 2, 5):
+            run(FundModel.subscribe_to_fund("user_1", fund_id))
+
+
+def test_history_pages_exports_and_balance_at(sqlite_backend):
+    store = storage.get_user_funds_store()
+    rows = [
+        TransactionModel.build_transaction("user_2", 3, "SUBSCRIPTION", 1000, "DEUDAPRIVADA")
+        for _ in range(5)
+    ]
+    for i, row in enumerate(rows):
+        row["timestamp"] = f"2024-01-0{i + 1}T00:00:00"
+    run(store.transactions.add_many(rows))
+
+    seen, cursor = [], None
+    for _ in range(3):
+        page = run(TransactionModel.get_user_transactions_page("user_2", limit=2, cursor=cursor))
+        seen += [t["id"] for t in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == [r["id"] for r in reversed(rows)]
+    assert cursor is None
+
+    # Mismo timestamp en el corte de página: se desempata por id
+    ties = [
+        TransactionModel.build_transaction("user_4", 3, "SUBSCRIPTION", 1000, "DEUDAPRIVADA")
+        for _ in range(5)
+    ]
+    for row in ties:
+        row["timestamp"] = "2024-02-01T00:00:00"
+    run(store.transactions.add_many(ties))
+    seen, cursor = [], None
+    while True:
+        page = run(TransactionModel.get_user_transactions_page("user_4", limit=2, cursor=cursor))
+        seen += [t["id"] for t in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted((r["id"] for r in ties), reverse=True)
+
+    async def export(after_id=None):
+        pages = await TransactionModel.open_history("user_2", None, after_id)
+        return [t["id"] async for page in pages for t in page]
+    assert run(export()) == [r["id"] for r in rows]
+    assert run(export(rows[1]["id"])) == [r["id"] for r in rows[2:]]
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        run(export("no-existe"))
+
+    with pytest.raises(ValueError, match="ya fue registrada"):
+        run(store.transactions.add_many(rows[:1]))
+
+
+def test_stale_version_is_rejected(sqlite_backend):
+    store = storage.get_user_funds_store()
+    first = run(store.get_user_funds("user_3"))
+    second = run(store.get_user_funds("user_3"))
+
+    run(store.save_user_funds("user_3", first))
+    with pytest.raises(ConcurrentUpdateError):
+        run(store.save_user_funds("user_3", second))
+    assert run(store.get_user_funds("user_3"))["version"] == second["version"] + 1
+
+    # El saldo solo cambia junto con las transacciones que lo justifican
+    current = run(store.get_user_funds("user_3"))
+    current["balance"] -= 1000
+    with pytest.raises(ValueError, match="registrando transacciones"):
+        run(store.save_user_funds("user_3", current))
+    assert run(store.get_user_funds("user_3"))["balance"] == 500000
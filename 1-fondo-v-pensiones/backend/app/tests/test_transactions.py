@@ -0,0 +1,202 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.models import transaction as transaction_module
+from app.api.routes import transactions
+from app.api.storage.transaction_index import TransactionIndex
+
+app = FastAPI()
+app.include_router(transactions.router, prefix="/transactions")
+client = TestClient(app)
+
+
+@pytest.fixture(scope="function")
+def history(monkeypatch):
+    items = [
+        {
+            "id": f"tx_{day}",
+            "user_id": "user_1",
+            "fund_id": 3,
+            "fund_name": "DEUDAPRIVADA",
+            "type": "SUBSCRIPTION",
+            "amount": 50000,
+            "timestamp": f"2024-03-{day:02d}T10:00:00"
+        }
+        for day in range(1, 8)
+    ]
+    index = TransactionIndex()
+    for item in items:
+        index.append(item)
+    monkeypatch.setattr(transaction_module, "TRANSACTIONS", index)
+    return index
+
+
+def test_history_pages_follow_the_cursor_header(history):
+    response = client.get("/transactions/", params={"user_id": "user_1", "limit": 3})
+    assert response.status_code == 200
+    assert [t["id"] for t in response.json()] == ["tx_7", "tx_6", "tx_5"]
+
+    seen = [t["id"] for t in response.json()]
+    while "X-Next-Cursor" in response.headers:
+        response = client.get("/transactions/", params={
+            "user_id": "user_1",
+            "limit": 3,
+            "cursor": response.headers["X-Next-Cursor"]
+        })
+        seen += [t["id"] for t in response.json()]
+    assert seen == [f"tx_{day}" for day in range(7, 0, -1)]
+
+
+def test_history_pages_do_not_skip_equal_timestamps(history):
+    # Cinco transacciones en el mismo instante: el corte de página cae entre ellas
+    for i in range(5):
+        history.append({
+            "id": f"tie_{i}", "user_id": "user_1", "fund_id": 3, "fund_name": "DEUDAPRIVADA",
+            "type": "SUBSCRIPTION", "amount": 50000, "timestamp": "2024-03-08T10:00:00"
+        })
+
+    seen, params = [], {"user_id": "user_1", "limit": 2}
+    while True:
+        response = client.get("/transactions/", params=params)
+        seen += [t["id"] for t in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == [f"tie_{i}" for i in range(4, -1, -1)] + [f"tx_{day}" for day in range(7, 0, -1)]
+
+
+def test_history_date_range_is_inclusive(history):
+    response = client.get("/transactions/", params={
+        "user_id": "user_1",
+        "from_date": "2024-03-02T10:00:00",
+        "to_date": "2024-03-03T10:00:00"
+    })
+    assert [t["id"] for t in response.json()] == ["tx_3", "tx_2"]
+
+
+def test_history_rejects_invalid_cursor(history):
+    response = client.get("/transactions/", params={"user_id": "user_1", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_transaction_lookup_by_id(history):
+    response = client.get("/transactions/tx_4")
+    assert response.status_code == 200
+    assert response.json()["timestamp"] == "2024-03-04T10:00:00"
+    assert client.get("/transactions/missing").status_code == 404
+
+
+def test_index_keeps_timestamp_order_for_late_arrivals():
+    index = TransactionIndex()
+    for tx_id, timestamp in [("a", "2024-03-01T10:00:00"), ("c", "2024-03-03T10:00:00"), ("b", "2024-03-02T10:00:00")]:
+        index.append({
+            "id": tx_id,
+            "user_id": "user_1",
+            "fund_id": 1,
+            "fund_name": "FPV_EL_CLIENTE_RECAUDADORA",
+            "type": "SUBSCRIPTION",
+            "amount": 75000,
+            "timestamp": timestamp
+        })
+
+    assert [t["id"] for t in index.user_history("user_1")] == ["c", "b", "a"]
+    assert [t["id"] for t in index.user_history("user_1", limit=1, before="2024-03-03T10:00:00")] == ["b"]
+    with pytest.raises(ValueError):
+        index.append(index.get("a"))
+
+
+def ndjson_ids(body: bytes):
+    return [json.loads(line)["id"] for line in body.decode().splitlines()]
+
+
+def test_export_streams_ndjson_oldest_first(history):
+    response = client.get("/transactions/export", params={"user_id": "user_1"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="transactions-user-user_1.ndjson"' in response.headers["content-disposition"]
+    assert ndjson_ids(response.content) == [f"tx_{day}" for day in range(1, 8)]
+
+
+def test_export_csv_and_gzip(history):
+    response = client.get("/transactions/export", params={"user_id": "user_1", "format": "csv", "gzip": "true"})
+    assert response.headers["content-type"] == "application/gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert [row["id"] for row in rows] == [f"tx_{day}" for day in range(1, 8)]
+    assert rows[0]["fund_name"] == "DEUDAPRIVADA" and rows[0]["amount"] == "50000"
+
+    empty = client.get("/transactions/export", params={"user_id": "nobody", "format": "csv"})
+    assert empty.text == "id,user_id,fund_id,fund_name,type,amount,timestamp\n"
+
+
+def test_export_resumes_after_the_cursor(history):
+    response = client.get("/transactions/export", params={"user_id": "user_1", "cursor": "tx_4"})
+    assert ndjson_ids(response.content) == ["tx_5", "tx_6", "tx_7"]
+
+    by_fund = client.get("/transactions/export", params={"fund_id": 3, "cursor": "tx_6"})
+    assert ndjson_ids(by_fund.content) == ["tx_7"]
+
+    assert client.get("/transactions/export", params={"user_id": "user_2", "cursor": "tx_4"}).status_code == 400
+    assert client.get("/transactions/export", params={"user_id": "user_1", "cursor": "missing"}).status_code == 400
+    assert client.get("/transactions/export", params={"user_id": "user_1", "fund_id": 3}).status_code == 400
+
+
+def resident_memory() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="requiere /proc (Linux)")
+def test_export_of_a_million_rows_keeps_memory_bounded(monkeypatch):
+    rows = 1_000_000
+    page_size = 1000
+
+    async def synthetic_history(user_id=None, fund_id=None, after_id=None):
+        async def pages():
+            for start in range(0, rows, page_size):
+                yield [
+                    {
+                        "id": f"tx_{i:07d}",
+                        "user_id": "user_1",
+                        "fund_id": 3,
+                        "fund_name": "DEUDAPRIVADA",
+                        "type": "SUBSCRIPTION",
+                        "amount": 50000,
+                        "timestamp": "2024-03-01T10:00:00"
+                    }
+                    for i in range(start, start + page_size)
+                ]
+        return pages()
+
+    monkeypatch.setattr(transaction_module.TransactionModel, "open_history", synthetic_history)
+
+    async def consume():
+        response = await transactions.export_transactions(
+            user_id="user_1", fund_id=None, export_format="ndjson", gzip=True, cursor=None
+        )
+        decompressor = zlib.decompressobj(31)
+        baseline = peak = resident_memory()
+        lines, last, chunks = 0, b"", 0
+        async for chunk in response.body_iterator:
+            data = decompressor.decompress(chunk)
+            lines += data.count(b"\n")
+            last = data or last
+            chunks += 1
+            if chunks % 50 == 0:
+                peak = max(peak, resident_memory())
+        return lines, last, peak - baseline
+
+    lines, last, growth = asyncio.get_event_loop().run_until_complete(consume())
+
+    assert lines == rows
+    assert json.loads(last.splitlines()[-1])["id"] == "tx_0999999"
+    # ~150 MB de NDJSON; en memoria solo debe haber una página y los búferes de gzip
+    assert growth < 20 * 1024 * 1024
@@ -0,0 +1,145 @@
+import asyncio
+import gc
+import random
+import time
+
+import pytest
+
+from app.api import storage
+from app.api.models import fund as fund_module
+from app.api.models.fund import FundModel
+from app.api.storage import INITIAL_BALANCE, ConcurrentUpdateError, memory
+from app.api.storage.memory import MemoryUserFundsStore
+from app.api.storage.transaction_index import TransactionIndex
+from app.core.locks import StripedLocks
+from app.services.fund_catalog import fund_catalog
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class SlowStore(MemoryUserFundsStore):
+    """
+    Store en memoria con latencia de red en cada lectura y escritura: entre
+    leer el balance y guardarlo otras corrutinas pueden modificar al usuario
+    """
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+
+    async def get_user_funds(self, user_id):
+        await asyncio.sleep(self.latency)
+        return await super().get_user_funds(user_id)
+
+    async def save_user_funds(self, user_id, user_data, pending=()):
+        await asyncio.sleep(self.latency)
+        await super().save_user_funds(user_id, user_data, pending)
+
+
+@pytest.fixture
+def slow_store(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.setattr(memory, "USER_FUNDS", {})
+    monkeypatch.setattr(memory, "TRANSACTIONS", TransactionIndex())
+    monkeypatch.setattr(fund_module, "USER_LOCKS", StripedLocks(1024))
+    fund_catalog.reset()
+    store = SlowStore()
+    monkeypatch.setattr(storage, "_user_funds_store", store)
+    yield store
+    storage.reset_user_funds_store()
+
+
+async def random_operations(users, operations, seed=7):
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(operations):
+        user_id = rng.choice(users)
+        fund_id = rng.randint(1, 5)
+        if rng.random() < 0.6:
+            calls.append(FundModel.subscribe_to_fund(user_id, fund_id))
+        else:
+            calls.append(FundModel.unsubscribe_from_fund(user_id, str(fund_id)))
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+def test_concurrent_operations_keep_balance_invariants(slow_store):
+    users = [f"user_{i}" for i in range(50)]
+    results = run(random_operations(users, 10_000))
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    # Solo errores de negocio (saldo, duplicada, no suscrito), nunca conflictos
+    assert not any(isinstance(e, ConcurrentUpdateError) for e in errors)
+    assert all(type(e) is ValueError for e in errors)
+    assert len(errors) < len(results)
+
+    for user_id in users:
+        user_data = run(slow_store.get_user_funds(user_id))
+        fund_ids = [f["id"] for f in user_data["subscribed_funds"]]
+        assert len(fund_ids) == len(set(fund_ids))
+        assert user_data["balance"] >= 0
+        invested = sum(f["amount"] for f in user_data["subscribed_funds"])
+        assert user_data["balance"] + invested == INITIAL_BALANCE
+
+        # Las transacciones registradas cuadran con el balance
+        net = sum(
+            t["amount"] if t["type"] == "SUBSCRIPTION" else -t["amount"]
+            for t in memory.TRANSACTIONS if t["user_id"] == user_id
+        )
+        assert net == invested
+
+
+def test_version_rejects_lost_updates_without_the_lock(slow_store):
+    # Dos escrituras que leyeron la misma versión: solo una se aplica
+    async def scenario():
+        first, second = await asyncio.gather(
+            slow_store.get_user_funds("user_1"), slow_store.get_user_funds("user_1")
+        )
+        first["subscribed_funds"].append({"id": "1", "name": "primero", "amount": 0})
+        second["subscribed_funds"].append({"id": "2", "name": "segundo", "amount": 0})
+        return await asyncio.gather(
+            slow_store.save_user_funds("user_1", first),
+            slow_store.save_user_funds("user_1", second),
+            return_exceptions=True
+        )
+
+    results = run(scenario())
+    assert results[0] is None
+    assert isinstance(results[1], ConcurrentUpdateError)
+    user_data = run(slow_store.get_user_funds("user_1"))
+    assert [f["id"] for f in user_data["subscribed_funds"]] == ["1"]
+    assert user_data["balance"] == INITIAL_BALANCE
+    assert user_data["version"] == 1
+
+
+def test_throughput_scales_with_distinct_users(slow_store):
+    slow_store.latency = 0.001
+
+    def elapsed(users):
+        # Sin pausas del recolector (el heap de pruebas anteriores las alarga)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(random_operations(users, 400))
+            return time.perf_counter() - start
+        finally:
+            gc.enable()
+
+    one_user = elapsed(["user_0"])
+    many_users = elapsed([f"user_{i}" for i in range(100)])
+    # Un usuario se serializa (al menos una espera por operación); usuarios
+    # distintos no se bloquean entre sí
+    assert one_user > 400 * 0.001
+    assert many_users < one_user / 5
+
+
+def test_striped_locks_map_keys_to_stable_stripes():
+    locks = StripedLocks(8)
+
+    async def scenario():
+        return locks.lock("user_1"), locks.lock("user_1"), {id(locks.lock(f"u{i}")) for i in range(100)}
+
+    first, again, distinct = run(scenario())
+    assert first is again
+    assert len(distinct) == 8
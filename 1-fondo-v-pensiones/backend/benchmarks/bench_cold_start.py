@@ -0,0 +1,67 @@
+"""
+Tiempo de importación y de arranque en frío del handler de Lambda.
+
+Cada muestra es un proceso nuevo de Python que:
+  1. importa app.main (lo que Lambda ejecuta en la fase INIT),
+  2. invoca `handler` (Mangum) con un evento de API Gateway a `--path`.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_cold_start --samples 10 --path /api/funds/
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SNIPPET = r"""
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+event = {
+    "version": "2.0", "routeKey": "$default", "rawPath": PATH, "rawQueryString": "",
+    "headers": {"host": "localhost"}, "isBase64Encoded": False,
+    "requestContext": {"http": {"method": "GET", "path": PATH, "protocol": "HTTP/1.1",
+                                "sourceIp": "127.0.0.1", "userAgent": "bench"},
+                       "stage": "$default", "requestId": "bench"},
+}
+response = app.main.handler(event, None)
+handled = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000,
+                  "first_request_ms": (handled - imported) * 1000,
+                  "status": response["statusCode"]}))
+"""
+
+
+def sample(path):
+    env = dict(os.environ)
+    env.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    env.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    code = SNIPPET.replace("PATH", json.dumps(path))
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--path", default="/")
+    args = parser.parse_args()
+
+    samples = [sample(args.path) for _ in range(args.samples)]
+    imports = [s["import_ms"] for s in samples]
+    firsts = [s["first_request_ms"] for s in samples]
+    totals = [i + f for i, f in zip(imports, firsts)]
+    print(f"GET {args.path} -> {samples[0]['status']} ({args.samples} procesos)")
+    for name, values in (("import app.main", imports), ("primera petición", firsts), ("arranque en frío", totals)):
+        print(f"  {name:18} mediana {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Prueba de carga: latencia de GET /api/funds/ mientras hay notificaciones
+lentas en curso.
+
+SES se reemplaza por un doble cuyo send_email bloquea `--delay` segundos
+(como una llamada lenta real de boto3). Se mide p50/p99 de /api/funds/ sin
+notificaciones, y con `--senders` envíos concurrentes en el mismo loop
+(como los workers del outbox) usando:
+  - thread: las llamadas a AWS corren en el pool de app.core.aws
+  - inline: las llamadas a AWS bloquean el event loop (comportamiento anterior)
+
+Uso (desde backend/):
+    python -m benchmarks.bench_event_loop --delay 0.2 --senders 8 --duration 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from app.core import aws
+from app.main import app
+from app.services.notification_service import notification_service
+
+FUND = {"id": 1, "nombre": "FPV_EL_CLIENTE_RECAUDADORA", "monto_minimo": 75000, "categoria": "FPV"}
+
+
+class SlowSES:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def send_email(self, **kwargs):
+        time.sleep(self.delay)
+        return {"MessageId": "bench"}
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def measure(client, duration, concurrency, senders):
+    latencies = []
+    stop = asyncio.Event()
+
+    async def send_notifications():
+        while not stop.is_set():
+            # Lo que hace un worker del outbox por cada notificación
+            await notification_service.send_email("user@example.com", FUND)
+            # Si la llamada no suspende (inline) hay que ceder el loop
+            # explícitamente, como haría el worker entre trabajos
+            await asyncio.sleep(0)
+
+    async def read_funds(deadline):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            # La petición "llega" aquí y espera su turno en el loop, como la
+            # lectura de un socket; así el bloqueo del loop entra en la medición
+            await asyncio.sleep(0)
+            response = await client.get("/api/funds/")
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+
+    background = [asyncio.create_task(send_notifications()) for _ in range(senders)]
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(read_funds(start + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*background)
+    return latencies, elapsed
+
+
+async def run(args):
+    aws.set_client("ses", SlowSES(args.delay))
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        print(f"SES simulado con {args.delay * 1000:.0f} ms de bloqueo, {args.senders} envíos concurrentes")
+        print(f"{'escenario':28} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        for label, mode, senders in (
+            ("sin notificaciones", "thread", 0),
+            ("notificaciones, inline", "inline", args.senders),
+            ("notificaciones, pool", "thread", args.senders),
+        ):
+            os.environ["AWS_IO_MODE"] = mode
+            latencies, elapsed = await measure(client, args.duration, args.concurrency, senders)
+            print(
+                f"{label:28} {statistics.median(latencies):>8.1f} "
+                f"{percentile(latencies, 0.99):>8.1f} {len(latencies) / elapsed:>8.0f}"
+            )
+    os.environ.pop("AWS_IO_MODE", None)
+    aws.shutdown_io()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--senders", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="segundos por escenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
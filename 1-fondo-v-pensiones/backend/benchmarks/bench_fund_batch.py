@@ -0,0 +1,90 @@
+"""
+Benchmark del endpoint de lotes: N suscripciones/cancelaciones una a una
+contra un solo lote (FundModel.apply_operations) sobre DynamoDB.
+
+Cada ronda es un rebalanceo de un usuario nuevo: suscribirse a varios
+fondos y después cancelarlos. Se mide el tiempo por rebalanceo y las
+peticiones a DynamoDB que hace cada forma.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_fund_batch --rounds 50
+
+Con DYNAMODB_ENDPOINT usa dynamodb-local; si no, el servidor de moto (ver
+benchmarks.common).
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import dynamodb_resource
+
+os.environ["STORAGE_BACKEND"] = "dynamodb"
+# El catálogo sale del archivo semilla; el benchmark mide las escrituras
+os.environ.setdefault("FUND_CATALOG_SOURCE", "seed")
+
+from app.api import storage  # noqa: E402
+from app.api.models.fund import FundModel  # noqa: E402
+from app.api.storage.dynamodb import create_tables  # noqa: E402
+from app.core.aws import get_resource  # noqa: E402
+
+# Suman 350000 (el saldo inicial es 500000)
+FUND_IDS = [1, 2, 3, 5]
+
+
+class RequestCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, **kwargs):
+        self.count += 1
+
+
+async def one_by_one(user_id):
+    for fund_id in FUND_IDS:
+        await FundModel.subscribe_to_fund(user_id, fund_id)
+    for fund_id in FUND_IDS:
+        await FundModel.unsubscribe_from_fund(user_id, str(fund_id))
+
+
+async def batched(user_id):
+    await FundModel.apply_operations(user_id, [{"action": "subscribe", "fund_id": f} for f in FUND_IDS])
+    await FundModel.apply_operations(user_id, [{"action": "unsubscribe", "fund_id": f} for f in FUND_IDS])
+
+
+def measure(label, rebalance, rounds, counter):
+    loop = asyncio.new_event_loop()
+    counter.count = 0
+    start = time.perf_counter()
+    for i in range(rounds):
+        loop.run_until_complete(rebalance(f"{label}_{i}"))
+    elapsed = time.perf_counter() - start
+    loop.close()
+    return elapsed / rounds * 1000, counter.count / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    dynamodb, server = dynamodb_resource()
+    create_tables(dynamodb)
+    storage.reset_user_funds_store()
+    counter = RequestCounter()
+    get_resource('dynamodb').meta.client.meta.events.register('before-send.dynamodb', counter)
+
+    operations = 2 * len(FUND_IDS)
+    print(f"Backend: {'moto server ' if server else 'dynamodb-local '}{os.environ['DYNAMODB_ENDPOINT']}")
+    print(f"{operations} operaciones por rebalanceo, {args.rounds} rebalanceos\n")
+    print(f"{'forma':14} {'ms/rebalanceo':>14} {'peticiones':>11}")
+    for label, rebalance in (("una a una", one_by_one), ("lote", batched)):
+        ms, requests = measure(label.replace(" ", "_"), rebalance, args.rounds, counter)
+        print(f"{label:14} {ms:>14.1f} {requests:>11.1f}")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
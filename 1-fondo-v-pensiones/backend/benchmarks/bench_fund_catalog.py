@@ -0,0 +1,70 @@
+"""
+Benchmark del catálogo de fondos.
+
+Compara la búsqueda por id con el recorrido lineal anterior (for sobre la
+lista de fondos) y el índice del catálogo, y mide los filtros por categoría
+y monto mínimo, para catálogos de distintos tamaños.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_fund_catalog --sizes 5 1000 10000 --lookups 100000
+"""
+import argparse
+import random
+import time
+
+from app.services.fund_catalog import CatalogSnapshot
+
+
+def make_funds(count):
+    return [
+        {
+            "id": i,
+            "nombre": f"FONDO_{i}",
+            "monto_minimo": 5000 * random.randint(1, 100),
+            "categoria": random.choice(("FPV", "FIC", "CDT"))
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def linear_get(funds, fund_id):
+    # Búsqueda anterior de FundModel.get_fund
+    for fund in funds:
+        if fund["id"] == fund_id:
+            return fund
+    return None
+
+
+def per_call_us(fn, ids):
+    start = time.perf_counter()
+    for fund_id in ids:
+        fn(fund_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'fondos':>8} {'lineal µs':>10} {'índice µs':>10} {'categoría µs':>13} {'monto µs':>9} {'carga ms':>9}")
+    for size in args.sizes:
+        funds = make_funds(size)
+        start = time.perf_counter()
+        catalog = CatalogSnapshot(funds)
+        build_ms = (time.perf_counter() - start) * 1000
+        ids = [random.randint(1, size) for _ in range(args.lookups)]
+
+        # El recorrido lineal se mide con menos búsquedas en catálogos grandes
+        linear_ids = ids[:max(100, args.lookups * 5 // size)]
+        linear = per_call_us(lambda i: linear_get(funds, i), linear_ids)
+        indexed = per_call_us(catalog.get, ids)
+        queries = ids[:1000]
+        by_category = per_call_us(lambda i: catalog.search(categoria="FIC"), queries)
+        by_amount = per_call_us(lambda i: catalog.search(monto_maximo=50000), queries)
+        print(f"{size:>8} {linear:>10.2f} {indexed:>10.3f} {by_category:>13.1f} {by_amount:>9.1f} {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark de los endpoints de lectura más frecuentes: /funds/, /funds/user
+y /transactions/.
+
+Compara, en proceso (httpx contra la app ASGI, sin red), los handlers
+anteriores (response_model: validación con Pydantic + json) con los
+actuales (catálogo ya serializado y ORJSONResponse). Reporta peticiones por
+segundo de cada endpoint.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_hot_reads --requests 2000 --transactions 50
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+os.environ.setdefault("FUND_CATALOG_SOURCE", "seed")
+
+import httpx  # noqa: E402
+from fastapi import APIRouter, FastAPI, Query, Request, Response  # noqa: E402
+
+from app.api.models.fund import FundModel  # noqa: E402
+from app.api.models.transaction import TransactionModel, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE  # noqa: E402
+from app.api.routes import funds, transactions  # noqa: E402
+from app.api.schemas.fund import Fund, UserFunds  # noqa: E402
+from app.api.schemas.transaction import TransactionResponse  # noqa: E402
+from app.core.http_cache import cache_headers, is_not_modified  # noqa: E402
+
+USER_ID = "bench_user"
+
+ENDPOINTS = (
+    ("/funds/", {}),
+    ("/funds/user", {"user_id": USER_ID}),
+    ("/transactions/", {"user_id": USER_ID}),
+)
+
+
+def baseline_app() -> FastAPI:
+    """
+    Los handlers anteriores: response_model y la codificación por defecto
+    """
+    funds_router = APIRouter()
+    transactions_router = APIRouter()
+
+    @funds_router.get("/", response_model=List[Fund])
+    async def read_funds(
+        request: Request,
+        response: Response,
+        categoria: Optional[str] = None,
+        monto_maximo: Optional[float] = None
+    ):
+        catalog = await FundModel.get_catalog()
+        headers = cache_headers(catalog.etag, catalog.last_modified)
+        if is_not_modified(request, catalog.etag, catalog.last_modified):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return catalog.search(categoria, monto_maximo)
+
+    @funds_router.get("/user", response_model=UserFunds)
+    async def get_user_funds(user_id: str = "default_user"):
+        return await FundModel.get_user_funds(user_id)
+
+    @transactions_router.get("/", response_model=List[TransactionResponse])
+    async def get_transactions(
+        response: Response,
+        user_id: str = "default_user",
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None
+    ):
+        page = await TransactionModel.get_user_transactions_page(user_id, limit=limit, cursor=cursor)
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["items"]
+
+    app = FastAPI()
+    app.include_router(funds_router, prefix="/funds")
+    app.include_router(transactions_router, prefix="/transactions")
+    return app
+
+
+def current_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(funds.router, prefix="/funds")
+    app.include_router(transactions.router, prefix="/transactions")
+    return app
+
+
+async def seed(transaction_count):
+    # Suscribir y cancelar el fondo 3 (50000) deja 2 transacciones por ciclo
+    for _ in range(transaction_count // 2):
+        await FundModel.subscribe_to_fund(USER_ID, 3)
+        await FundModel.unsubscribe_from_fund(USER_ID, "3")
+    for fund_id in (1, 2):
+        await FundModel.subscribe_to_fund(USER_ID, fund_id)
+
+
+async def requests_per_second(app, path, params, requests):
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        expected = await client.get(path, params=params)
+        expected.raise_for_status()
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path, params=params)
+        return requests / (time.perf_counter() - start), expected.json()
+
+
+async def main_async(args):
+    await seed(args.transactions)
+    apps = (("antes", baseline_app()), ("ahora", current_app()))
+    print(f"{args.requests} peticiones por endpoint, {args.transactions} transacciones\n")
+    print(f"{'endpoint':16} {'antes req/s':>12} {'ahora req/s':>12} {'mejora':>8}")
+    for path, params in ENDPOINTS:
+        results = [await requests_per_second(app, path, params, args.requests) for _, app in apps]
+        (before, before_body), (after, after_body) = results
+        # Mismo contenido con las dos formas
+        assert before_body == after_body, path
+        print(f"{path:16} {before:>12.0f} {after:>12.0f} {after / before:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
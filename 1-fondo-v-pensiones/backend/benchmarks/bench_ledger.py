@@ -0,0 +1,76 @@
+"""
+Benchmark del ledger de saldos con una cuenta de muchos movimientos: costo
+de registrar movimientos (incluidas las fotos), de leer el saldo actual y
+el de una fecha, según cada cuántos movimientos se toma una foto. La fila
+"sin fotos" es reconstruir el saldo sumando todo el historial.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_ledger --entries 100000 --every 100 1000 10000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.api.storage import INITIAL_BALANCE
+from app.api.storage.ledger import AccountLedger
+
+AMOUNTS = (75000, 125000, 50000, 250000, 100000)
+
+
+def synthetic_entries(total, seed=7):
+    """(micros, delta) en orden cronológico: suscripciones y cancelaciones"""
+    rng = random.Random(seed)
+    moment = 1_600_000_000_000_000
+    for _ in range(total):
+        moment += rng.randrange(1, 5_000_000)
+        amount = rng.choice(AMOUNTS)
+        yield moment, float(-amount if rng.random() < 0.5 else amount)
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--every", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    entries = list(synthetic_entries(args.entries))
+    rng = random.Random(1)
+    cutoffs = [(rng.randrange(entries[0][0], entries[-1][0]),) for _ in range(args.lookups)]
+    # Sin fotos: una foto cada más movimientos de los que hay
+    settings = [(f"cada {every:,}", every) for every in args.every] + [("sin fotos", args.entries + 1)]
+
+    print(f"{args.entries:,} movimientos en una cuenta\n")
+    print(f"{'fotos':14} {'registro (s)':>13} {'µs/mov':>8} {'fotos (KB)':>11} "
+          f"{'saldo (µs)':>11} {'a fecha (µs)':>13} {'foto (µs)':>10}")
+    for label, every in settings:
+        account = AccountLedger(INITIAL_BALANCE, every)
+        start = time.perf_counter()
+        for micros, delta in entries:
+            account.append(micros, delta)
+        elapsed = time.perf_counter() - start
+        assert account.balance() == account.replay()
+
+        # Peor caso de lectura: justo antes de la siguiente foto
+        current = timed(lambda: account._balance_until(len(account) - 1), [()] * args.lookups)
+        as_of = timed(account.balance_at, cutoffs)
+        # Tomar una foto: sumar un bloque de `every` movimientos
+        block = min(every, len(account))
+        snapshot = timed(lambda: account.opening_balance + sum(account.deltas[:block]), [()] * 50)
+        print(f"{label:14} {elapsed:>13.3f} {elapsed / args.entries * 1e6:>8.2f} "
+              f"{account.snapshots.itemsize * len(account.snapshots) / 1024:>11.1f} "
+              f"{current:>11.1f} {as_of:>13.1f} {snapshot:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark del backend SQLite: inserción de transacciones fila por fila
+(una transacción de la base por fila) contra en lote (executemany en una
+sola transacción), página del historial de un usuario a medida que crece
+la tabla y suscripciones concurrentes por el pool de conexiones.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_sqlite_store --rows 100000 --users 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.api.models.transaction import TransactionModel
+from app.api.storage.portfolio import UNKNOWN_CATEGORY
+from app.api.storage.sqlite import SQLiteDatabase, SQLiteUserFundsStore
+
+PAGE_SIZE = 50
+BATCH = 1000
+
+
+def synthetic_transactions(total, users, seed=7):
+    rng = random.Random(seed)
+    for _ in range(total):
+        yield TransactionModel.build_transaction(
+            f"user_{rng.randrange(users)}", rng.randint(1, 5), "SUBSCRIPTION", 50000, "DEUDAPRIVADA"
+        )
+
+
+async def bench(args, path):
+    database = SQLiteDatabase(path, args.pool)
+    store = SQLiteUserFundsStore(database)
+    rows = list(synthetic_transactions(args.rows, args.users))
+
+    single = rows[:args.single]
+    start = time.perf_counter()
+    for row in single:
+        await store.transactions.add_many([row])
+    elapsed = time.perf_counter() - start
+    print(f"fila por fila: {len(single) / elapsed:>10,.0f} filas/s")
+
+    bulk = rows[args.single:]
+    start = time.perf_counter()
+    for i in range(0, len(bulk), BATCH):
+        await store.transactions.add_many(bulk[i:i + BATCH])
+    elapsed = time.perf_counter() - start
+    print(f"en lote ({BATCH}): {len(bulk) / elapsed:>10,.0f} filas/s")
+
+    samples = []
+    for user in range(min(args.users, 200)):
+        start = time.perf_counter()
+        await store.transactions.user_history(f"user_{user}", PAGE_SIZE)
+        samples.append((time.perf_counter() - start) * 1e3)
+    print(f"página de historial ({PAGE_SIZE}): p50 {statistics.median(samples):.2f} ms, "
+          f"p99 {statistics.quantiles(samples, n=100)[98]:.2f} ms con {args.rows:,} filas")
+
+    # Suscripciones concurrentes de usuarios distintos (escrituras serializadas)
+    subscription = {"id": "3", "name": "DEUDAPRIVADA", "amount": 50000, "category": UNKNOWN_CATEGORY}
+
+    async def subscribe(user):
+        transaction = TransactionModel.build_transaction(f"new_{user}", 3, "SUBSCRIPTION", 50000, "DEUDAPRIVADA")
+        subscription_row = dict(subscription, subscription_date=transaction["timestamp"])
+        await store.subscribe(f"new_{user}", subscription_row, transaction)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(subscribe(user) for user in range(args.subscriptions)))
+    elapsed = time.perf_counter() - start
+    print(f"suscripciones concurrentes: {args.subscriptions / elapsed:>10,.0f}/s con pool de {args.pool}")
+    database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=2000)
+    parser.add_argument("--subscriptions", type=int, default=2000)
+    parser.add_argument("--pool", type=int, default=int(os.environ.get("SQLITE_POOL_SIZE", "8")))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(bench(args, os.path.join(directory, "bench.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark de contención para suscripciones/cancelaciones sobre DynamoDB.
+
+Varios hilos (como varias instancias de la API) suscriben y cancelan fondos
+del mismo usuario o de usuarios distintos. Al final se verifica que el saldo
+de cada usuario cuadra con sus suscripciones y con la tabla Transactions.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_subscribe_contention --workers 8 --ops 50
+
+Con DYNAMODB_ENDPOINT apunta a dynamodb-local (docker-compose), que es el
+escenario representativo. Sin DYNAMODB_ENDPOINT usa el servidor de moto
+(ver benchmarks.common), así los hilos hablan HTTP con un único "servidor"
+igual que varias instancias de la API.
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import boto3
+
+from benchmarks.common import dynamodb_resource
+
+os.environ["STORAGE_BACKEND"] = "dynamodb"
+# El catálogo sale del archivo semilla; el benchmark mide las escrituras
+os.environ.setdefault("FUND_CATALOG_SOURCE", "seed")
+
+from app.api import storage  # noqa: E402
+from app.api.models.fund import FundModel  # noqa: E402
+from app.api.storage import INITIAL_BALANCE  # noqa: E402
+from app.api.storage.dynamodb import create_tables, from_dynamo  # noqa: E402
+from app.services.fund_catalog import load_seed_funds  # noqa: E402
+
+INITIAL_FUNDS = load_seed_funds()
+
+
+def worker(user_ids, ops, seed, results, barrier):
+    rng = random.Random(seed)
+    loop = asyncio.new_event_loop()
+    counts = Counter()
+    barrier.wait()
+    for _ in range(ops):
+        user_id = rng.choice(user_ids)
+        fund = rng.choice(INITIAL_FUNDS)
+        try:
+            if rng.random() < 0.6:
+                loop.run_until_complete(FundModel.subscribe_to_fund(user_id, fund["id"]))
+                counts["subscribe_ok"] += 1
+            else:
+                loop.run_until_complete(FundModel.unsubscribe_from_fund(user_id, str(fund["id"])))
+                counts["unsubscribe_ok"] += 1
+        except ValueError as e:
+            counts[f"rejected: {e}"] += 1
+    loop.close()
+    results.append(counts)
+
+
+def verify(dynamodb, user_ids):
+    """
+    Comprobar que balance + suscripciones activas == saldo inicial y que el
+    historial de transacciones reproduce el balance guardado
+    """
+    user_table = dynamodb.Table(os.environ.get('USER_FUNDS_TABLE', 'UserFunds'))
+    tx_table = dynamodb.Table(os.environ.get('TRANSACTIONS_TABLE', 'Transactions'))
+    violations = 0
+    for user_id in user_ids:
+        item = user_table.get_item(Key={'user_id': user_id}, ConsistentRead=True).get('Item')
+        if not item:
+            continue
+        item = from_dynamo(item)
+        invested = sum(f["amount"] for f in item["subscribed_funds"].values())
+        replayed = INITIAL_BALANCE
+        query = {"KeyConditionExpression": boto3.dynamodb.conditions.Key('user_id').eq(user_id)}
+        while True:
+            page = tx_table.query(**query)
+            for t in page["Items"]:
+                amount = from_dynamo(t["amount"])
+                replayed += -amount if t["type"] == "SUBSCRIPTION" else amount
+            if "LastEvaluatedKey" not in page:
+                break
+            query["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+        if item["balance"] < 0 or item["balance"] + invested != INITIAL_BALANCE or replayed != item["balance"]:
+            violations += 1
+    return violations
+
+
+def run_scenario(name, user_ids, workers, ops):
+    storage.reset_user_funds_store()
+    results, barrier = [], threading.Barrier(workers)
+    threads = [
+        threading.Thread(target=worker, args=(user_ids, ops, seed, results, barrier))
+        for seed in range(workers)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    totals = Counter()
+    for counts in results:
+        totals.update(counts)
+    total_ops = workers * ops
+    print(f"\n[{name}] workers={workers} users={len(user_ids)} ops={total_ops}")
+    print(f"  {total_ops / elapsed:,.0f} ops/s ({elapsed:.2f}s)")
+    for key, value in sorted(totals.items()):
+        print(f"  {key}: {value}")
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50, help="operaciones por hilo")
+    parser.add_argument("--users", type=int, default=64, help="usuarios en el escenario sin contención")
+    args = parser.parse_args()
+
+    dynamodb, server = dynamodb_resource()
+    create_tables(dynamodb)
+    print(f"Backend: {'moto server ' if server else 'dynamodb-local '}{os.environ['DYNAMODB_ENDPOINT']}")
+
+    hot = run_scenario("mismo usuario", ["hot_user"], args.workers, args.ops)
+    spread = run_scenario(
+        "usuarios distintos",
+        [f"user_{i}" for i in range(args.users)],
+        args.workers,
+        args.ops
+    )
+    violations = verify(dynamodb, hot + spread)
+    print(f"\nUsuarios con saldo inconsistente: {violations}")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
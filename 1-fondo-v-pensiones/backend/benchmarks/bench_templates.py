@@ -0,0 +1,107 @@
+"""
+Benchmark de las plantillas de notificación.
+
+Compara renders/s del email de un fondo armado con f-strings en cada envío
+(como lo hacía NotificationService.send_email), con las plantillas
+compiladas sin caché y con la caché por (fondo, plantilla, idioma). También
+compara el tamaño del payload de SendEmail (cuerpos completos) contra
+SendTemplatedEmail (solo las variables de la plantilla guardada en SES).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_templates --iterations 200000
+"""
+import argparse
+import json
+import time
+
+from app.services import notification_templates as templates
+from app.services.notification_service import notification_service
+
+FUNDS = [
+    {"id": 1, "nombre": "FPV_EL_CLIENTE_RECAUDADORA", "monto_minimo": 75000, "categoria": "FPV"},
+    {"id": 2, "nombre": "FPV_EL_CLIENTE_ECOPETROL", "monto_minimo": 125000, "categoria": "FPV"},
+    {"id": 3, "nombre": "DEUDAPRIVADA", "monto_minimo": 50000, "categoria": "FIC"},
+    {"id": 4, "nombre": "FDO-ACCIONES", "monto_minimo": 250000, "categoria": "FIC"},
+    {"id": 5, "nombre": "FPV_EL CLIENTE_DINAMICA", "monto_minimo": 100000, "categoria": "FPV"},
+]
+
+
+def fstring_email(fund_data):
+    # Copia del armado anterior de send_email
+    subject = f"Notificación sobre el fondo {fund_data['nombre']}"
+    body_html = f"""
+                <html>
+                <head></head>
+                <body>
+                    <h2>Información sobre su fondo</h2>
+                    <p>Detalles del fondo:</p>
+                    <ul>
+                        <li>Nombre: {fund_data['nombre']}</li>
+                        <li>Categoría: {fund_data['categoria']}</li>
+                        <li>Monto mínimo: ${fund_data['monto_minimo']:,}</li>
+                    </ul>
+                    <p>Gracias por confiar en nosotros para administrar sus inversiones.</p>
+                </body>
+                </html>
+            """
+    body_text = f"""
+                Información sobre su fondo
+
+                Detalles del fondo:
+                - Nombre: {fund_data['nombre']}
+                - Categoría: {fund_data['categoria']}
+                - Monto mínimo: ${fund_data['monto_minimo']:,}
+
+                Gracias por confiar en nosotros para administrar sus inversiones.
+            """
+    return subject, body_html, body_text
+
+
+def compiled_email(fund_data):
+    template = templates.get_email_template(templates.FUND_INFO)
+    return template.render(templates.fund_template_data(fund_data))
+
+
+def measure(render, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        render(FUNDS[i % len(FUNDS)])
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'render':32} {'renders/s':>12}")
+    for label, render in (
+        ("f-strings por envío", fstring_email),
+        ("plantilla compilada", compiled_email),
+        ("plantilla compilada + caché", templates.render_fund_email),
+    ):
+        print(f"{label:32} {measure(render, args.iterations):>12,.0f}")
+
+    fund = FUNDS[0]
+    subject, body_html, body_text = templates.render_fund_email(fund)
+    send_email = {
+        "Source": "noreply@example.com",
+        "Destination": {"ToAddresses": ["user@example.com"]},
+        "Message": {
+            "Subject": {"Data": subject},
+            "Body": {"Text": {"Data": body_text}, "Html": {"Data": body_html}}
+        }
+    }
+    send_templated = {
+        "Source": "noreply@example.com",
+        "Destination": {"ToAddresses": ["user@example.com"]},
+        "Template": templates.get_email_template(templates.FUND_INFO).ses_name(notification_service.template_prefix),
+        "TemplateData": json.dumps(templates.fund_template_data(fund))
+    }
+    print()
+    print(f"payload SendEmail:          {len(json.dumps(send_email).encode()):>6} bytes")
+    print(f"payload SendTemplatedEmail: {len(json.dumps(send_templated).encode()):>6} bytes")
+
+
+if __name__ == "__main__":
+    main()
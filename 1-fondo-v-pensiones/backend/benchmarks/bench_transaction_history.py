@@ -0,0 +1,106 @@
+"""
+Benchmark del historial de transacciones a medida que crece la partición
+del usuario (10 -> 100k filas).
+
+Compara la consulta anterior (toda la partición + sort en Python) con la
+página de GET /transactions (Limit + ScanIndexForward=False). Se reporta la
+latencia y cuántos ítems viajan por respuesta.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_transaction_history --sizes 10,100,1000,10000,100000
+
+Con DYNAMODB_ENDPOINT apunta a dynamodb-local. Sin él usa el servidor de
+moto; moto recorre todos los ítems de la tabla en cada query, así que allí
+la latencia de la página crece con el tamaño de la tabla aunque los ítems
+devueltos se mantengan constantes. DynamoDB (y dynamodb-local) usan el
+índice de la llave de ordenamiento y la latencia de la página se mantiene.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from boto3.dynamodb.conditions import Key
+
+from app.api.models.transaction import TransactionModel
+from app.api.storage.dynamodb import create_tables
+from benchmarks.common import dynamodb_resource
+
+PAGE_SIZE = 50
+
+
+def populate(table, user_id, rows):
+    with table.batch_writer() as batch:
+        for i in range(rows):
+            batch.put_item(Item={
+                "id": f"tx_{user_id}_{i}",
+                "user_id": user_id,
+                "fund_id": 1,
+                "fund_name": "FPV_EL_CLIENTE_RECAUDADORA",
+                "type": "SUBSCRIPTION" if i % 2 == 0 else "CANCELLATION",
+                "amount": 75000,
+                "timestamp": f"2024-01-01T00:00:00.{i:06d}"
+            })
+
+
+def legacy_history(table, user_id):
+    """Consulta anterior: una sola query de la partición y sort en Python"""
+    items = table.query(KeyConditionExpression=Key('user_id').eq(user_id)).get('Items', [])
+    items.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+    return items
+
+
+def timed(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    dynamodb, server = dynamodb_resource()
+    os.environ["STORAGE_BACKEND"] = "dynamodb"
+    create_tables(dynamodb)
+    table = dynamodb.Table(os.environ.get('TRANSACTIONS_TABLE', 'Transactions'))
+    loop = asyncio.new_event_loop()
+    print(f"Backend: {'moto server ' if server else 'dynamodb-local '}{os.environ['DYNAMODB_ENDPOINT']}")
+    print(f"{'filas':>8} | {'anterior ms':>11} | {'ítems':>6} | {'página ms':>9} | {'ítems':>5} | {'pág. 2 ms':>9}")
+
+    for rows in sizes:
+        user_id = f"user_{rows}"
+        populate(table, user_id, rows)
+
+        legacy_ms, legacy_items = timed(lambda: legacy_history(table, user_id), args.repeat)
+        page_ms, page = timed(
+            lambda: loop.run_until_complete(TransactionModel.get_transactions_page(user_id, PAGE_SIZE)),
+            args.repeat
+        )
+        next_ms = 0.0
+        if page["next_cursor"]:
+            next_ms, _ = timed(
+                lambda: loop.run_until_complete(
+                    TransactionModel.get_transactions_page(user_id, PAGE_SIZE, page["next_cursor"])
+                ),
+                args.repeat
+            )
+        print(
+            f"{rows:>8} | {legacy_ms:>11.1f} | {len(legacy_items):>6} | "
+            f"{page_ms:>9.1f} | {len(page['items']):>5} | {next_ms:>9.1f}"
+        )
+
+    loop.close()
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark del almacén de transacciones en memoria: lista global (filtro +
+sort por consulta, como antes) contra TransactionIndex.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_transaction_index --transactions 1000000 --users 100000
+"""
+import argparse
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.api.storage.transaction_index import TransactionIndex
+
+FUNDS = [
+    (1, "FPV_EL_CLIENTE_RECAUDADORA", 75000),
+    (2, "FPV_EL_CLIENTE_ECOPETROL", 125000),
+    (3, "DEUDAPRIVADA", 50000),
+    (4, "FDO-ACCIONES", 250000),
+    (5, "FPV_EL CLIENTE_DINAMICA", 100000),
+]
+
+
+def synthetic_transactions(total, users, seed=7):
+    """Transacciones en orden cronológico repartidas entre `users` usuarios"""
+    rng = random.Random(seed)
+    moment = datetime(2020, 1, 1)
+    step = timedelta(microseconds=37)
+    for i in range(total):
+        fund_id, fund_name, amount = FUNDS[rng.randrange(len(FUNDS))]
+        moment += step
+        yield {
+            "id": f"tx_{i:08d}",
+            "user_id": f"user_{rng.randrange(users)}",
+            "fund_id": fund_id,
+            "fund_name": fund_name,
+            "type": "SUBSCRIPTION" if rng.random() < 0.6 else "CANCELLATION",
+            "amount": amount,
+            "timestamp": moment.isoformat()
+        }
+
+
+def measure_build(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, elapsed, current
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--legacy-lookups", type=int, default=5, help="el filtro lineal es lento")
+    args = parser.parse_args()
+
+    def build_index():
+        index = TransactionIndex()
+        for transaction in synthetic_transactions(args.transactions, args.users):
+            index.append(transaction)
+        return index
+
+    index, index_s, index_bytes = measure_build(build_index)
+    legacy, legacy_s, legacy_bytes = measure_build(
+        lambda: list(synthetic_transactions(args.transactions, args.users))
+    )
+
+    rng = random.Random(1)
+    users = [(f"user_{rng.randrange(args.users)}",) for _ in range(args.lookups)]
+    ids = [(f"tx_{rng.randrange(args.transactions):08d}",) for _ in range(args.lookups)]
+    middle = legacy[len(legacy) // 2]["timestamp"]
+
+    def legacy_history(user_id):
+        user_transactions = [t for t in legacy if t["user_id"] == user_id]
+        return sorted(user_transactions, key=lambda x: x["timestamp"], reverse=True)
+
+    def legacy_get(transaction_id):
+        return next((t for t in legacy if t["id"] == transaction_id), None)
+
+    print(f"{args.transactions:,} transacciones, {args.users:,} usuarios\n")
+    print(f"{'':32} {'lista (antes)':>15} {'TransactionIndex':>18}")
+    print(f"{'construcción (s)':32} {legacy_s:>15.2f} {index_s:>18.2f}")
+    print(f"{'memoria (MB)':32} {legacy_bytes / 2**20:>15.1f} {index_bytes / 2**20:>18.1f}")
+    print(f"{'historial de usuario (µs)':32} "
+          f"{timed(legacy_history, users[:args.legacy_lookups]):>15,.0f} "
+          f"{timed(index.user_history, users):>18,.1f}")
+    print(f"{'página de 50 (µs)':32} {'-':>15} "
+          f"{timed(lambda u: index.user_history(u, 50), users):>18,.1f}")
+    print(f"{'rango de fechas (µs)':32} {'-':>15} "
+          f"{timed(lambda u: index.user_history(u, start=middle), users):>18,.1f}")
+    print(f"{'búsqueda por id (µs)':32} "
+          f"{timed(legacy_get, ids[:args.legacy_lookups]):>15,.0f} "
+          f"{timed(index.get, ids):>18,.2f}")
+
+
+if __name__ == "__main__":
+    main()
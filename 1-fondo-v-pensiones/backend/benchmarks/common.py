@@ -0,0 +1,43 @@
+"""
+Utilidades compartidas por los benchmarks
+"""
+import logging
+import os
+import threading
+
+import boto3
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def start_moto_server(service="dynamodb"):
+    """
+    Levantar el servidor de moto de `service` (requiere moto[server]) en un
+    hilo que atiende una petición a la vez. moto no es seguro entre hilos en
+    modo decorador; así los clientes hablan HTTP con un único "servidor".
+    """
+    from moto.server import DomainDispatcherApplication, create_backend_app
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = DomainDispatcherApplication(create_backend_app, service=service)
+    server = make_server("127.0.0.1", 0, app, threaded=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def dynamodb_resource():
+    """
+    Resource de DynamoDB contra DYNAMODB_ENDPOINT (dynamodb-local) o, si no
+    está definido, contra un servidor de moto nuevo. Devuelve (resource, server).
+    """
+    server = None
+    endpoint = os.environ.get("DYNAMODB_ENDPOINT")
+    if not endpoint:
+        server = start_moto_server()
+        endpoint = f"http://127.0.0.1:{server.server_port}"
+        os.environ["DYNAMODB_ENDPOINT"] = endpoint
+    resource = boto3.resource('dynamodb', region_name=os.environ["AWS_DEFAULT_REGION"], endpoint_url=endpoint)
+    return resource, server
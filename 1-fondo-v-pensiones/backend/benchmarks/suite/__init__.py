@@ -0,0 +1,5 @@
+"""
+Suite de benchmarks de la API, sin red: microbenchmarks de los modelos y
+servicios y carga HTTP contra uvicorn en el mismo proceso. Ver
+benchmarks/suite/__main__.py.
+"""
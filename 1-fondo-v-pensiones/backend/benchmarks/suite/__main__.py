@@ -0,0 +1,70 @@
+"""
+Suite de benchmarks de la API.
+
+Corre sin red contra el backend en memoria o DynamoDB de moto (SES y SNS
+también son servidores de moto):
+  - micro: FundModel, TransactionModel y NotificationService (p50/p95/p99,
+    op/s y memoria asignada según tracemalloc)
+  - http: usuarios virtuales con una mezcla de suscripciones/cancelaciones,
+    historial y notificaciones contra uvicorn en el mismo proceso
+
+Los resultados se guardan en JSON (por defecto benchmarks/results/<commit>.json)
+para comparar corridas de distintos commits.
+
+Uso (desde backend/):
+    python -m benchmarks.suite [--backend memory|dynamodb] [--quick]
+    python -m benchmarks.suite --only micro --compare benchmarks/results/abc1234.json
+    python -m benchmarks.suite.results ANTES.json AHORA.json
+"""
+import argparse
+import asyncio
+import sys
+
+from benchmarks.suite.environment import BACKENDS, MEMORY, BenchmarkEnvironment
+from benchmarks.suite.load import run_load
+from benchmarks.suite.micro import run_micro
+from benchmarks.suite.results import compare, load_results, metadata, save_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default=MEMORY)
+    parser.add_argument("--only", choices=("micro", "http"), help="correr solo una parte")
+    parser.add_argument("--micro-filter", nargs="*", help="prefijos de los microbenchmarks (fund., transaction., ...)")
+    parser.add_argument("--iterations", type=int, default=2000, help="operaciones por microbenchmark")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="tiempo máximo por microbenchmark")
+    parser.add_argument("--alloc-iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="usuarios virtuales")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de carga HTTP")
+    parser.add_argument("--quick", action="store_true", help="corrida corta (humo)")
+    parser.add_argument("--output", help="archivo JSON de resultados")
+    parser.add_argument("--compare", help="resultados anteriores para comparar")
+    parser.add_argument("--threshold", type=float, default=0.15, help="umbral de regresión (0.15 = 15%%)")
+    args = parser.parse_args()
+    if args.quick:
+        args.iterations, args.max_seconds, args.alloc_iterations, args.duration = 200, 1.0, 50, 3.0
+
+    settings = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    results = {"meta": metadata(settings)}
+    with BenchmarkEnvironment(args.backend):
+        if args.only in (None, "micro"):
+            print(f"Microbenchmarks ({args.backend})")
+            results["micro"] = asyncio.run(run_micro(
+                args.iterations, args.max_seconds, args.alloc_iterations, only=args.micro_filter
+            ))
+        if args.only in (None, "http"):
+            print(f"\nCarga HTTP ({args.backend}): {args.concurrency} usuarios, {args.duration:.0f} s")
+            results["http"] = run_load(args.concurrency, args.duration)
+
+    path = save_results(results, args.output)
+    print(f"\nResultados: {path}")
+
+    if args.compare:
+        print()
+        regressions = compare(load_results(args.compare), results, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
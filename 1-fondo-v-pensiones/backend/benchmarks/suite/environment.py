@@ -0,0 +1,63 @@
+"""
+Entorno sin red para la suite: servidores de moto para SES y SNS (y
+DynamoDB con --backend dynamodb) y el backend de persistencia elegido
+"""
+import os
+
+from benchmarks.common import dynamodb_resource, start_moto_server
+
+MEMORY = "memory"
+DYNAMODB = "dynamodb"
+BACKENDS = (MEMORY, DYNAMODB)
+
+SOURCE_EMAIL = "no-reply@fondos.example.com"
+
+# El catálogo sale del archivo semilla en los dos backends
+os.environ.setdefault("FUND_CATALOG_SOURCE", "seed")
+
+from app.api import storage  # noqa: E402
+from app.api.storage.dynamodb import create_tables  # noqa: E402
+from app.core.aws import get_client, reset_clients  # noqa: E402
+from app.services.fund_catalog import fund_catalog  # noqa: E402
+from app.services.notification_service import notification_service  # noqa: E402
+
+
+class BenchmarkEnvironment:
+    """
+    Levanta los servidores de moto y configura la aplicación para usarlos
+    """
+
+    def __init__(self, backend: str = MEMORY):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend no soportado: {backend}")
+        self.backend = backend
+        self.servers = []
+        self.dynamodb_endpoint = None
+
+    def __enter__(self):
+        for service, variable in (("ses", "SES_ENDPOINT"), ("sns", "SNS_ENDPOINT")):
+            server = start_moto_server(service)
+            self.servers.append(server)
+            os.environ[variable] = f"http://127.0.0.1:{server.server_port}"
+
+        os.environ["STORAGE_BACKEND"] = self.backend
+        if self.backend == DYNAMODB:
+            dynamodb, server = dynamodb_resource()
+            if server:
+                self.servers.append(server)
+            create_tables(dynamodb)
+            self.dynamodb_endpoint = os.environ["DYNAMODB_ENDPOINT"]
+
+        reset_clients()
+        storage.reset_user_funds_store()
+        fund_catalog.reset()
+
+        get_client('ses').verify_email_identity(EmailAddress=SOURCE_EMAIL)
+        notification_service.source_email = SOURCE_EMAIL
+        return self
+
+    def __exit__(self, *exc_info):
+        for server in self.servers:
+            server.shutdown()
+        storage.reset_user_funds_store()
+        reset_clients()
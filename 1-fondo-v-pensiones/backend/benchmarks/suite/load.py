@@ -0,0 +1,155 @@
+"""
+Generador de carga HTTP contra la API servida por uvicorn en el mismo
+proceso (en un hilo, en un puerto local libre).
+
+Cada usuario virtual es un cliente con su propio user_id que repite una
+mezcla ponderada de escenarios: suscribirse o cancelar (alterna para que
+la operación sea válida), leer el historial y encolar una notificación.
+"""
+import asyncio
+import random
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.api.routes import funds, transactions
+from app.routers import notifications
+from benchmarks.suite.stats import latency_summary, resident_memory_mb
+
+# Peso de cada escenario en la mezcla
+DEFAULT_MIX = {
+    "write": 4,          # subscribe o unsubscribe
+    "history": 4,
+    "notification": 2
+}
+
+
+def build_app() -> FastAPI:
+    """
+    Los endpoints de fondos y transacciones de app/api y los de
+    notificaciones de app/routers
+    """
+    app = FastAPI()
+    app.include_router(funds.router, prefix="/funds")
+    app.include_router(transactions.router, prefix="/transactions")
+    app.include_router(notifications.router)
+    return app
+
+
+class InProcessServer:
+    """
+    uvicorn en un hilo con su propio event loop
+    """
+
+    def __init__(self, app: FastAPI):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(("127.0.0.1", 0))
+        self.port = self.socket.getsockname()[1]
+        config = uvicorn.Config(app, log_level="warning", access_log=False, lifespan="off")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn no arrancó")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+        self.socket.close()
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, user_id: str, rng: random.Random):
+        self.client = client
+        self.user_id = user_id
+        self.rng = rng
+        self.subscribed = False
+
+    async def write(self):
+        # Alterna suscripción y cancelación del fondo 3 (50000)
+        action = "unsubscribe" if self.subscribed else "subscribe"
+        body = {"fund_id": "3"} if self.subscribed else {"fund_id": 3}
+        response = await self.client.post(f"/funds/{action}", params={"user_id": self.user_id}, json=body)
+        if response.status_code == 200:
+            self.subscribed = not self.subscribed
+        return action, response
+
+    async def history(self):
+        return "history", await self.client.get("/transactions/", params={"user_id": self.user_id, "limit": 20})
+
+    async def notification(self):
+        return "notification", await self.client.post("/api/notifications/send", json={
+            "fund_id": self.rng.randint(1, 5),
+            "notification_type": "email",
+            "contact_info": f"{self.user_id}@example.com"
+        })
+
+
+async def generate_load(base_url: str, concurrency: int, duration: float, mix: Dict[str, int], seed: int) -> Dict:
+    """
+    `concurrency` usuarios virtuales durante `duration` segundos
+    """
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    scenarios, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def run_user(index: int, deadline: float):
+            rng = random.Random(seed + index)
+            user = VirtualUser(client, f"load_{index}", rng)
+            while time.perf_counter() < deadline:
+                scenario = getattr(user, rng.choices(scenarios, weights)[0])
+                began = time.perf_counter()
+                name, response = await scenario()
+                latencies.setdefault(name, []).append(time.perf_counter() - began)
+                if response.status_code >= 400:
+                    errors[name] = errors.get(name, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_user(i, start + duration) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    results = {}
+    for name, values in sorted(latencies.items()):
+        results[name] = dict(latency_summary(values, elapsed), errors=errors.get(name, 0))
+    everything = [value for values in latencies.values() for value in values]
+    results["total"] = dict(latency_summary(everything, elapsed), errors=sum(errors.values()))
+    return results
+
+
+def run_load(concurrency: int, duration: float, mix: Dict[str, int] = None, seed: int = 7) -> Dict:
+    """
+    Levantar la API y correr la carga. Devuelve un resumen por escenario y
+    el total, con el crecimiento de la memoria residente del proceso.
+    """
+    rss_before = resident_memory_mb()
+    with InProcessServer(build_app()) as server:
+        results = asyncio.run(generate_load(server.base_url, concurrency, duration, mix or DEFAULT_MIX, seed))
+    rss_after = resident_memory_mb()
+    if rss_before is not None and rss_after is not None:
+        results["total"]["rss_growth_mb"] = rss_after - rss_before
+    for name, result in results.items():
+        if result["count"]:
+            print(
+                f"  {name:14} {result['count']:>7} req {result['throughput']:>8.0f} req/s"
+                f"  p50 {result['p50_ms']:>7.2f}  p95 {result['p95_ms']:>7.2f}  p99 {result['p99_ms']:>7.2f} ms"
+                f"  errores {result['errors']}"
+            )
+    return results
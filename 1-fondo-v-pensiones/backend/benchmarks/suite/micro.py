@@ -0,0 +1,146 @@
+"""
+Microbenchmarks de FundModel, TransactionModel y NotificationService.
+
+Cada benchmark es una función que prepara sus datos y devuelve la
+operación a medir (una corrutina que recibe el número de iteración).
+"""
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from app.api.models.fund import FundModel
+from app.api.models.transaction import TransactionModel
+from app.services.notification_service import notification_service
+from benchmarks.suite.stats import allocations, latency_summary
+
+Operation = Callable[[int], Awaitable]
+
+FUND = {"id": 1, "nombre": "FPV_EL_CLIENTE_RECAUDADORA", "monto_minimo": 75000, "categoria": "FPV"}
+
+# Suscripción + cancelación del fondo 3 (2 transacciones por ciclo)
+HISTORY_CYCLES = 100
+
+BENCHMARKS: Dict[str, Callable[[], Awaitable[Operation]]] = {}
+
+
+def benchmark(name: str):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+async def subscribe_cycles(user_id: str, cycles: int):
+    for _ in range(cycles):
+        await FundModel.subscribe_to_fund(user_id, 3)
+        await FundModel.unsubscribe_from_fund(user_id, "3")
+
+
+@benchmark("fund.get_fund")
+async def get_fund():
+    async def operation(i):
+        await FundModel.get_fund(i % 5 + 1)
+    return operation
+
+
+@benchmark("fund.get_user_funds")
+async def get_user_funds():
+    await FundModel.subscribe_to_fund("micro_reader", 1)
+    await FundModel.subscribe_to_fund("micro_reader", 3)
+
+    async def operation(i):
+        await FundModel.get_user_funds("micro_reader")
+    return operation
+
+
+@benchmark("fund.subscribe_unsubscribe")
+async def subscribe_unsubscribe():
+    async def operation(i):
+        await FundModel.subscribe_to_fund("micro_writer", 3)
+        await FundModel.unsubscribe_from_fund("micro_writer", "3")
+    return operation
+
+
+@benchmark("fund.portfolio_summary")
+async def portfolio_summary():
+    await FundModel.subscribe_to_fund("micro_summary", 2)
+
+    async def operation(i):
+        await FundModel.get_portfolio_summary("micro_summary")
+    return operation
+
+
+@benchmark("transaction.history_page")
+async def history_page():
+    await subscribe_cycles("micro_history", HISTORY_CYCLES)
+
+    async def operation(i):
+        await TransactionModel.get_user_transactions_page("micro_history", limit=20)
+    return operation
+
+
+@benchmark("transaction.get")
+async def get_transaction():
+    result = await FundModel.subscribe_to_fund("micro_lookup", 4)
+
+    async def operation(i):
+        await TransactionModel.get_transaction(result["transaction_id"])
+    return operation
+
+
+@benchmark("notification.send_email")
+async def send_email():
+    async def operation(i):
+        success, message = await notification_service.send_email("cliente@example.com", FUND)
+        if not success:
+            raise RuntimeError(message)
+    return operation
+
+
+@benchmark("notification.send_sms")
+async def send_sms():
+    async def operation(i):
+        success, message = await notification_service.send_sms("+573001234567", FUND)
+        if not success:
+            raise RuntimeError(message)
+    return operation
+
+
+async def run_micro(
+    iterations: int,
+    max_seconds: float,
+    alloc_iterations: int,
+    warmup: int = 20,
+    only: Optional[Iterable[str]] = None
+) -> Dict[str, Dict]:
+    """
+    Correr los microbenchmarks (todos o los que empiezan por algún prefijo
+    de `only`). Cada uno hace hasta `iterations` operaciones o `max_seconds`
+    segundos, lo que pase primero.
+    """
+    prefixes = tuple(only or ())
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if prefixes and not name.startswith(prefixes):
+            continue
+        operation = await factory()
+        for i in range(warmup):
+            await operation(i)
+
+        latencies = []
+        start = time.perf_counter()
+        deadline = start + max_seconds
+        for i in range(iterations):
+            began = time.perf_counter()
+            await operation(i)
+            finished = time.perf_counter()
+            latencies.append(finished - began)
+            if finished > deadline:
+                break
+        result = latency_summary(latencies, time.perf_counter() - start)
+        result.update(await allocations(operation, min(alloc_iterations, len(latencies))))
+        results[name] = result
+        print(
+            f"  {name:28} {result['throughput']:>10.0f} op/s  p50 {result['p50_ms']:>8.3f} ms"
+            f"  p99 {result['p99_ms']:>8.3f} ms  pico {result['alloc_peak_kb']:>8.1f} KB"
+        )
+    return results
@@ -0,0 +1,118 @@
+"""
+Resultados de la suite en JSON y comparación entre dos corridas.
+
+Uso (desde backend/):
+    python -m benchmarks.suite.results ANTES.json AHORA.json [--threshold 0.15]
+
+Sale con código 1 si algún benchmark empeoró más que el umbral (menos
+throughput o más p50).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
+
+
+def git_revision() -> Dict:
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(__file__)
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain")
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def metadata(settings: Dict) -> Dict:
+    return dict(
+        git_revision(),
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpus=os.cpu_count(),
+        settings=settings
+    )
+
+
+def save_results(results: Dict, path: str = None) -> str:
+    """
+    Guardar los resultados (por defecto en benchmarks/results/<commit>.json)
+    """
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        meta = results["meta"]
+        name = meta["commit"] or time.strftime("%Y%m%d-%H%M%S")
+        if meta["dirty"]:
+            name += "-dirty"
+        path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "w") as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(path: str) -> Dict:
+    with open(path) as source:
+        return json.load(source)
+
+
+def _rows(results: Dict) -> Dict[str, Dict]:
+    rows = {}
+    for section in ("micro", "http"):
+        for name, result in results.get(section, {}).items():
+            if result.get("count"):
+                rows[f"{section}:{name}"] = result
+    return rows
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.15) -> List[Tuple[str, str]]:
+    """
+    Imprimir la comparación de las dos corridas y devolver las regresiones
+    (benchmark, motivo) mayores que `threshold`
+    """
+    before, after = _rows(baseline), _rows(current)
+    regressions = []
+    print(f"{baseline['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    backends = [results["meta"].get("settings", {}).get("backend") for results in (baseline, current)]
+    if backends[0] != backends[1]:
+        print(f"Atención: backends distintos ({backends[0]} -> {backends[1]})")
+    print()
+    print(f"{'benchmark':36} {'throughput':>11} {'p50':>8} {'p99':>8}")
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name], after[name]
+        throughput = new["throughput"] / old["throughput"] - 1 if old["throughput"] else 0.0
+        p50 = new["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+        p99 = new["p99_ms"] / old["p99_ms"] - 1 if old["p99_ms"] else 0.0
+        mark = ""
+        if throughput < -threshold:
+            regressions.append((name, f"throughput {throughput:+.0%}"))
+            mark = "  <- regresión"
+        elif p50 > threshold:
+            regressions.append((name, f"p50 {p50:+.0%}"))
+            mark = "  <- regresión"
+        print(f"{name:36} {throughput:>+11.1%} {p50:>+8.1%} {p99:>+8.1%}{mark}")
+    for name in sorted(set(before) ^ set(after)):
+        print(f"{name:36} {'(solo en ' + ('antes' if name in before else 'ahora') + ')':>29}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+    regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
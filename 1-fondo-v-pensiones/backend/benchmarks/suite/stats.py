@@ -0,0 +1,63 @@
+"""
+Estadísticas comunes de la suite: percentiles de latencia, throughput y
+memoria asignada
+"""
+import os
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def latency_summary(latencies: List[float], elapsed: float) -> Dict:
+    """
+    Resumen de una serie de latencias (en segundos) medidas durante `elapsed`
+    segundos. Las latencias se reportan en milisegundos.
+    """
+    if not latencies:
+        return {"count": 0, "throughput": 0.0}
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "throughput": len(ordered) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000
+    }
+
+
+async def allocations(operation: Callable[[int], Awaitable], iterations: int) -> Dict:
+    """
+    Memoria asignada por la operación según tracemalloc: pico durante
+    `iterations` llamadas y bytes que quedan retenidos por llamada. Se mide
+    en una pasada aparte porque tracemalloc hace lentas las asignaciones.
+    Cuenta todos los hilos del proceso, incluidos los servidores de moto.
+    """
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for i in range(iterations):
+            await operation(i)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kb": (peak - start) / 1024,
+        "alloc_retained_bytes_per_op": (current - start) / iterations
+    }
+
+
+def resident_memory_mb() -> Optional[float]:
+    """
+    Memoria residente del proceso (solo Linux; None en otros sistemas)
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return None
@@ -1,108 +1,44 @@
-import uvicorn
-import os
-import boto3
-import json
-from moto import mock_dynamodb, mock_ses, mock_sns
+"""
+Servidor de desarrollo local: persistencia en SQLite (SQLITE_PATH, por
+defecto local_fondos.db) y SES/SNS simulados con moto en este mismo proceso.
 
-from app.api.models.fund import FundModel
-
-# Use moto to mock AWS services for local development
-dynamodb_mock = mock_dynamodb()
-ses_mock = mock_ses()
-sns_mock = mock_sns()
+Uso (desde backend/):
+    python run_local.py
+"""
+import os
 
-# Start mocks
-dynamodb_mock.start()
-ses_mock.start()
-sns_mock.start()
+# Antes de importar la app: el backend se elige al crear el store
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+os.environ.setdefault('SQLITE_PATH', 'local_fondos.db')
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('AWS_SES_SOURCE_EMAIL', 'noreply@example.com')
 
-# Set DynamoDB endpoint to localhost:8001 to match docker-compose configuration
-os.environ['DYNAMODB_ENDPOINT'] = 'http://localhost:8001'
+import uvicorn
+from moto import mock_ses, mock_sns
 
-# Create DynamoDB tables
-dynamodb = boto3.resource(
-    'dynamodb', 
-    region_name='us-east-1',
-    endpoint_url=os.environ.get('DYNAMODB_ENDPOINT', None)
-)
+from app.api.models.fund import FundModel
+from app.core.aws import get_client
+from app.main import app
 
-# Create Funds table
-dynamodb.create_table(
-    TableName='Funds',
-    KeySchema=[
-        {'AttributeName': 'id', 'KeyType': 'HASH'}  # Primary key
-    ],
-    AttributeDefinitions=[
-        {'AttributeName': 'id', 'AttributeType': 'S'}
-    ],
-    ProvisionedThroughput={
-        'ReadCapacityUnits': 5,
-        'WriteCapacityUnits': 5
-    }
-)
+# Los mocks solo existen en este proceso: uvicorn corre aquí, sin reload
+aws_mocks = [mock_ses(), mock_sns()]
 
-# Create UserFunds table
-dynamodb.create_table(
-    TableName='UserFunds',
-    KeySchema=[
-        {'AttributeName': 'user_id', 'KeyType': 'HASH'}  # Primary key
-    ],
-    AttributeDefinitions=[
-        {'AttributeName': 'user_id', 'AttributeType': 'S'}
-    ],
-    ProvisionedThroughput={
-        'ReadCapacityUnits': 5,
-        'WriteCapacityUnits': 5
-    }
-)
 
-# Create Transactions table
-dynamodb.create_table(
-    TableName='Transactions',
-    KeySchema=[
-        {'AttributeName': 'user_id', 'KeyType': 'HASH'},  # Partition key
-        {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}  # Sort key
-    ],
-    AttributeDefinitions=[
-        {'AttributeName': 'user_id', 'AttributeType': 'S'},
-        {'AttributeName': 'timestamp', 'AttributeType': 'S'},
-        {'AttributeName': 'id', 'AttributeType': 'S'}
-    ],
-    GlobalSecondaryIndexes=[
-        {
-            'IndexName': 'id-index',
-            'KeySchema': [
-                {'AttributeName': 'id', 'KeyType': 'HASH'}
-            ],
-            'Projection': {
-                'ProjectionType': 'ALL'
-            },
-            'ProvisionedThroughput': {
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
-        }
-    ],
-    ProvisionedThroughput={
-        'ReadCapacityUnits': 5,
-        'WriteCapacityUnits': 5
-    }
-)
+@app.on_event("startup")
+async def initialize_local_services():
+    get_client('ses').verify_email_identity(EmailAddress=os.environ['AWS_SES_SOURCE_EMAIL'])
+    # Crea las tablas (si no existen) y carga los fondos del archivo semilla
+    await FundModel.initialize_database()
 
-# Initialize the database with sample data
-import asyncio
-loop = asyncio.get_event_loop()
-loop.run_until_complete(FundModel.initialize_database())
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
-
-# Clean up mocks on exit
-import atexit
-
-def cleanup():
-    dynamodb_mock.stop()
-    ses_mock.stop()
-    sns_mock.stop()
-
-atexit.register(cleanup) 
\ No newline at end of file
+    for aws_mock in aws_mocks:
+        aws_mock.start()
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get('PORT', '8000')))
+    finally:
+        for aws_mock in aws_mocks:
+            aws_mock.stop()
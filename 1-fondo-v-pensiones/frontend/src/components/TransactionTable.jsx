@@ -4,7 +4,7 @@ export const TransactionTable = () => {
   const { transactions, formatCurrency, availableFunds } = useAppContext();
 
   const getFundName = (fundId) => {
-    const fund = availableFunds.find(f => f.id === fundId);
+    const fund = availableFunds.find(f => f.id === Number(fundId));
     return fund ? fund.name : 'Fondo desconocido';
   };
 
@@ -76,7 +76,7 @@ export const TransactionTable = () => {
                   </span>
                 </td>
                 <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
-                  {getFundName(transaction.fund_id)}
+                  {transaction.fund_name || getFundName(transaction.fund_id)}
                 </td>
                 <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
                   {formatCurrency(transaction.amount)}
@@ -54,7 +54,8 @@ export const AppProvider = ({ children }) => {
           const userData = await userFundsResponse.json();
           setUserFunds({
             balance: userData.balance || 500000,
-            subscribed_funds: userData.subscribed_funds || []
+            // La API devuelve las suscripciones; aquí solo se usan los ids
+            subscribed_funds: (userData.subscribed_funds || []).map(fund => Number(fund.id))
           });
         }
 
@@ -0,0 +1,3 @@
+"""
+Análisis en memoria de la consulta de select.sql con NumPy
+"""
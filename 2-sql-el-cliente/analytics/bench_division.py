@@ -0,0 +1,123 @@
+"""
+Benchmark de la división relacional: select.sql en SQLite contra el motor
+de NumPy (bitset y sparse) con datos sintéticos, verificando que los tres
+devuelven los mismos clientes.
+
+Cada producto está disponible en un bloque de sucursales consecutivas y
+cada cliente visita otro bloque, así que una parte de las inscripciones
+cumple. Si la consulta SQL pasa de --sql-timeout segundos se corta y la
+aceleración reportada es una cota inferior.
+
+Uso (desde 2-sql-el-cliente/):
+    python -m analytics.bench_division --clients 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from analytics.database import QueryTimeout, create_database, run_with_timeout, select_ids_query
+from analytics.division import BITSET, SPARSE, DivisionEngine, ResultMismatch
+from analytics.tables import ColumnarTables
+
+
+def synthetic_rows(clients, branches, products, seed=7):
+    """
+    Filas (como arreglos) de Inscripcion, Disponibilidad y Visitan
+    """
+    rng = np.random.default_rng(seed)
+
+    def blocks(owners, low, high):
+        # Cada dueño toma un bloque de sucursales consecutivas (con vuelta)
+        sizes = rng.integers(low, high + 1, owners)
+        owner = np.repeat(np.arange(1, owners + 1), sizes)
+        first = np.repeat(rng.integers(0, branches, owners), sizes)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return owner, (first + offset) % branches + 1
+
+    product, branch = blocks(products, 1, 3)
+    availability = np.unique(np.column_stack((branch, product)), axis=0)
+    client, branch = blocks(clients, 1, 6)
+    visits = np.unique(np.column_stack((branch, client)), axis=0)
+    enrollment_client = np.repeat(np.arange(1, clients + 1), rng.integers(1, 4, clients))
+    enrollment_product = rng.integers(1, products + 1, len(enrollment_client))
+    enrollments = np.unique(np.column_stack((enrollment_product, enrollment_client)), axis=0)
+    return enrollments, availability, visits
+
+
+def load_sqlite(connection, clients, branches, products, rows):
+    enrollments, availability, visits = rows
+    with connection:
+        connection.executemany(
+            "INSERT INTO Cliente (id, nombre, apellidos, ciudad) VALUES (?, ?, ?, ?)",
+            ((i, f"Nombre{i}", f"Apellido{i}", "Bogotá") for i in range(1, clients + 1))
+        )
+        connection.executemany(
+            "INSERT INTO Sucursal (id, nombre, ciudad) VALUES (?, ?, ?)",
+            ((i, f"Sucursal {i}", "Bogotá") for i in range(1, branches + 1))
+        )
+        connection.executemany(
+            "INSERT INTO Producto (id, nombre, tipoProducto) VALUES (?, ?, ?)",
+            ((i, f"Producto {i}", "Cuenta") for i in range(1, products + 1))
+        )
+        connection.executemany("INSERT INTO Inscripcion VALUES (?, ?)", enrollments.tolist())
+        connection.executemany("INSERT INTO Disponibilidad VALUES (?, ?)", availability.tolist())
+        connection.executemany(
+            "INSERT INTO Visitan VALUES (?, ?, '2024-03-28')", visits.tolist()
+        )
+
+
+def timed_sql(connection, timeout):
+    """
+    (segundos, ids) de select.sql; ids es None si se cortó por timeout
+    """
+    start = time.perf_counter()
+    try:
+        ids = sorted(row[0] for row in run_with_timeout(connection, select_ids_query(), timeout))
+    except QueryTimeout:
+        ids = None
+    return time.perf_counter() - start, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--branches", type=int, default=200)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--sql-timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    print(f"{'clientes':>10} {'SQL (s)':>10} {'carga (s)':>10} {'bitset (s)':>11} "
+          f"{'sparse (s)':>11} {'cumplen':>9} {'aceleración':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for clients in args.clients:
+            rows = synthetic_rows(clients, args.branches, args.products)
+            connection = create_database(os.path.join(directory, f"bench_{clients}.db"))
+            load_sqlite(connection, clients, args.branches, args.products, rows)
+
+            start = time.perf_counter()
+            tables = ColumnarTables.from_sqlite(connection)
+            load = time.perf_counter() - start
+            results, elapsed = {}, {}
+            for method in (BITSET, SPARSE):
+                start = time.perf_counter()
+                results[method] = DivisionEngine(tables, method).qualifying_clients().tolist()
+                elapsed[method] = time.perf_counter() - start
+            if results[BITSET] != results[SPARSE]:
+                raise ResultMismatch(f"bitset y sparse difieren con {clients} clientes")
+
+            sql_seconds, expected = timed_sql(connection, args.sql_timeout)
+            if expected is not None and expected != results[BITSET]:
+                raise ResultMismatch(f"El motor difiere de select.sql con {clients} clientes")
+            bound = "" if expected is not None else ">"
+            speedup = sql_seconds / min(elapsed.values())
+            print(f"{clients:>10,} {bound + format(sql_seconds, '.2f'):>10} {load:>10.2f} "
+                  f"{elapsed[BITSET]:>11.3f} {elapsed[SPARSE]:>11.3f} {len(results[BITSET]):>9,} "
+                  f"{bound + format(speedup, ',.0f') + 'x':>12}")
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
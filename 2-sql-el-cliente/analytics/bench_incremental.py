@@ -0,0 +1,117 @@
+"""
+Benchmark de la vista incremental: costo de construirla, latencia de cada
+mutación (inserciones y borrados en Visitan, Disponibilidad e Inscripcion)
+y de leer el resultado, contra recalcular todo con el motor columnar.
+
+Uso (desde 2-sql-el-cliente/):
+    python -m analytics.bench_incremental --clients 1000000 --mutations 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+from analytics.division import DivisionEngine
+from analytics.generator import DatasetGenerator
+from analytics.incremental import IncrementalDivision
+from analytics.tables import ColumnarTables
+
+KINDS = (
+    "insert_visit", "delete_visit", "insert_enrollment", "delete_enrollment",
+    "insert_availability", "delete_availability"
+)
+# Proporción de cada tipo: las visitas son lo más frecuente
+WEIGHTS = (40, 20, 15, 10, 1, 1)
+
+
+def random_mutations(tables, total, seed=11):
+    rng = random.Random(seed)
+    clients, branches, products = (ids.tolist() for ids in (tables.client_ids, tables.branch_ids, tables.product_ids))
+    existing = {
+        "delete_visit": list(zip(tables.branch_ids[tables.visit_branch[:total]].tolist(),
+                                 tables.client_ids[tables.visit_client[:total]].tolist())),
+        "delete_enrollment": list(zip(tables.product_ids[tables.enrollment_product[:total]].tolist(),
+                                      tables.client_ids[tables.enrollment_client[:total]].tolist())),
+        "delete_availability": list(zip(tables.branch_ids[tables.availability_branch].tolist(),
+                                        tables.product_ids[tables.availability_product].tolist())),
+    }
+    for kind in rng.choices(KINDS, WEIGHTS, k=total):
+        if kind in existing:
+            yield kind, rng.choice(existing[kind])
+        elif kind == "insert_visit":
+            yield kind, (rng.choice(branches), rng.choice(clients))
+        elif kind == "insert_enrollment":
+            yield kind, (rng.choice(products), rng.choice(clients))
+        else:
+            yield kind, (rng.choice(branches), rng.choice(products))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    parser.add_argument("--branches", type=int, default=500)
+    parser.add_argument("--products", type=int, default=40)
+    parser.add_argument("--mutations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        data = os.path.join(directory, "data")
+        DatasetGenerator(args.clients, args.branches, args.products).write(data)
+        tables = ColumnarTables.from_csv(data)
+
+    start = time.perf_counter()
+    full = DivisionEngine(tables).qualifying_clients()
+    recompute = time.perf_counter() - start
+    start = time.perf_counter()
+    view = IncrementalDivision.from_tables(tables)
+    build = time.perf_counter() - start
+    assert view.qualifying_clients() == full.tolist()
+    print(f"{args.clients:,} clientes: recalcular todo {recompute:.3f} s, construir la vista {build:.2f} s, "
+          f"{len(view):,} cumplen\n")
+
+    samples = defaultdict(list)
+    for kind, key in random_mutations(tables, args.mutations):
+        start = time.perf_counter()
+        getattr(view, kind)(*key)
+        samples[kind].append((time.perf_counter() - start) * 1e6)
+    start = time.perf_counter()
+    for _ in range(1000):
+        view.is_qualifying(1)
+    lookup = (time.perf_counter() - start) * 1e3
+
+    print(f"{'mutación':22} {'n':>8} {'p50 (µs)':>10} {'p99 (µs)':>10} {'máx (µs)':>10}")
+    for kind in KINDS:
+        values = samples[kind]
+        if len(values) < 2:
+            continue
+        p99 = statistics.quantiles(values, n=100)[98]
+        print(f"{kind:22} {len(values):>8,} {statistics.median(values):>10.1f} {p99:>10.1f} {max(values):>10.1f}")
+    print(f"\nis_qualifying: {lookup:.2f} µs por consulta")
+
+    start = time.perf_counter()
+    rebuilt = DivisionEngine(view_tables(view)).qualifying_clients().tolist()
+    print(f"verificación contra recálculo completo ({time.perf_counter() - start:.2f} s): "
+          f"{'ok' if rebuilt == view.qualifying_clients() else 'DIFERENTE'}")
+
+
+def view_tables(view: IncrementalDivision) -> ColumnarTables:
+    """
+    Las relaciones actuales de la vista como ColumnarTables, para recalcular
+    """
+    clients = set(view.visited) | set(view.products_of)
+    branches = {b for sucursales in view.offered.values() for b in sucursales}
+    branches |= {b for sucursales in view.visited.values() for b in sucursales}
+    products = set(view.offered) | set(view.enrolled)
+    return ColumnarTables(
+        sorted(clients), sorted(branches), sorted(products),
+        [(p, c) for p, members in view.enrolled.items() for c in members],
+        [(b, p) for p, sucursales in view.offered.items() for b in sucursales],
+        [(b, c) for c, sucursales in view.visited.items() for b in sucursales],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Harness de la consulta en SQLite: carga un conjunto de datos (CSV del
+generador) y ejecuta select.sql y sus formulaciones alternativas (doble NOT
+EXISTS, GROUP BY/HAVING) sin y con los índices secundarios sugeridos.
+Reporta tiempo, filas y el plan (EXPLAIN QUERY PLAN) de cada una, y
+verifica que todas devuelven los mismos clientes.
+
+Las consultas que pasan de --timeout segundos se cortan (el tiempo
+reportado es una cota inferior).
+
+Uso (desde 2-sql-el-cliente/):
+    python -m analytics.bench_queries --data data
+    python -m analytics.bench_queries --clients 20000 --branches 300 --products 30
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from analytics.database import QueryTimeout, create_database, import_csv, run_with_timeout
+from analytics.division import ResultMismatch
+from analytics.generator import DatasetGenerator
+from analytics.queries import create_indexes, drop_indexes, formulations, query_plan
+
+INDEX_MODES = (("sin índices", drop_indexes), ("con índices", create_indexes))
+
+
+def run_harness(directory, database_path, timeout, show_plans=True):
+    start = time.perf_counter()
+    connection = create_database(database_path)
+    import_csv(connection, directory)
+    counts = {
+        table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("Cliente", "Sucursal", "Producto", "Inscripcion", "Disponibilidad", "Visitan")
+    }
+    print(f"carga: {time.perf_counter() - start:.2f} s  "
+          + "  ".join(f"{table}={rows:,}" for table, rows in counts.items()) + "\n")
+
+    expected = None
+    results = []
+    for mode, prepare in INDEX_MODES:
+        prepare(connection)
+        for name, query in formulations().items():
+            if show_plans:
+                print(f"-- {name}, {mode}")
+                print("\n".join(query_plan(connection, query)) + "\n")
+            start = time.perf_counter()
+            try:
+                rows = set(run_with_timeout(connection, query, timeout))
+            except QueryTimeout:
+                rows = None
+            elapsed = time.perf_counter() - start
+            if rows is not None:
+                if expected is None:
+                    expected = rows
+                elif rows != expected:
+                    raise ResultMismatch(f"{name} ({mode}) no devuelve lo mismo que las demás formulaciones")
+            results.append((name, mode, elapsed, rows))
+    connection.close()
+
+    print(f"{'consulta':18} {'índices':12} {'tiempo (s)':>11} {'filas':>9}")
+    for name, mode, elapsed, rows in results:
+        seconds = format(elapsed, ".3f") if rows is not None else f">{elapsed:.1f}"
+        print(f"{name:18} {mode:12} {seconds:>11} {len(rows) if rows is not None else '-':>9}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Directorio con los CSV del generador")
+    parser.add_argument("--db", help="Archivo SQLite a crear (por defecto uno temporal)")
+    parser.add_argument("--clients", type=int, default=20_000)
+    parser.add_argument("--branches", type=int, default=300)
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--no-plans", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.data
+        if directory is None:
+            directory = os.path.join(scratch, "data")
+            DatasetGenerator(args.clients, args.branches, args.products, seed=args.seed).write(directory)
+        database_path = args.db or os.path.join(scratch, "harness.db")
+        if os.path.exists(database_path):
+            raise SystemExit(f"{database_path} ya existe")
+        run_harness(directory, database_path, args.timeout, not args.no_plans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Base SQLite con el esquema de init.sql y la consulta de select.sql.
+
+init.sql está escrito para PostgreSQL; en SQLite solo cambia SERIAL por
+INTEGER (así `id` es el rowid y se autoincrementa). La consulta se ejecuta
+tal cual.
+"""
+import csv
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INIT_SQL = os.path.join(PROJECT_DIR, "init.sql")
+SELECT_SQL = os.path.join(PROJECT_DIR, "select.sql")
+
+# Columnas de cada tabla en el orden de init.sql (también el de los CSV)
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "Cliente": ("id", "nombre", "apellidos", "ciudad"),
+    "Sucursal": ("id", "nombre", "ciudad"),
+    "Producto": ("id", "nombre", "tipoProducto"),
+    "Inscripcion": ("idProducto", "idCliente"),
+    "Disponibilidad": ("idSucursal", "idProducto"),
+    "Visitan": ("idSucursal", "idCliente", "fechaVisita"),
+}
+
+# Filas por executemany al importar
+IMPORT_BATCH = 50_000
+
+
+def read_sql(path: str) -> str:
+    with open(path, encoding="utf-8") as sql_file:
+        return sql_file.read()
+
+
+def split_statements(script: str) -> List[str]:
+    """
+    Separar un script en sentencias completas (sin comentarios sueltos)
+    """
+    statements, current = [], []
+    for line in script.splitlines():
+        if not current and (not line.strip() or line.lstrip().startswith("--")):
+            continue
+        current.append(line)
+        candidate = "\n".join(current)
+        if sqlite3.complete_statement(candidate):
+            statements.append(candidate.strip())
+            current = []
+    return statements
+
+
+def to_sqlite(statement: str) -> str:
+    """
+    Adaptar una sentencia de init.sql (PostgreSQL) a SQLite
+    """
+    return re.sub(r"\bSERIAL\b", "INTEGER", statement)
+
+
+def create_database(path: str = ":memory:", sample: bool = False) -> sqlite3.Connection:
+    """
+    Crear la base con el esquema de init.sql y, con `sample`, sus filas de
+    ejemplo
+    """
+    connection = sqlite3.connect(path)
+    statements = split_statements(read_sql(INIT_SQL))
+    if not sample:
+        statements = [s for s in statements if s.upper().startswith("CREATE")]
+    with connection:
+        for statement in statements:
+            connection.execute(to_sqlite(statement))
+    return connection
+
+
+def select_query() -> str:
+    """
+    La consulta de select.sql (clientes que visitaron todas las sucursales
+    que ofrecen alguno de sus productos)
+    """
+    return split_statements(read_sql(SELECT_SQL))[0].rstrip(";")
+
+
+def select_ids_query() -> str:
+    """
+    select.sql devolviendo el id del cliente en vez de su nombre, para
+    comparar sin colisiones de nombres
+    """
+    query = select_query()
+    projected = re.sub(r"SELECT DISTINCT c\.nombre, c\.apellidos", "SELECT DISTINCT c.id", query, count=1)
+    if projected == query:
+        raise ValueError("select.sql no tiene la proyección esperada")
+    return projected
+
+
+class QueryTimeout(Exception):
+    """
+    La consulta se canceló al pasar el tiempo máximo
+    """
+
+
+def run_with_timeout(connection: sqlite3.Connection, query: str, timeout: Optional[float]) -> List[Tuple]:
+    """
+    Ejecutar `query` y devolver sus filas; QueryTimeout si tarda más de
+    `timeout` segundos (SQLite la interrumpe desde el progress handler)
+    """
+    if timeout is None:
+        return connection.execute(query).fetchall()
+    deadline = time.perf_counter() + timeout
+    connection.set_progress_handler(lambda: int(time.perf_counter() > deadline), 100_000)
+    try:
+        return connection.execute(query).fetchall()
+    except sqlite3.OperationalError as error:
+        if time.perf_counter() > deadline:
+            raise QueryTimeout(f"La consulta pasó de {timeout} s") from error
+        raise
+    finally:
+        connection.set_progress_handler(None, 0)
+
+
+def run_select(connection: sqlite3.Connection) -> Set[Tuple[str, str]]:
+    return set(connection.execute(select_query()))
+
+
+def run_select_ids(connection: sqlite3.Connection) -> List[int]:
+    return sorted(row[0] for row in connection.execute(select_ids_query()))
+
+
+def client_names(connection: sqlite3.Connection, client_ids: Iterable[int]) -> Set[Tuple[str, str]]:
+    """
+    (nombre, apellidos) de los clientes indicados, como los devuelve select.sql
+    """
+    ids = list(client_ids)
+    names = set()
+    # Por bloques: SQLite limita la cantidad de parámetros por sentencia
+    for start in range(0, len(ids), 900):
+        block = ids[start:start + 900]
+        placeholders = ",".join("?" * len(block))
+        names.update(connection.execute(
+            f"SELECT nombre, apellidos FROM Cliente WHERE id IN ({placeholders})", block
+        ))
+    return names
+
+
+def csv_path(directory: str, table: str) -> str:
+    return os.path.join(directory, f"{table}.csv")
+
+
+def read_csv(path: str) -> Iterator[List[str]]:
+    """
+    Filas de un CSV de carga masiva (primera línea: nombres de columnas)
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader, None)
+        yield from reader
+
+
+def import_csv(connection: sqlite3.Connection, directory: str, tables: Optional[Sequence[str]] = None):
+    """
+    Cargar los CSV `<Tabla>.csv` de `directory` en la base, por lotes de
+    IMPORT_BATCH filas y en una sola transacción por tabla
+    """
+    for table in tables or TABLE_COLUMNS:
+        path = csv_path(directory, table)
+        if not os.path.exists(path):
+            continue
+        columns = TABLE_COLUMNS[table]
+        insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        rows = read_csv(path)
+        with connection:
+            while True:
+                batch = [row for _, row in zip(range(IMPORT_BATCH), rows)]
+                if not batch:
+                    break
+                connection.executemany(insert, batch)
@@ -0,0 +1,168 @@
+"""
+División relacional de select.sql en NumPy: clientes inscritos en algún
+producto que visitaron todas las sucursales donde ese producto está
+disponible (y al menos una, como exigen los INNER JOIN).
+
+Dos formas de calcularla:
+
+- bitset: una fila de bits por producto (sucursales donde está disponible)
+  y otra por cliente (sucursales visitadas). Una inscripción (p, c) cumple
+  si disponible[p] no está vacío y disponible[p] & ~visitadas[c] == 0.
+  Cada prueba son n_sucursales / 64 operaciones sobre palabras de 64 bits.
+- sparse: el producto de matrices dispersas visitas x disponibilidadᵀ
+  restringido a las inscripciones: por cada (c, p) inscrito, cuántas
+  sucursales que ofrecen p visitó c; cumple si es igual al número de
+  sucursales que ofrecen p. Sirve cuando hay tantas sucursales que los
+  bitsets de los clientes no caben en memoria.
+"""
+import sqlite3
+
+import numpy as np
+
+from analytics.database import client_names, run_select, run_select_ids
+from analytics.tables import ColumnarTables
+
+BITSET = "bitset"
+SPARSE = "sparse"
+AUTO = "auto"
+
+WORD_BITS = 64
+# Memoria máxima de los bitsets para elegir ese método con AUTO
+MAX_BITSET_BYTES = 1 << 30
+# Inscripciones (o pares visita x producto) procesados por bloque
+CHUNK = 1 << 20
+
+
+class ResultMismatch(AssertionError):
+    """
+    El resultado del motor no coincide con el de select.sql
+    """
+
+
+def pack_bits(rows: np.ndarray, columns: np.ndarray, n_rows: int, n_columns: int) -> np.ndarray:
+    """
+    Matriz (n_rows, ⌈n_columns / 64⌉) de uint64 con el bit `columns[k]`
+    encendido en la fila `rows[k]`
+    """
+    words = max(1, -(-n_columns // WORD_BITS))
+    bits = np.zeros((n_rows, words), dtype=np.uint64)
+    masks = np.left_shift(np.uint64(1), (columns % WORD_BITS).astype(np.uint64))
+    np.bitwise_or.at(bits, (rows, columns // WORD_BITS), masks)
+    return bits
+
+
+class DivisionEngine:
+    """
+    Motor columnar de la consulta sobre unas ColumnarTables
+    """
+
+    def __init__(self, tables: ColumnarTables, method: str = AUTO, max_bitset_bytes: int = MAX_BITSET_BYTES):
+        if method not in (AUTO, BITSET, SPARSE):
+            raise ValueError(f"Método no soportado: {method}")
+        self.tables = tables
+        if method == AUTO:
+            clients, branches, products = tables.shape
+            words = max(1, -(-branches // WORD_BITS))
+            method = BITSET if (clients + products) * words * 8 <= max_bitset_bytes else SPARSE
+        self.method = method
+
+    def qualifying_enrollments(self) -> np.ndarray:
+        """
+        Máscara booleana sobre las inscripciones: True si el cliente visitó
+        todas las sucursales que ofrecen el producto
+        """
+        if self.method == BITSET:
+            return self._bitset_enrollments()
+        return self._sparse_enrollments()
+
+    def qualifying_clients(self) -> np.ndarray:
+        """
+        Ids (ordenados) de los clientes que cumplen para algún producto
+        """
+        tables = self.tables
+        clients = tables.enrollment_client[self.qualifying_enrollments()]
+        return tables.client_ids[np.unique(clients)]
+
+    def _bitset_enrollments(self) -> np.ndarray:
+        tables = self.tables
+        clients, branches, products = tables.shape
+        offered = pack_bits(tables.availability_product, tables.availability_branch, products, branches)
+        visited = pack_bits(tables.visit_client, tables.visit_branch, clients, branches)
+        offered_anywhere = offered.any(axis=1)
+
+        result = np.zeros(len(tables.enrollment_product), dtype=bool)
+        # Por bloques: cada uno materializa (CHUNK, palabras) temporales
+        step = max(1, CHUNK // offered.shape[1])
+        for start in range(0, len(result), step):
+            product = tables.enrollment_product[start:start + step]
+            client = tables.enrollment_client[start:start + step]
+            missing = offered[product] & ~visited[client]
+            result[start:start + step] = offered_anywhere[product] & ~missing.any(axis=1)
+        return result
+
+    def _sparse_enrollments(self) -> np.ndarray:
+        hits, needed = self.coverage()
+        return (needed > 0) & (hits == needed)
+
+    def coverage(self):
+        """
+        Por inscripción (en su orden): cuántas sucursales que ofrecen el
+        producto visitó el cliente y en cuántas se ofrece
+        """
+        tables = self.tables
+        clients, branches, products = tables.shape
+        # Disponibilidad en formato CSR por sucursal
+        order = np.argsort(tables.availability_branch, kind="stable")
+        products_by_branch = tables.availability_product[order]
+        per_branch = np.bincount(tables.availability_branch, minlength=branches)
+        branch_start = np.concatenate(([0], np.cumsum(per_branch)[:-1]))
+        offered_count = np.bincount(tables.availability_product, minlength=products)
+
+        # Llave (cliente, producto) de cada inscripción, ordenada
+        enrolled = tables.enrollment_client * products + tables.enrollment_product
+        enrolled_order = np.argsort(enrolled, kind="stable")
+        enrolled_sorted = enrolled[enrolled_order]
+        hits = np.zeros(len(enrolled), dtype=np.int64)
+
+        # Bloques de visitas con a lo sumo CHUNK pares visita x producto
+        step = max(1, CHUNK // max(1, int(per_branch.max(initial=0))))
+        for start in range(0, len(tables.visit_branch) if len(enrolled) else 0, step):
+            branch = tables.visit_branch[start:start + step]
+            counts = per_branch[branch]
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Cada visita (c, s) se expande a los productos de s
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            product = products_by_branch[np.repeat(branch_start[branch], counts) + offsets]
+            keys = np.repeat(tables.visit_client[start:start + step], counts) * products + product
+            position = np.minimum(np.searchsorted(enrolled_sorted, keys), len(enrolled_sorted) - 1)
+            found = enrolled_sorted[position] == keys
+            hits += np.bincount(position[found], minlength=len(hits))
+
+        coverage = np.zeros(len(enrolled), dtype=np.int64)
+        coverage[enrolled_order] = hits
+        return coverage, offered_count[tables.enrollment_product]
+
+
+def check_against_sql(
+    connection: sqlite3.Connection,
+    client_ids: np.ndarray,
+    names: bool = True
+) -> int:
+    """
+    Comparar los ids del motor con select.sql (versión por id) y, con
+    `names`, también los (nombre, apellidos) de la consulta original.
+    Devuelve cuántos clientes cumplen; ResultMismatch si difieren.
+    """
+    expected = run_select_ids(connection)
+    actual = [int(client_id) for client_id in client_ids]
+    if actual != expected:
+        missing = sorted(set(expected) - set(actual))
+        extra = sorted(set(actual) - set(expected))
+        raise ResultMismatch(
+            f"{len(missing)} clientes faltan (p. ej. {missing[:5]}) y {len(extra)} sobran (p. ej. {extra[:5]})"
+        )
+    if names and client_names(connection, actual) != run_select(connection):
+        raise ResultMismatch("Los nombres no coinciden con select.sql")
+    return len(actual)
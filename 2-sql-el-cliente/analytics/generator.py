@@ -0,0 +1,260 @@
+"""
+Generador de datos sintéticos para el esquema de init.sql, escritos como
+archivos de carga masiva: un CSV `<Tabla>.csv` por tabla (encabezado con
+las columnas de init.sql) más load_postgres.sql con los \\copy para psql.
+
+Las distribuciones están sesgadas como en un banco real:
+
+- Ciudades con popularidad Zipf: pocas concentran la mayoría de clientes y
+  sucursales.
+- Productos nacionales (los más populares, disponibles en buena parte de
+  las sucursales) y locales (en 1 a 3 sucursales de una ciudad).
+- Clientes con pocas visitas (geométrica), casi todas a sucursales de su
+  ciudad y sobre todo a la principal.
+- Inscripciones por popularidad del producto y, en parte, a productos
+  locales de la ciudad del cliente.
+
+Los clientes se generan y escriben por bloques, así que la memoria no
+depende del tamaño del conjunto.
+
+Uso (desde 2-sql-el-cliente/):
+    python -m analytics.generator --out data --clients 1000000 --branches 500 --products 40
+"""
+import argparse
+import csv
+import os
+from typing import Dict
+
+import numpy as np
+
+from analytics.database import TABLE_COLUMNS, csv_path
+
+CITIES = (
+    "Madrid", "Barcelona", "Valencia", "Sevilla", "Zaragoza", "Málaga", "Murcia", "Palma",
+    "Bilbao", "Alicante", "Córdoba", "Valladolid", "Vigo", "Gijón", "Granada"
+)
+FIRST_NAMES = (
+    "Juan", "María", "Carlos", "Ana", "Luis", "Laura", "José", "Carmen", "Pedro", "Lucía",
+    "Javier", "Marta", "Miguel", "Elena", "David", "Sara", "Pablo", "Paula", "Jorge", "Isabel"
+)
+LAST_NAMES = (
+    "Pérez", "García", "López", "Martínez", "Sánchez", "Gómez", "Fernández", "Díaz",
+    "Ruiz", "Hernández", "Jiménez", "Moreno", "Álvarez", "Romero", "Navarro", "Torres"
+)
+PRODUCT_TYPES = (
+    ("Cuenta Ahorro", "Cuenta"), ("Tarjeta Crédito", "Tarjeta"), ("Préstamo Personal", "Préstamo"),
+    ("CDT", "Inversión"), ("Fondo Voluntario", "Inversión"), ("Seguro Hogar", "Seguro")
+)
+
+# Clientes generados y escritos por bloque
+CLIENT_CHUNK = 100_000
+# Fracción de productos nacionales (los más populares)
+NATIONAL_SHARE = 0.25
+# Probabilidad de que una visita sea en la ciudad del cliente
+HOME_VISIT_SHARE = 0.85
+# Probabilidad de que una inscripción sea a un producto local de su ciudad
+LOCAL_ENROLLMENT_SHARE = 0.3
+VISIT_DATES = (np.datetime64("2024-01-01"), 366)
+
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _groups(keys: np.ndarray, n_groups: int):
+    """
+    Orden de los elementos agrupados por llave y (inicio, tamaño) de cada grupo
+    """
+    order = np.argsort(keys, kind="stable")
+    sizes = np.bincount(keys, minlength=n_groups)
+    return order, np.cumsum(sizes) - sizes, sizes
+
+
+def _unique_pairs(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    return np.unique(np.column_stack((first, second)), axis=0)
+
+
+class DatasetGenerator:
+    """
+    Conjunto de datos reproducible (misma semilla, mismos archivos)
+    """
+
+    def __init__(
+        self,
+        clients: int,
+        branches: int,
+        products: int,
+        cities: int = len(CITIES),
+        skew: float = 1.1,
+        seed: int = 7
+    ):
+        if min(clients, branches, products) < 1:
+            raise ValueError("Se necesita al menos un cliente, una sucursal y un producto")
+        self.clients = clients
+        self.branches = branches
+        self.products = products
+        self.cities = min(cities, len(CITIES), branches)
+        self.skew = skew
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.city_weights = zipf_weights(self.cities, skew)
+
+        # Cada ciudad con al menos una sucursal; el resto según popularidad
+        extra = self.rng.choice(self.cities, branches - self.cities, p=self.city_weights)
+        self.branch_city = np.sort(np.concatenate((np.arange(self.cities), extra)))
+        _, self.city_branch_start, self.city_branch_count = _groups(self.branch_city, self.cities)
+
+        self.national = max(1, int(round(products * NATIONAL_SHARE)))
+        self.product_weights = zipf_weights(products, skew)
+        self.availability = self._availability()
+
+    def _availability(self) -> np.ndarray:
+        """
+        Pares (sucursal, producto) 0-based: nacionales en 30-90% de las
+        sucursales, locales en 1 a 3 sucursales de una ciudad
+        """
+        branches, products = [], []
+        for product in range(self.products):
+            if product < self.national:
+                share = self.rng.uniform(0.3, 0.9)
+                chosen = self.rng.choice(self.branches, max(1, int(share * self.branches)), replace=False)
+            else:
+                city = self.rng.choice(self.cities, p=self.city_weights)
+                count = self.city_branch_count[city]
+                size = min(count, int(self.rng.integers(1, 4)))
+                chosen = self.city_branch_start[city] + self.rng.choice(count, size, replace=False)
+            branches.append(chosen)
+            products.append(np.full(len(chosen), product))
+        pairs = _unique_pairs(np.concatenate(branches), np.concatenate(products))
+        # Productos locales de cada ciudad, para las inscripciones
+        local = pairs[pairs[:, 1] >= self.national]
+        city_of_local = np.full(self.products, -1)
+        city_of_local[local[:, 1]] = self.branch_city[local[:, 0]]
+        self.local_products = np.flatnonzero(city_of_local >= 0)
+        self.local_order, self.city_local_start, self.city_local_count = _groups(
+            city_of_local[self.local_products], self.cities
+        )
+        return pairs
+
+    def _branch_in_city(self, cities: np.ndarray) -> np.ndarray:
+        # Sesgo hacia la primera sucursal de la ciudad (la principal)
+        position = (self.rng.random(len(cities)) ** 2 * self.city_branch_count[cities]).astype(np.int64)
+        return self.city_branch_start[cities] + position
+
+    def client_chunk(self, first: int, size: int) -> Dict[str, np.ndarray]:
+        """
+        Clientes [first, first + size) (0-based) con sus visitas e
+        inscripciones
+        """
+        rng = self.rng
+        client = np.arange(first, first + size)
+        city = rng.choice(self.cities, size, p=self.city_weights)
+
+        # Visitas: 1 + geométrica, la mayoría en la ciudad del cliente
+        visits = np.minimum(rng.geometric(0.45, size), 12)
+        visit_client = np.repeat(client, visits)
+        visit_city = np.repeat(city, visits)
+        away = rng.random(len(visit_client)) > HOME_VISIT_SHARE
+        visit_city[away] = rng.choice(self.cities, int(away.sum()), p=self.city_weights)
+        visit_pairs = _unique_pairs(self._branch_in_city(visit_city), visit_client)
+
+        # Inscripciones: 1 + Poisson, por popularidad o locales de su ciudad
+        enrollments = np.minimum(1 + rng.poisson(0.8, size), self.products)
+        enrollment_client = np.repeat(client, enrollments)
+        product = rng.choice(self.products, len(enrollment_client), p=self.product_weights)
+        enrollment_city = np.repeat(city, enrollments)
+        local = (rng.random(len(product)) < LOCAL_ENROLLMENT_SHARE) & (self.city_local_count[enrollment_city] > 0)
+        if local.any():
+            cities = enrollment_city[local]
+            offset = (rng.random(len(cities)) * self.city_local_count[cities]).astype(np.int64)
+            product[local] = self.local_products[self.local_order[self.city_local_start[cities] + offset]]
+        enrollment_pairs = _unique_pairs(product, enrollment_client)
+
+        return {
+            "city": city,
+            "visits": visit_pairs,
+            "visit_days": rng.integers(0, VISIT_DATES[1], len(visit_pairs)),
+            "enrollments": enrollment_pairs,
+        }
+
+    def write(self, directory: str) -> Dict[str, int]:
+        """
+        Escribir los CSV y load_postgres.sql en `directory`; devuelve las
+        filas por tabla
+        """
+        os.makedirs(directory, exist_ok=True)
+        counts = {table: 0 for table in TABLE_COLUMNS}
+        files = {table: open(csv_path(directory, table), "w", newline="", encoding="utf-8") for table in TABLE_COLUMNS}
+        try:
+            writers = {table: csv.writer(handle) for table, handle in files.items()}
+            for table, writer in writers.items():
+                writer.writerow(TABLE_COLUMNS[table])
+
+            for branch, city in enumerate(self.branch_city):
+                number = branch - self.city_branch_start[city] + 1
+                writers["Sucursal"].writerow((branch + 1, f"Sucursal {CITIES[city]} {number}", CITIES[city]))
+            for product in range(self.products):
+                name, kind = PRODUCT_TYPES[product % len(PRODUCT_TYPES)]
+                scope = "Nacional" if product < self.national else "Local"
+                writers["Producto"].writerow((product + 1, f"{name} {scope} {product + 1}", kind))
+            writers["Disponibilidad"].writerows((self.availability + 1).tolist())
+            counts.update(Sucursal=self.branches, Producto=self.products, Disponibilidad=len(self.availability))
+
+            for first in range(0, self.clients, CLIENT_CHUNK):
+                size = min(CLIENT_CHUNK, self.clients - first)
+                chunk = self.client_chunk(first, size)
+                first_names = self.rng.integers(0, len(FIRST_NAMES), size)
+                last_names = self.rng.integers(0, len(LAST_NAMES), (size, 2))
+                writers["Cliente"].writerows(
+                    (first + i + 1, FIRST_NAMES[f], f"{LAST_NAMES[a]} {LAST_NAMES[b]}", CITIES[c])
+                    for i, (f, (a, b), c) in enumerate(zip(first_names, last_names, chunk["city"]))
+                )
+                dates = (VISIT_DATES[0] + chunk["visit_days"]).astype(str)
+                writers["Visitan"].writerows(
+                    (branch, client, date) for (branch, client), date in zip((chunk["visits"] + 1).tolist(), dates)
+                )
+                writers["Inscripcion"].writerows((chunk["enrollments"] + 1).tolist())
+                counts["Cliente"] += size
+                counts["Visitan"] += len(chunk["visits"])
+                counts["Inscripcion"] += len(chunk["enrollments"])
+        finally:
+            for handle in files.values():
+                handle.close()
+
+        write_postgres_loader(directory)
+        return counts
+
+
+def write_postgres_loader(directory: str):
+    """
+    load_postgres.sql: \\copy de cada CSV (en orden de llaves foráneas) y
+    ajuste de las secuencias SERIAL a los ids cargados
+    """
+    lines = ["-- psql -U admin -d el_cliente -f load_postgres.sql (desde este directorio)"]
+    for table, columns in TABLE_COLUMNS.items():
+        lines.append(f"\\copy {table} ({', '.join(columns)}) FROM '{table}.csv' WITH (FORMAT csv, HEADER true)")
+    for table in ("Cliente", "Sucursal", "Producto"):
+        lines.append(f"SELECT setval(pg_get_serial_sequence('{table.lower()}', 'id'), (SELECT MAX(id) FROM {table}));")
+    with open(os.path.join(directory, "load_postgres.sql"), "w", encoding="utf-8") as loader:
+        loader.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--branches", type=int, default=500)
+    parser.add_argument("--products", type=int, default=40)
+    parser.add_argument("--cities", type=int, default=len(CITIES))
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    generator = DatasetGenerator(args.clients, args.branches, args.products, args.cities, args.skew, args.seed)
+    for table, rows in generator.write(args.out).items():
+        print(f"{table:15} {rows:>12,} filas")
+
+
+if __name__ == "__main__":
+    main()
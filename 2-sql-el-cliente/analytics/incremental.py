@@ -0,0 +1,173 @@
+"""
+Resultado de select.sql mantenido incrementalmente.
+
+Por cada inscripción (cliente, producto) se guarda cuántas de las
+sucursales que ofrecen el producto visitó el cliente; la inscripción cumple
+cuando ese contador es igual al número de sucursales que ofrecen el
+producto (y este no es cero). Un cliente está en el resultado mientras
+tenga al menos una inscripción que cumple.
+
+Cada inserción o borrado en Visitan, Disponibilidad o Inscripcion toca solo
+las filas afectadas:
+
+- Visitan (s, c): las inscripciones de c cuyo producto se ofrece en s.
+- Disponibilidad (s, p): las inscripciones a p (cambia el total de p).
+- Inscripcion (p, c): esa inscripción.
+
+Se asume que las llaves foráneas se respetan (como en init.sql): las
+mutaciones solo nombran clientes, sucursales y productos existentes.
+"""
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from analytics.division import DivisionEngine
+from analytics.tables import ColumnarTables
+
+
+class IncrementalDivision:
+    """
+    Vista materializada de los clientes que cumplen, con sus contadores
+    """
+
+    def __init__(self):
+        self.offered: Dict[int, Set[int]] = defaultdict(set)        # producto -> sucursales
+        self.visited: Dict[int, Set[int]] = defaultdict(set)        # cliente -> sucursales
+        self.enrolled: Dict[int, Set[int]] = defaultdict(set)       # producto -> clientes
+        self.products_of: Dict[int, Set[int]] = defaultdict(set)    # cliente -> productos
+        self.hits: Dict[Tuple[int, int], int] = {}                  # (cliente, producto) -> visitadas
+        self.satisfied: Dict[int, int] = defaultdict(int)           # cliente -> inscripciones que cumplen
+        self._qualifying: Set[int] = set()
+
+    @classmethod
+    def from_tables(cls, tables: ColumnarTables) -> "IncrementalDivision":
+        """
+        Construir la vista de una vez (contadores calculados con el motor
+        columnar)
+        """
+        view = cls()
+        client_ids, branch_ids, product_ids = tables.client_ids, tables.branch_ids, tables.product_ids
+        for branch, product in zip(branch_ids[tables.availability_branch].tolist(),
+                                   product_ids[tables.availability_product].tolist()):
+            view.offered[product].add(branch)
+        for branch, client in zip(branch_ids[tables.visit_branch].tolist(),
+                                  client_ids[tables.visit_client].tolist()):
+            view.visited[client].add(branch)
+
+        hits, _ = DivisionEngine(tables).coverage()
+        enrollments = zip(client_ids[tables.enrollment_client].tolist(),
+                          product_ids[tables.enrollment_product].tolist(), hits.tolist())
+        for client, product, count in enrollments:
+            view.enrolled[product].add(client)
+            view.products_of[client].add(product)
+            view.hits[(client, product)] = count
+            if view._meets(client, product):
+                view._count(client, 1)
+        return view
+
+    # Consultas
+
+    def qualifying_clients(self) -> List[int]:
+        """
+        Ids (ordenados) de los clientes que cumplen ahora
+        """
+        return sorted(self._qualifying)
+
+    def is_qualifying(self, client: int) -> bool:
+        return client in self._qualifying
+
+    def __len__(self) -> int:
+        return len(self._qualifying)
+
+    # Visitan
+
+    def insert_visit(self, branch: int, client: int):
+        if branch in self.visited[client]:
+            return
+        self.visited[client].add(branch)
+        self._visit_changed(branch, client, 1)
+
+    def delete_visit(self, branch: int, client: int):
+        if branch not in self.visited.get(client, ()):
+            return
+        self.visited[client].discard(branch)
+        self._visit_changed(branch, client, -1)
+
+    def _visit_changed(self, branch: int, client: int, step: int):
+        for product in self.products_of.get(client, ()):
+            if branch in self.offered.get(product, ()):
+                before = self._meets(client, product)
+                self.hits[(client, product)] += step
+                self._update(client, before, self._meets(client, product))
+
+    # Disponibilidad
+
+    def insert_availability(self, branch: int, product: int):
+        if branch in self.offered[product]:
+            return
+        self.offered[product].add(branch)
+        self._availability_changed(branch, product, 1)
+
+    def delete_availability(self, branch: int, product: int):
+        if branch not in self.offered.get(product, ()):
+            return
+        self.offered[product].discard(branch)
+        self._availability_changed(branch, product, -1)
+
+    def _availability_changed(self, branch: int, product: int, step: int):
+        # Cambia el total de sucursales del producto: se revisan todas sus
+        # inscripciones en una pasada, con el estado anterior deducido del
+        # total y el contador anteriores
+        needed = len(self.offered[product])
+        previous = needed - step
+        hits, visited = self.hits, self.visited
+        for client in self.enrolled.get(product, ()):
+            key = (client, product)
+            before_hits = hits[key]
+            after_hits = before_hits
+            if branch in visited.get(client, ()):
+                after_hits = hits[key] = before_hits + step
+            self._update(
+                client,
+                previous > 0 and before_hits == previous,
+                needed > 0 and after_hits == needed
+            )
+
+    # Inscripcion
+
+    def insert_enrollment(self, product: int, client: int):
+        if client in self.enrolled[product]:
+            return
+        self.enrolled[product].add(client)
+        self.products_of[client].add(product)
+        offered, visited = self.offered.get(product, set()), self.visited.get(client, set())
+        smaller, larger = (offered, visited) if len(offered) <= len(visited) else (visited, offered)
+        self.hits[(client, product)] = sum(1 for branch in smaller if branch in larger)
+        if self._meets(client, product):
+            self._count(client, 1)
+
+    def delete_enrollment(self, product: int, client: int):
+        if client not in self.enrolled.get(product, ()):
+            return
+        if self._meets(client, product):
+            self._count(client, -1)
+        self.enrolled[product].discard(client)
+        self.products_of[client].discard(product)
+        del self.hits[(client, product)]
+
+    # Contadores
+
+    def _meets(self, client: int, product: int) -> bool:
+        needed = len(self.offered.get(product, ()))
+        return needed > 0 and self.hits[(client, product)] == needed
+
+    def _update(self, client: int, before: bool, after: bool):
+        if before != after:
+            self._count(client, 1 if after else -1)
+
+    def _count(self, client: int, step: int):
+        self.satisfied[client] += step
+        if self.satisfied[client] > 0:
+            self._qualifying.add(client)
+        else:
+            del self.satisfied[client]
+            self._qualifying.discard(client)
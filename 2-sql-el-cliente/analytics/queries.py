@@ -0,0 +1,100 @@
+"""
+Formulaciones equivalentes de select.sql e índices secundarios sugeridos.
+
+Todas devuelven los (nombre, apellidos) distintos de los clientes inscritos
+en un producto disponible en al menos una sucursal, que visitaron todas las
+sucursales donde ese producto está disponible.
+"""
+import sqlite3
+from typing import Dict, List, Tuple
+
+from analytics.database import select_query
+
+# División con doble NOT EXISTS: no hay sucursal del producto sin visita
+DOUBLE_NOT_EXISTS = """
+SELECT DISTINCT c.nombre, c.apellidos
+FROM Cliente c
+INNER JOIN Inscripcion i ON c.id = i.idCliente
+WHERE EXISTS (
+    SELECT 1 FROM Disponibilidad d WHERE d.idProducto = i.idProducto
+)
+AND NOT EXISTS (
+    SELECT 1
+    FROM Disponibilidad d
+    WHERE d.idProducto = i.idProducto
+    AND NOT EXISTS (
+        SELECT 1
+        FROM Visitan v
+        WHERE v.idCliente = c.id
+        AND v.idSucursal = d.idSucursal
+    )
+)
+"""
+
+# División por conteo: sucursales visitadas que ofrecen el producto igual
+# al total de sucursales que lo ofrecen (las llaves primarias evitan pares
+# repetidos)
+GROUP_BY_HAVING = """
+WITH oferta AS (
+    SELECT idProducto, COUNT(*) AS sucursales
+    FROM Disponibilidad
+    GROUP BY idProducto
+),
+cubiertos AS (
+    SELECT i.idCliente
+    FROM Inscripcion i
+    INNER JOIN Disponibilidad d ON d.idProducto = i.idProducto
+    INNER JOIN Visitan v ON v.idCliente = i.idCliente AND v.idSucursal = d.idSucursal
+    INNER JOIN oferta o ON o.idProducto = i.idProducto
+    GROUP BY i.idCliente, i.idProducto
+    HAVING COUNT(*) = MAX(o.sucursales)
+)
+SELECT DISTINCT c.nombre, c.apellidos
+FROM Cliente c
+INNER JOIN cubiertos q ON q.idCliente = c.id
+"""
+
+# Las llaves primarias de init.sql empiezan por idSucursal (Disponibilidad,
+# Visitan) e idProducto (Inscripcion); las consultas buscan por producto y
+# por cliente
+SUGGESTED_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_disponibilidad_producto ON Disponibilidad (idProducto, idSucursal)",
+    "CREATE INDEX IF NOT EXISTS ix_visitan_cliente ON Visitan (idCliente, idSucursal)",
+    "CREATE INDEX IF NOT EXISTS ix_inscripcion_cliente ON Inscripcion (idCliente, idProducto)",
+)
+
+
+def formulations() -> Dict[str, str]:
+    return {
+        "select.sql": select_query(),
+        "doble NOT EXISTS": DOUBLE_NOT_EXISTS.strip(),
+        "GROUP BY/HAVING": GROUP_BY_HAVING.strip(),
+    }
+
+
+def create_indexes(connection: sqlite3.Connection):
+    with connection:
+        for statement in SUGGESTED_INDEXES:
+            connection.execute(statement)
+        connection.execute("ANALYZE")
+
+
+def drop_indexes(connection: sqlite3.Connection):
+    with connection:
+        for statement in SUGGESTED_INDEXES:
+            name = statement.split(" ON ")[0].split()[-1]
+            connection.execute(f"DROP INDEX IF EXISTS {name}")
+        connection.execute("ANALYZE")
+
+
+def query_plan(connection: sqlite3.Connection, query: str) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN como líneas indentadas según el árbol del plan
+    """
+    rows: List[Tuple[int, int, int, str]] = connection.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
@@ -0,0 +1,118 @@
+"""
+Tablas de init.sql en columnas de NumPy (solo las llaves que usa la
+consulta), cargadas desde SQLite o desde los CSV de carga masiva.
+
+Los ids se traducen a índices densos 0..n-1 (posición en el arreglo
+ordenado de ids de la tabla) para indexar matrices y bitsets.
+"""
+import sqlite3
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+from analytics.database import TABLE_COLUMNS, csv_path, read_csv
+
+# Filas convertidas a NumPy por bloque al leer
+CHUNK_ROWS = 200_000
+
+
+def _to_columns(rows: Iterable[Sequence], width: int) -> np.ndarray:
+    """
+    Leer filas de enteros por bloques en un arreglo (n, width) de int64
+    """
+    blocks: List[np.ndarray] = []
+    iterator = iter(rows)
+    while True:
+        chunk = [row[:width] for _, row in zip(range(CHUNK_ROWS), iterator)]
+        if not chunk:
+            break
+        blocks.append(np.asarray(chunk, dtype=np.int64).reshape(-1, width))
+    if not blocks:
+        return np.empty((0, width), dtype=np.int64)
+    return np.concatenate(blocks)
+
+
+def dense_index(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Posición de cada valor en `ids` (ordenado, sin repetidos) o -1 si no
+    está (una llave foránea sin fila en la tabla referenciada)
+    """
+    if len(ids) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    positions = np.searchsorted(ids, values)
+    clipped = np.minimum(positions, len(ids) - 1)
+    return np.where(ids[clipped] == values, clipped, -1)
+
+
+class ColumnarTables:
+    """
+    Ids de Cliente, Sucursal y Producto (ordenados) y las relaciones
+    Inscripcion, Disponibilidad y Visitan como pares de índices densos.
+    Las filas que apuntan a un id inexistente se descartan, como las
+    descarta el INNER JOIN de la consulta.
+    """
+
+    def __init__(
+        self,
+        client_ids: np.ndarray,
+        branch_ids: np.ndarray,
+        product_ids: np.ndarray,
+        enrollments: np.ndarray,
+        availability: np.ndarray,
+        visits: np.ndarray
+    ):
+        self.client_ids = np.unique(np.asarray(client_ids, dtype=np.int64))
+        self.branch_ids = np.unique(np.asarray(branch_ids, dtype=np.int64))
+        self.product_ids = np.unique(np.asarray(product_ids, dtype=np.int64))
+        # (producto, cliente), (sucursal, producto) y (sucursal, cliente)
+        self.enrollment_product, self.enrollment_client = self._pair(
+            enrollments, self.product_ids, self.client_ids
+        )
+        self.availability_branch, self.availability_product = self._pair(
+            availability, self.branch_ids, self.product_ids
+        )
+        self.visit_branch, self.visit_client = self._pair(visits, self.branch_ids, self.client_ids)
+
+    @staticmethod
+    def _pair(rows: np.ndarray, left_ids: np.ndarray, right_ids: np.ndarray):
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1, 2)
+        left = dense_index(left_ids, rows[:, 0])
+        right = dense_index(right_ids, rows[:, 1])
+        valid = (left >= 0) & (right >= 0)
+        return left[valid], right[valid]
+
+    @property
+    def shape(self):
+        return len(self.client_ids), len(self.branch_ids), len(self.product_ids)
+
+    @classmethod
+    def from_sqlite(cls, connection: sqlite3.Connection) -> "ColumnarTables":
+        """
+        Cargar desde una base con el esquema de init.sql
+        """
+        def column(table):
+            return _to_columns(connection.execute(f"SELECT id FROM {table}"), 1)[:, 0]
+
+        def pair(table):
+            first, second = TABLE_COLUMNS[table][:2]
+            return _to_columns(connection.execute(f"SELECT {first}, {second} FROM {table}"), 2)
+
+        return cls(
+            column("Cliente"), column("Sucursal"), column("Producto"),
+            pair("Inscripcion"), pair("Disponibilidad"), pair("Visitan")
+        )
+
+    @classmethod
+    def from_csv(cls, directory: str) -> "ColumnarTables":
+        """
+        Cargar desde los CSV `<Tabla>.csv` de `directory` (columnas en el
+        orden de init.sql)
+        """
+        def read(table, width):
+            return _to_columns(read_csv(csv_path(directory, table)), width)
+
+        return cls(
+            read("Cliente", 1)[:, 0], read("Sucursal", 1)[:, 0], read("Producto", 1)[:, 0],
+            read("Inscripcion", 2), read("Disponibilidad", 2), read("Visitan", 2)
+        )
+
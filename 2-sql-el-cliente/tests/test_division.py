@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from analytics.database import create_database, run_select
+from analytics.division import BITSET, SPARSE, DivisionEngine, check_against_sql
+from analytics.tables import ColumnarTables
+
+
+def random_database(seed, clients=60, branches=70, products=8):
+    rng = random.Random(seed)
+    connection = create_database()
+    with connection:
+        connection.executemany(
+            "INSERT INTO Cliente (id, nombre, apellidos, ciudad) VALUES (?, ?, ?, 'Cali')",
+            # Nombres repetidos: select.sql devuelve nombres distintos
+            [(i, f"Nombre{i % 40}", "Pérez") for i in range(1, clients + 1)]
+        )
+        connection.executemany(
+            "INSERT INTO Sucursal (id, nombre, ciudad) VALUES (?, ?, 'Cali')",
+            [(i, f"Sucursal {i}") for i in range(1, branches + 1)]
+        )
+        connection.executemany(
+            "INSERT INTO Producto (id, nombre, tipoProducto) VALUES (?, ?, 'Cuenta')",
+            [(i, f"Producto {i}") for i in range(1, products + 1)]
+        )
+        # Productos en 0 a 4 sucursales; el último en ninguna
+        for product in range(1, products):
+            for branch in rng.sample(range(1, branches + 1), rng.randint(0, 4)):
+                connection.execute("INSERT INTO Disponibilidad VALUES (?, ?)", (branch, product))
+        for client in range(1, clients + 1):
+            for product in rng.sample(range(1, products + 1), rng.randint(0, 3)):
+                connection.execute("INSERT INTO Inscripcion VALUES (?, ?)", (product, client))
+            for branch in rng.sample(range(1, branches + 1), rng.randint(0, 12)):
+                connection.execute("INSERT INTO Visitan VALUES (?, ?, '2024-03-28')", (branch, client))
+        # Llaves foráneas sin fila (SQLite no las valida): el JOIN las descarta
+        connection.execute("INSERT INTO Inscripcion VALUES (1, 999)")
+        connection.execute("INSERT INTO Visitan VALUES (999, 1, '2024-03-28')")
+    return connection
+
+
+def test_sample_data_matches_select_sql():
+    connection = create_database(sample=True)
+    tables = ColumnarTables.from_sqlite(connection)
+    for method in (BITSET, SPARSE):
+        clients = DivisionEngine(tables, method).qualifying_clients()
+        assert clients.tolist() == [1]
+        assert check_against_sql(connection, clients) == 1
+    assert run_select(connection) == {("Juan", "Pérez")}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_data_matches_select_sql(seed):
+    connection = random_database(seed)
+    tables = ColumnarTables.from_sqlite(connection)
+    bitset = DivisionEngine(tables, BITSET).qualifying_clients()
+    sparse = DivisionEngine(tables, SPARSE).qualifying_clients()
+    assert bitset.tolist() == sparse.tolist()
+    check_against_sql(connection, bitset)
+
+
+def test_auto_picks_sparse_when_bitsets_do_not_fit():
+    tables = ColumnarTables.from_sqlite(random_database(1))
+    assert DivisionEngine(tables).method == BITSET
+    assert DivisionEngine(tables, max_bitset_bytes=64).method == SPARSE
+    with pytest.raises(ValueError):
+        DivisionEngine(tables, "indices")
+
+
+def test_csv_and_sqlite_loads_agree(tmp_path):
+    connection = random_database(3)
+    for table in ("Cliente", "Sucursal", "Producto", "Inscripcion", "Disponibilidad", "Visitan"):
+        cursor = connection.execute(f"SELECT * FROM {table}")
+        with open(tmp_path / f"{table}.csv", "w", encoding="utf-8") as csv_file:
+            csv_file.write(",".join(column[0] for column in cursor.description) + "\n")
+            for row in cursor:
+                csv_file.write(",".join(str(value) for value in row) + "\n")
+
+    from_csv = DivisionEngine(ColumnarTables.from_csv(str(tmp_path))).qualifying_clients()
+    check_against_sql(connection, from_csv)
@@ -0,0 +1,56 @@
+import filecmp
+
+from analytics.database import TABLE_COLUMNS, create_database, import_csv, run_select
+from analytics.division import DivisionEngine, check_against_sql
+from analytics.generator import DatasetGenerator
+from analytics.queries import create_indexes, drop_indexes, formulations
+from analytics.tables import ColumnarTables
+
+
+def generated(tmp_path, name="data", **sizes):
+    directory = str(tmp_path / name)
+    params = {"clients": 3000, "branches": 60, "products": 12, "seed": 3}
+    params.update(sizes)
+    counts = DatasetGenerator(**params).write(directory)
+    return directory, counts
+
+
+def test_generated_files_are_valid_and_reproducible(tmp_path):
+    directory, counts = generated(tmp_path)
+    again, _ = generated(tmp_path, "again")
+    for table in TABLE_COLUMNS:
+        assert filecmp.cmp(f"{directory}/{table}.csv", f"{again}/{table}.csv", shallow=False)
+
+    connection = create_database()
+    # Llaves primarias: una fila repetida haría fallar la carga
+    import_csv(connection, directory)
+    for table, rows in counts.items():
+        assert connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == rows
+    assert counts["Cliente"] == 3000
+    orphans = connection.execute("""
+        SELECT COUNT(*) FROM Visitan v
+        LEFT JOIN Cliente c ON c.id = v.idCliente
+        LEFT JOIN Sucursal s ON s.id = v.idSucursal
+        WHERE c.id IS NULL OR s.id IS NULL
+    """).fetchone()[0]
+    assert orphans == 0
+
+    # Sesgo: la ciudad más popular concentra más clientes que la menos popular
+    cities = connection.execute("SELECT COUNT(*) FROM Cliente GROUP BY ciudad ORDER BY 1 DESC").fetchall()
+    assert cities[0][0] > 5 * cities[-1][0]
+
+
+def test_formulations_agree_with_and_without_indexes(tmp_path):
+    directory, _ = generated(tmp_path)
+    connection = create_database()
+    import_csv(connection, directory)
+    expected = run_select(connection)
+    assert expected
+
+    for prepare in (drop_indexes, create_indexes):
+        prepare(connection)
+        for name, query in formulations().items():
+            assert set(connection.execute(query)) == expected, name
+
+    engine = DivisionEngine(ColumnarTables.from_csv(directory))
+    check_against_sql(connection, engine.qualifying_clients())
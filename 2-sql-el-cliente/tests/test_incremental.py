@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from analytics.database import create_database, import_csv, run_select_ids
+from analytics.division import DivisionEngine
+from analytics.generator import DatasetGenerator
+from analytics.incremental import IncrementalDivision
+from analytics.tables import ColumnarTables
+
+CLIENTS, BRANCHES, PRODUCTS = 150, 12, 6
+
+# Mutación -> (sentencia SQL, método de la vista)
+MUTATIONS = {
+    "insert_visit": ("INSERT OR IGNORE INTO Visitan VALUES (?, ?, '2024-03-28')", "insert_visit"),
+    "delete_visit": ("DELETE FROM Visitan WHERE idSucursal = ? AND idCliente = ?", "delete_visit"),
+    "insert_availability": ("INSERT OR IGNORE INTO Disponibilidad VALUES (?, ?)", "insert_availability"),
+    "delete_availability": ("DELETE FROM Disponibilidad WHERE idSucursal = ? AND idProducto = ?", "delete_availability"),
+    "insert_enrollment": ("INSERT OR IGNORE INTO Inscripcion VALUES (?, ?)", "insert_enrollment"),
+    "delete_enrollment": ("DELETE FROM Inscripcion WHERE idProducto = ? AND idCliente = ?", "delete_enrollment"),
+}
+
+
+def small_database(tmp_path, seed):
+    directory = str(tmp_path / f"data_{seed}")
+    DatasetGenerator(CLIENTS, BRANCHES, PRODUCTS, seed=seed).write(directory)
+    connection = create_database()
+    import_csv(connection, directory)
+    return connection
+
+
+def random_mutation(rng, connection):
+    kind = rng.choice(list(MUTATIONS))
+    if kind.startswith("delete") and rng.random() < 0.8:
+        # Casi siempre borrar una fila que existe
+        table = {"delete_visit": "Visitan", "delete_availability": "Disponibilidad",
+                 "delete_enrollment": "Inscripcion"}[kind]
+        row = connection.execute(f"SELECT * FROM {table} ORDER BY RANDOM() LIMIT 1").fetchone()
+        if row:
+            return kind, tuple(row[:2])
+    if kind.endswith("visit"):
+        return kind, (rng.randint(1, BRANCHES), rng.randint(1, CLIENTS))
+    if kind.endswith("availability"):
+        return kind, (rng.randint(1, BRANCHES), rng.randint(1, PRODUCTS))
+    return kind, (rng.randint(1, PRODUCTS), rng.randint(1, CLIENTS))
+
+
+def recomputed(connection):
+    return DivisionEngine(ColumnarTables.from_sqlite(connection)).qualifying_clients().tolist()
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_mutations_match_full_recomputation(tmp_path, seed):
+    rng = random.Random(seed)
+    connection = small_database(tmp_path, seed)
+    view = IncrementalDivision.from_tables(ColumnarTables.from_sqlite(connection))
+    assert view.qualifying_clients() == run_select_ids(connection)
+
+    for step in range(300):
+        kind, key = random_mutation(rng, connection)
+        statement, method = MUTATIONS[kind]
+        with connection:
+            connection.execute(statement, key)
+        getattr(view, method)(*key)
+
+        assert view.qualifying_clients() == recomputed(connection), (step, kind, key)
+        if step % 50 == 0:
+            assert view.qualifying_clients() == run_select_ids(connection)
+
+
+def test_counters_follow_the_product_lifecycle():
+    view = IncrementalDivision()
+    view.insert_enrollment(1, 10)
+    # Producto sin sucursales: nadie cumple (los INNER JOIN lo descartan)
+    assert view.qualifying_clients() == []
+
+    view.insert_availability(100, 1)
+    view.insert_visit(100, 10)
+    assert view.qualifying_clients() == [10]
+    view.insert_availability(200, 1)
+    assert not view.is_qualifying(10)
+    view.insert_visit(200, 10)
+    view.insert_visit(200, 10)
+    assert view.hits[(10, 1)] == 2 and view.qualifying_clients() == [10]
+
+    view.delete_availability(100, 1)
+    view.delete_availability(200, 1)
+    assert view.qualifying_clients() == []
+    view.insert_availability(200, 1)
+    assert len(view) == 1
+    view.delete_enrollment(1, 10)
+    assert view.qualifying_clients() == [] and not view.hits